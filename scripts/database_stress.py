@@ -0,0 +1,186 @@
+"""This script stresses the database from many threads at once, then checks
+that nothing was lost, duplicated or indexed under the wrong room.
+
+Run it from the root of the repository:
+
+    python scripts/database_stress.py --threads 16 --operations 200
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server.database.database import Database  # noqa: E402
+from src.server.database.write_behind_queue import Durability  # noqa: E402
+
+ROOMS = ["general", "random", "help", "games"]
+
+
+def work(
+    database: Database, seed: int, operations: int, usernames: List[str], barrier: threading.Barrier, results: Dict[str, list]
+) -> None:
+    """Races the other threads to sign up with the same usernames, then runs
+    a random mix of reads and writes against the database.
+
+    Args:
+        database: the database
+        seed: the seed of the random mix
+        operations: the number of operations to run
+        usernames: the usernames every thread tries to sign up with
+        barrier: the barrier starting every race at the same time
+        results: the users created and messages sent by every thread, and the errors raised
+    """
+
+    generator = random.Random(seed)
+
+    try:
+        for username in usernames:
+            barrier.wait()
+
+            if database.create_user(f"race-{username}", str(seed)):
+                results["users"].append(f"race-{username}")
+
+        for _ in range(operations):
+            choice = generator.random()
+
+            if choice < 0.1:
+                username = generator.choice(usernames)
+
+                if database.create_user(username, str(seed)):
+                    results["users"].append(username)
+            elif choice < 0.6:
+                room = generator.choice(ROOMS)
+                message = database.create_message("client", f"{seed}", f"user{seed}", room)
+                results["messages"].append((message["__id"], room))
+            elif choice < 0.9:
+                messages, _ = database.get_messages(generator.choice(ROOMS), 20)
+                ids = [message["__id"] for message in messages]
+
+                if ids != sorted(set(ids)):
+                    raise AssertionError(f"Page is out of order: {ids}")
+            elif choice < 0.95:
+                database.save_presence(sorted(generator.sample(usernames, 3)))
+            else:
+                presence = database.get_presence()
+
+                if presence != sorted(presence):
+                    raise AssertionError(f"Presence snapshot is torn: {presence}")
+    except Exception as exception:
+        results["errors"].append(repr(exception))
+
+
+def check(database: Database, usernames: List[str], results: Dict[str, list]) -> List[str]:
+    """Checks the database against what the threads did.
+
+    Args:
+        database: the database
+        usernames: the usernames every thread tried to sign up with
+        results: the users created and messages sent by every thread, and the errors raised
+
+    Returns: the problems found
+    """
+
+    problems = list(results["errors"])
+
+    if sorted(results["users"]) != sorted(set(results["users"])):
+        problems.append("A username was created more than once")
+
+    for username in usernames:
+        if f"race-{username}" not in results["users"]:
+            problems.append(f"Nobody won the race for {username}")
+
+    for username in results["users"]:
+        if database.get_username(username) is None:
+            problems.append(f"User {username} is missing")
+
+    ids = sorted(id for id, _ in results["messages"])
+
+    if ids != list(range(len(ids))):
+        problems.append("Message ids were skipped or given out twice")
+
+    for room in ROOMS:
+        expected = [id for id, sent_to in sorted(results["messages"]) if sent_to == room]
+        messages, has_more = database.get_messages(room, len(expected) + 1)
+
+        if has_more or [message["__id"] for message in messages] != expected:
+            problems.append(f"Room {room} does not hold exactly its messages in order")
+
+        if any(message["room"] != room for message in messages):
+            problems.append(f"Room {room} indexes a message sent to another room")
+
+    return problems
+
+
+def run(durability: Durability, threads: int, operations: int) -> bool:
+    """Stresses a fresh database and reports the problems found.
+
+    Args:
+        durability: whether messages are stored immediately or in batches
+        threads: the number of threads
+        operations: the number of operations each thread runs
+
+    Returns: was the database consistent
+    """
+
+    usernames = [f"user{index}" for index in range(threads)]
+    results: Dict[str, list] = {"users": [], "messages": [], "errors": []}
+    barrier = threading.Barrier(threads)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(durability, path=os.path.join(directory, "stress.db"))
+        workers = [
+            threading.Thread(target=work, args=(database, seed, operations, usernames, barrier, results))
+            for seed in range(threads)
+        ]
+
+        start = time.perf_counter()
+
+        for worker in workers:
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+        elapsed = time.perf_counter() - start
+
+        problems = check(database, usernames, results)
+        database.close()
+
+    print(
+        f"{durability.value}: {threads * operations / elapsed:.0f} operations/s, "
+        f"{len(results['messages'])} messages, {len(results['users'])} users, {len(problems)} problems"
+    )
+
+    for problem in problems:
+        print(f"  {problem}")
+
+    return not problems
+
+
+def main() -> None:
+    """Runs the stress test with both durabilities, and exits with an error if
+    either database was left inconsistent."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--operations", type=int, default=200)
+    arguments = parser.parse_args()
+
+    # Switch threads as often as possible, so every gap between two database calls is raced
+    sys.setswitchinterval(1e-6)
+
+    results = [run(durability, arguments.threads, arguments.operations) for durability in Durability]
+
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,529 @@
+"""This script simulates chat users against a headless server, and reports
+send-to-receive latency, message throughput, handshake and authentication
+times, and the memory used by the server.
+
+Every simulated user is a Client speaking the real wire protocol. Users
+connect, sign up, reconnect, log in, join a room, then send messages at a
+fixed rate. Each message carries the time it was sent, so every member of
+the room that receives it records its latency. The users are signed up in
+the server's database, named after the benchmark process so runs do not
+collide.
+
+Run it from the root of the repository once the key and certificate have
+been generated. The server is started for the run, unless an address is
+given. Results can be saved, and compared with a previous run:
+
+    python scripts/load_benchmark.py --server server --users 50 --rate 2 --duration 10 --output after.json --baseline before.json
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import socket
+import argparse
+import threading
+import subprocess
+
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from startup_benchmark import get_environment, reset_interrupt, stop  # noqa: E402
+
+MODULES = {
+    "server": "src.server.server",
+    "async_server": "src.server.async_server",
+    "cluster": "src.server.cluster.supervisor",
+}
+
+PREFIX = "load-benchmark:"
+
+
+class Signal:
+    """The Signal class stands in for a Qt signal, calling a function when it
+    is emitted.
+
+    Attributes:
+        slot: the function called when the signal is emitted
+    """
+
+    def __init__(self, slot: Optional[Callable[..., None]] = None) -> None:
+        """Initialises the Signal instance.
+
+        Args:
+            slot: the function called when the signal is emitted
+        """
+
+        self.slot: Optional[Callable[..., None]] = slot
+
+    def emit(self, *args: Any) -> None:
+        """Calls the slot with the arguments, if there is one.
+
+        Args:
+            args: the arguments of the signal
+        """
+
+        if self.slot is not None:
+            self.slot(*args)
+
+
+class Recorder:
+    """The Recorder class collects the latency of every message received by
+    any simulated user.
+
+    Attributes:
+        latencies: the seconds between sending and receiving each message
+        lock: the lock guarding the latencies
+    """
+
+    def __init__(self) -> None:
+        """Initialises the Recorder instance."""
+
+        self.latencies: List[float] = []
+        self.lock: threading.Lock = threading.Lock()
+
+    def record(self, role: str, message: Dict[str, Any]) -> None:
+        """Records the latency of a message sent by a simulated user.
+
+        Args:
+            role: the role of the sender, client or server
+            message: the message
+        """
+
+        if role != "client" or not message["content"].startswith(PREFIX):
+            return
+
+        latency = time.perf_counter() - float(message["content"][len(PREFIX) :])
+
+        with self.lock:
+            self.latencies.append(latency)
+
+    def count(self) -> int:
+        """Returns the number of messages received so far.
+
+        Returns: the number of messages
+        """
+
+        with self.lock:
+            return len(self.latencies)
+
+
+class SimulatedUser:
+    """The SimulatedUser class drives a Client without a UI. It stands in for
+    the UI of its client, handling the signals the client emits headlessly.
+
+    Attributes:
+        username: the username
+        password: the password
+        recorder: the recorder of message latencies
+        client: the client connected to the server
+        room: the room the user chats in
+        sent: the number of messages sent
+        error: the last login or signup error sent by the server
+        response: set once the server has answered a login or signup
+        login_error_signal: emitted with the server's answer to a login
+        signup_error_signal: emitted with the server's answer to a signup
+        new_message_signal: emitted with every message received
+        new_messages_signal: emitted with the latest page of a room's history
+        history_signal: emitted with an older page of a room's history
+        chat_label_signal: emitted with the room joined or left
+    """
+
+    def __init__(self, username: str, password: str, recorder: Recorder) -> None:
+        """Initialises the SimulatedUser instance.
+
+        Args:
+            username: the username
+            password: the password
+            recorder: the recorder of message latencies
+        """
+
+        self.username: str = username
+        self.password: str = password
+        self.recorder: Recorder = recorder
+        self.client: Any = None
+        self.room: Optional[str] = None
+        self.sent: int = 0
+        self.error: Optional[str] = None
+        self.response: threading.Event = threading.Event()
+        self.login_error_signal: Signal = Signal(self.answer)
+        self.signup_error_signal: Signal = Signal(self.answer)
+        self.new_message_signal: Signal = Signal(recorder.record)
+        self.new_messages_signal: Signal = Signal()
+        self.history_signal: Signal = Signal()
+        self.chat_label_signal: Signal = Signal()
+
+    def connect(self) -> float:
+        """Connects a new client to the server.
+
+        Returns: the seconds from opening the connection to being assigned an id
+        """
+
+        from src.client.client import Client
+
+        self.client = Client()
+        self.client.ui = self
+
+        start = time.perf_counter()
+        self.client.connect()
+
+        return time.perf_counter() - start
+
+    def authenticate(self, action: str, timeout: float) -> Optional[float]:
+        """Signs up or logs in, and waits for the server to answer.
+
+        Args:
+            action: signup or login
+            timeout: how long to wait for the server
+
+        Returns: the seconds the server took to accept, or nothing if it refused or timed out
+        """
+
+        self.response.clear()
+
+        start = time.perf_counter()
+        self.client.send({"type": f"client_{action}", "username": self.username, "password": self.password})
+
+        if not self.response.wait(timeout) or self.error:
+            return None
+
+        return time.perf_counter() - start
+
+    def answer(self, error: str) -> None:
+        """Handles the server's answer to a login or signup.
+
+        Args:
+            error: the error, empty if the server accepted
+        """
+
+        self.error = error
+        self.response.set()
+
+    def send_message(self) -> None:
+        """Sends a message carrying the time it was sent."""
+
+        self.client.send({"type": "client_message", "message": f"{PREFIX}{time.perf_counter()!r}"})
+        self.sent += 1
+
+    def disconnect(self) -> None:
+        """Shuts the connection down, waking up the client's receive thread.
+        The socket is not closed here, as its descriptor could be reused by
+        the next connection while the receive thread still reads from it. It
+        is closed once the receive thread lets go of it."""
+
+        try:
+            self.client.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """Returns the nearest-rank 50th, 95th and 99th percentiles, in
+    milliseconds.
+
+    Args:
+        values: the values, in seconds
+
+    Returns: the percentiles keyed by name, or nothing if there are no values
+    """
+
+    values = sorted(values)
+
+    return {
+        name: values[min(len(values) - 1, int(len(values) * rank))] * 1000 if values else None
+        for name, rank in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+    }
+
+
+def get_rss(pid: int) -> Optional[int]:
+    """Returns the resident memory of a process and its descendants, such as
+    the workers of a cluster and the authentication pool. It is read from
+    /proc, so it is only known on Linux.
+
+    Args:
+        pid: the process id
+
+    Returns: the resident memory in bytes, or nothing if it is unknown
+    """
+
+    if not os.path.isdir("/proc"):
+        return None
+
+    children: Dict[int, List[int]] = {}
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                parent = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+        children.setdefault(parent, []).append(int(entry))
+
+    total = 0
+    pending = [pid]
+
+    while pending:
+        process = pending.pop()
+        pending.extend(children.get(process, []))
+
+        try:
+            with open(f"/proc/{process}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+
+    return total
+
+
+def start_server(module: str, environment: Dict[str, str], timeout: float) -> subprocess.Popen:
+    """Starts the server, and waits until it accepts connections.
+
+    Args:
+        module: the server module
+        environment: the environment of the server
+        timeout: how long to wait for the server
+
+    Returns: the server process
+    """
+
+    address = (environment["SERVER_HOST"], int(environment["SERVER_PORT"]))
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", module],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        preexec_fn=reset_interrupt if os.name == "posix" else None,
+    )
+
+    deadline = time.perf_counter() + timeout
+
+    while True:
+        try:
+            socket.create_connection(address, 0.1).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}") from None
+
+            if time.perf_counter() > deadline:
+                stop(process)
+                raise RuntimeError("Server did not start in time") from None
+
+            time.sleep(0.1)
+
+
+def send_messages(users: List[SimulatedUser], rate: float, offset: float, end: float) -> None:
+    """Sends messages from each user at a fixed rate until the end. Users
+    start at staggered times, so messages are spread over each interval.
+
+    Args:
+        users: the users
+        rate: the messages per second sent by each user
+        offset: the stagger between the users of the thread
+        end: when to stop sending
+    """
+
+    interval = 1 / rate
+    start = time.perf_counter()
+    schedule = [(start + index * offset, index) for index in range(len(users))]
+
+    heapq.heapify(schedule)
+
+    while schedule:
+        deadline, index = heapq.heappop(schedule)
+
+        if deadline >= end:
+            break
+
+        time.sleep(max(0, deadline - time.perf_counter()))
+
+        try:
+            users[index].send_message()
+        except OSError:
+            continue
+
+        heapq.heappush(schedule, (deadline + interval, index))
+
+
+def run(arguments: argparse.Namespace) -> Dict[str, Any]:
+    """Runs the benchmark.
+
+    Args:
+        arguments: the command line arguments
+
+    Returns: the results
+    """
+
+    process = None
+
+    if arguments.address:
+        host, port = arguments.address.rsplit(":", 1)
+    else:
+        environment = get_environment()
+        environment["CLUSTER_WORKERS"] = str(arguments.workers)
+        host, port = environment["SERVER_HOST"], environment["SERVER_PORT"]
+
+    os.environ["CLIENT_HOST"] = host
+    os.environ["CLIENT_PORT"] = port
+
+    if not arguments.address:
+        process = start_server(MODULES[arguments.server], environment, arguments.timeout)
+
+    pid = process.pid if process is not None else arguments.pid
+    recorder = Recorder()
+    users = [SimulatedUser(f"load{index}-{os.getpid()}", "password", recorder) for index in range(arguments.users)]
+    results: Dict[str, Any] = {"server": arguments.address or arguments.server, "users": arguments.users}
+
+    try:
+        with ThreadPoolExecutor(arguments.concurrency) as executor:
+            results["connect_ms"] = percentiles(list(executor.map(SimulatedUser.connect, users)))
+            signups = list(executor.map(lambda user: user.authenticate("signup", arguments.timeout), users))
+            results["signup_ms"] = percentiles([signup for signup in signups if signup is not None])
+
+            for user in users:
+                user.disconnect()
+
+            results["reconnect_ms"] = percentiles(list(executor.map(SimulatedUser.connect, users)))
+            logins = list(executor.map(lambda user: user.authenticate("login", arguments.timeout), users))
+            results["login_ms"] = percentiles([login for login in logins if login is not None])
+
+        results["failed_authentications"] = sum(result is None for result in signups + logins)
+
+        rooms: Dict[str, int] = {}
+
+        for index, user in enumerate(users):
+            user.room = f"load-{index % arguments.rooms}"
+            rooms[user.room] = rooms.get(user.room, 0) + 1
+            user.client.send({"type": "client_join_room", "room": user.room})
+
+        time.sleep(1)
+
+        end = time.perf_counter() + arguments.duration
+        groups = [users[index :: arguments.senders] for index in range(min(arguments.senders, len(users)))]
+        rss = []
+
+        with ThreadPoolExecutor(len(groups)) as executor:
+            futures = [
+                executor.submit(send_messages, group, arguments.rate, 1 / arguments.rate / len(group), end) for group in groups
+            ]
+
+            while time.perf_counter() < end:
+                if pid is not None:
+                    rss.append(get_rss(pid))
+
+                time.sleep(0.5)
+
+            for future in futures:
+                future.result()
+
+        sent = sum(user.sent for user in users)
+        expected = sum(user.sent * (rooms[user.room] - 1) for user in users)
+        received = recorder.count()
+        deadline = time.perf_counter() + arguments.drain
+
+        while received < expected and time.perf_counter() < deadline:
+            time.sleep(0.1)
+            received = recorder.count()
+
+        results["messages_sent"] = sent
+        results["messages_received"] = received
+        results["messages_expected"] = expected
+        results["sent_per_second"] = sent / arguments.duration
+        results["received_per_second"] = received / arguments.duration
+        results["latency_ms"] = percentiles(recorder.latencies)
+        results["server_rss_mb"] = max(rss) / (1 << 20) if rss and None not in rss else None
+    finally:
+        for user in users:
+            if user.client is not None:
+                user.disconnect()
+
+        if process is not None:
+            stop(process)
+
+    return results
+
+
+def report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    """Prints the results, along with the change from the baseline.
+
+    Args:
+        results: the results
+        baseline: the results of a previous run, if any
+    """
+
+    def show(name: str, value: Any, previous: Any) -> None:
+        if value is None:
+            print(f"  {name:<24} {'n/a':>10}")
+            return
+
+        change = ""
+
+        if isinstance(previous, (int, float)) and previous:
+            change = f" ({(value - previous) / previous * 100:+.1f}%)"
+
+        print(f"  {name:<24} {value:>10.1f}{change}")
+
+    baseline = baseline or {}
+
+    print(f"{results['server']}, {results['users']} users")
+
+    if baseline:
+        print(f"compared with {baseline['server']}, {baseline['users']} users")
+
+    for key, value in results.items():
+        if isinstance(value, dict):
+            for rank, percentile in value.items():
+                show(f"{key} {rank}", percentile, baseline.get(key, {}).get(rank))
+        elif isinstance(value, (int, float)) and key != "users":
+            show(key, value, baseline.get(key))
+        elif value is None:
+            show(key, value, None)
+
+
+def main() -> None:
+    """Runs the benchmark, prints the results, and saves them if asked."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=sorted(MODULES), default="server")
+    parser.add_argument("--workers", type=int, default=0, help="the number of workers of a cluster")
+    parser.add_argument("--address", help="the host:port of a running server, instead of starting one")
+    parser.add_argument("--pid", type=int, help="the process id of the running server, to measure its memory")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=1, help="the messages per second sent by each user")
+    parser.add_argument("--duration", type=float, default=10, help="the seconds spent sending messages")
+    parser.add_argument("--drain", type=float, default=5, help="the seconds to wait for messages still on their way")
+    parser.add_argument("--concurrency", type=int, default=16, help="the number of users connecting at the same time")
+    parser.add_argument("--senders", type=int, default=8, help="the number of threads sending messages")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", help="the file to save the results to")
+    parser.add_argument("--baseline", help="the file of a previous run to compare the results to")
+    arguments = parser.parse_args()
+
+    baseline = None
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+
+    results = run(arguments)
+    report(results, baseline)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""This script measures how long a headless server takes to import and to
+start accepting connections. Each run uses a fresh interpreter.
+
+Run it from the root of the repository once the key and certificate have
+been generated:
+
+    python scripts/startup_benchmark.py --server server --runs 5
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import statistics
+import subprocess
+
+from typing import Dict, Tuple
+
+IMPORT_CODE = """
+import sys
+import time
+
+start = time.perf_counter()
+import src.server.{module}
+elapsed = time.perf_counter() - start
+
+print(elapsed, any(name.split(".")[0] in ("PySide6", "shiboken6") for name in sys.modules))
+"""
+
+
+def get_environment() -> Dict[str, str]:
+    """Returns the environment of the server, listening on a free port.
+
+    Returns: the environment variables
+    """
+
+    environment = dict(os.environ)
+    environment.setdefault("SERVER_HOST", "localhost")
+
+    with socket.socket() as probe:
+        probe.bind((environment["SERVER_HOST"], 0))
+        environment["SERVER_PORT"] = str(probe.getsockname()[1])
+
+    return environment
+
+
+def reset_interrupt() -> None:
+    """Lets the server be interrupted, even when the benchmark was started
+    with interrupts ignored, such as in the background."""
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+
+def measure_import(module: str) -> Tuple[float, bool]:
+    """Imports the server module in a fresh interpreter.
+
+    Args:
+        module: the server module
+
+    Returns: the time the import took and whether Qt was imported
+    """
+
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_CODE.format(module=module)],
+        env=get_environment(),
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout.split()
+
+    return float(output[0]), output[1] == b"True"
+
+
+def measure_start(module: str, timeout: float) -> float:
+    """Starts the server in a fresh interpreter, and waits until it accepts
+    connections.
+
+    Args:
+        module: the server module
+        timeout: how long to wait for the server
+
+    Returns: the time from launching the interpreter to the first accepted connection
+    """
+
+    environment = get_environment()
+    address = (environment["SERVER_HOST"], int(environment["SERVER_PORT"]))
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", f"src.server.{module}"],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        preexec_fn=reset_interrupt if os.name == "posix" else None,
+    )
+
+    try:
+        while True:
+            try:
+                socket.create_connection(address, 0.1).close()
+                return time.perf_counter() - start
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {process.returncode}") from None
+
+                if time.perf_counter() - start > timeout:
+                    raise RuntimeError("Server did not start in time") from None
+
+                time.sleep(0.005)
+    finally:
+        stop(process)
+
+
+def stop(process: subprocess.Popen) -> None:
+    """Stops the server, letting it shut down cleanly if it can.
+
+    Args:
+        process: the server process
+    """
+
+    if os.name == "posix":
+        process.send_signal(signal.SIGINT)
+    else:
+        process.terminate()
+
+    try:
+        process.wait(10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def main() -> None:
+    """Runs the benchmark and prints the median of each measurement."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=["server", "async_server"], default="server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30)
+    arguments = parser.parse_args()
+
+    interpreter_times = []
+    import_times = []
+    start_times = []
+    is_qt_imported = False
+
+    for _ in range(arguments.runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        interpreter_times.append(time.perf_counter() - start)
+
+        import_time, is_imported = measure_import(arguments.server)
+        import_times.append(import_time)
+        is_qt_imported |= is_imported
+
+        start_times.append(measure_start(arguments.server, arguments.timeout))
+
+    print(f"src.server.{arguments.server}, median of {arguments.runs} runs")
+    print(f"  interpreter startup: {statistics.median(interpreter_times) * 1000:8.1f} ms")
+    print(f"  module import:       {statistics.median(import_times) * 1000:8.1f} ms")
+    print(f"  launch to listening: {statistics.median(start_times) * 1000:8.1f} ms")
+    print(f"  imports Qt:          {'yes' if is_qt_imported else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,24 @@
 from __future__ import annotations
 
 import os
-import time
-import json
 import socket
 import struct
 import threading
 
-from ssl import PROTOCOL_TLSv1_2, SSLSocket, SSLContext
+from ssl import CERT_REQUIRED, PROTOCOL_TLS_CLIENT, SSLContext, SSLSession, SSLSocket, TLSVersion
 
-from typing import Any, List, Union, TYPE_CHECKING
+from typing import Any, List, Optional, TYPE_CHECKING
 
 from dotenv import load_dotenv
 
+from src.common.protocol.codec import Codec, CodecRegistry
+from src.common.protocol.dispatcher import Dispatcher, Schema
+from src.common.protocol.frame_reader import FrameReader
+
 from src.common.utilities.logger import Logger
 from src.common.utilities.utility import Utility
 
-from src.common.constants.constants import CIPHER, CLIENT_TYPES, HEADER_LENGTH, PATHS
+from src.common.constants.constants import CIPHER, CONNECTION_TIMEOUT, PATHS, TLS_VERSION
 
 if TYPE_CHECKING:
     from src.client.ui.ui import UI
@@ -27,112 +29,198 @@ load_dotenv()
 
 
 class Client:
-    """The Client class containing client-side APIs.
+    """The Client class containing client-side APIs. Every client shares the
+    same TLS context, and offers the session of the last connection to the
+    server, so reconnecting resumes the session instead of repeating the key
+    exchange.
 
     Attributes:
         __HOST: the client host
         __PORT: the client port
         __CERTIFICATE: the server certificate
+        __TIMEOUT: how long to wait for the server to assign an id
+        __SSL_CONTEXT: the TLS context shared by every client
+        __SSL_CONTEXT_LOCK: the lock making sure the shared TLS context is only created once
+        __SESSION: the TLS session of the last connection to the server
+        __MESSAGE_SCHEMA: the fields every chat message must have to be shown
         socket: the client socket secured under TLS
         id: the client id
+        handshake: set once the server has assigned an id, or the connection has closed
         ui: the client ui
+        codec: the codec used to encode frames sent to the server
+        dispatcher: the dispatcher executing the RPCs sent by the server
+        room: the room the client is chatting in
+        history_cursor: the id of the oldest message loaded from the room history
+        has_more_history: are there older messages to load
+        is_history_pending: is a page of older messages being loaded
     """
 
     __HOST: str = os.getenv("CLIENT_HOST")
     __PORT: int = int(os.getenv("CLIENT_PORT"))
     __CERTIFICATE: str = Utility.get_path(PATHS["certificates"], ["server.crt"])
+    __TIMEOUT: float = float(os.getenv("CLIENT_CONNECTION_TIMEOUT", CONNECTION_TIMEOUT))
+    __SSL_CONTEXT: Optional[SSLContext] = None
+    __SSL_CONTEXT_LOCK: threading.Lock = threading.Lock()
+    __SESSION: Optional[SSLSession] = None
+    __MESSAGE_SCHEMA: Schema = Schema({"__id": int, "role": str, "username": str, "content": str})
 
     def __init__(self) -> None:
         """Initialises the Client instance."""
 
         self.socket: SSLSocket = self.get_secure_socket()
         self.id: int = -1
+        self.handshake: threading.Event = threading.Event()
         self.ui: UI = None
+        self.codec: Codec = CodecRegistry.get_default()
+        self.dispatcher: Dispatcher = self.create_dispatcher()
+        self.room: Optional[str] = None
+        self.history_cursor: Optional[int] = None
+        self.has_more_history: bool = False
+        self.is_history_pending: bool = False
+
+    @classmethod
+    def get_ssl_context(cls) -> SSLContext:
+        """Returns the client-side TLS context, creating it on first use. The
+        server certificate and hostname are verified, against the self-signed
+        certificate of the server. The context is pinned to the TLS version
+        set by the TLS_VERSION environment variable, which must match the
+        server's. Clients connecting at the same time share one context, as a
+        session can only be resumed by the context that created it.
+
+        Returns: the TLS context shared by every client
+        """
+
+        with cls.__SSL_CONTEXT_LOCK:
+            if cls.__SSL_CONTEXT is None:
+                version = TLSVersion[os.getenv("TLS_VERSION", TLS_VERSION)]
+
+                context = SSLContext(PROTOCOL_TLS_CLIENT)
+                context.check_hostname = True
+                context.verify_mode = CERT_REQUIRED
+                context.minimum_version = version
+                context.maximum_version = version
+                context.load_verify_locations(cls.__CERTIFICATE)
+                context.set_ciphers(CIPHER)
+
+                cls.__SSL_CONTEXT = context
+
+        return cls.__SSL_CONTEXT
 
     def get_secure_socket(self) -> SSLSocket:
-        """Returns a secure socket wrapped with a TLS protection layer. It also
-        allows for self-signed certificates to be verified.
+        """Returns a secure socket wrapped with a TLS protection layer, which
+        resumes the last session with the server if there is one. Frames are
+        sent as soon as they are written, rather than held back by Nagle's
+        algorithm.
 
         Returns: a secure socket wrapped with a protection layer; TLS
         """
 
         unsecure_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        unsecure_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
-        context = SSLContext(PROTOCOL_TLSv1_2)
-        context.load_verify_locations(self.__CERTIFICATE)
-        context.set_ciphers(CIPHER)
-
-        return context.wrap_socket(unsecure_socket, server_hostname=self.__HOST)
+        return self.get_ssl_context().wrap_socket(unsecure_socket, server_hostname=self.__HOST, session=Client.__SESSION)
 
     @Utility.timed_event()
-    def connect(self):
+    def connect(self, timeout: Optional[float] = None) -> None:
         """Connects the client to the server.
 
         This is a blocking call, as the client should retrieve an id
-        before proceeding.
+        before proceeding. The receive thread wakes it up as soon as the id
+        is assigned. A ConnectionError is raised if the server cannot be
+        reached, or does not assign an id in time. Once connected, the TLS
+        session is kept for the next connection to resume. It is only kept
+        then, as TLS 1.3 sends session tickets after the handshake.
+
+        Args:
+            timeout: how long to wait for the server, defaults to the CLIENT_CONNECTION_TIMEOUT environment variable
         """
 
-        self.socket.connect((self.__HOST, self.__PORT))
+        timeout = self.__TIMEOUT if timeout is None else timeout
+
+        try:
+            self.socket.settimeout(timeout)
+            self.socket.connect((self.__HOST, self.__PORT))
+            self.socket.settimeout(None)
+        except OSError as exception:
+            raise ConnectionError(f"Could not connect to the server at {self.__HOST}:{self.__PORT}: {exception}") from exception
 
         thread = threading.Thread(target=self.receive, daemon=True)
         thread.start()
 
-        while self.id == -1:
-            time.sleep(0.1)
+        if not self.handshake.wait(timeout):
+            raise ConnectionError(f"Server did not assign an id within {timeout} seconds")
 
-    def check_data_format(self, data: Any) -> bool:
-        """Check if the data sent from the server is valid or not. It should
-        include a 'type', so that the corresponding RPC can be executed.
+        if self.id == -1:
+            raise ConnectionError("Server closed the connection before assigning an id")
 
-        Args:
-            data: the data sent from the server
+        Client.__SESSION = self.socket.session
+        Logger.info("Client: TLS session was %s", "resumed" if self.socket.session_reused else "established")
 
-        Returns: the validity of the data
+    def create_dispatcher(self) -> Dispatcher:
+        """Creates the dispatcher mapping each type of data sent by the server
+        to the corresponding RPC.
+
+        Returns: the dispatcher
         """
 
-        if not isinstance(data, dict):
-            Logger.error("Client: Data is not in the correct format")
-            return False
+        dispatcher = Dispatcher("Client")
+
+        dispatcher.register("server_assign_id", self.handle_server_assign_id, Schema({"id": int}, {"codecs": []}))
+        dispatcher.register("server_message", self.handle_server_message, Schema({"message": dict}))
+        dispatcher.register(
+            "server_history",
+            self.handle_server_history,
+            Schema({"room": str, "messages": list, "has_more": bool}, {"before_id": None}),
+        )
+        dispatcher.register("server_login_error", self.handle_server_login_error, Schema({"error": str}))
+        dispatcher.register("server_signup_error", self.handle_server_signup_error, Schema({"error": str}))
+        dispatcher.register("server_room_joined", self.handle_server_room_joined, Schema({"room": str}))
+        dispatcher.register("server_room_left", self.handle_server_room_left, Schema({"room": str}))
+
+        return dispatcher
 
-        if "type" not in data:
-            Logger.error("Client: 'type' is not present in data")
-            return False
+    def handle_server_assign_id(self, id: int, codecs: List[str]) -> None:
+        """Handles the id assigned by the server. The client also agrees on a
+        codec with the server, and switches to it if it is not JSON.
+
+        Args:
+            id: the client id
+            codecs: the names of the codecs supported by the server
+        """
 
-        if data["type"] not in CLIENT_TYPES:
-            Logger.error(f"Client: 'type': {data['type']} is not a valid type")
-            return False
+        codec = CodecRegistry.negotiate(codecs)
 
-        return True
+        if codec is not self.codec:
+            self.send({"type": "client_codec", "codec": codec.name})
+            self.codec = codec
 
-    def handle_server_data(self, data: Any) -> None:
-        """Handles the data sent by the server with the corresponding id. It
-        executes the corresponding RPC.
+        self.id = id
+        self.handshake.set()
+
+    def handle_server_room_joined(self, room: str) -> None:
+        """Updates the chat title to the room the current user has joined.
 
         Args:
-            data: the data sent by the server
+            room: the room name
         """
 
-        if data["type"] == "server_assign_id":
-            self.id = data["id"]
-        if data["type"] == "server_message":
-            self.handle_server_message(data["message"])
-        if data["type"] == "server_messages":
-            self.handle_server_messages(data["messages"])
-        if data["type"] == "server_login_error":
-            self.handle_server_login_error(data["error"])
-        if data["type"] == "server_signup_error":
-            self.handle_server_signup_error(data["error"])
-        if data["type"] == "server_exchange_usernames":
-            self.handle_second_username(data["username"])
-
-    def handle_second_username(self, second_username: str) -> None:
-        """Updates the chat title to who the current user is chatting with.
+        self.room = room
+        self.history_cursor = None
+        self.has_more_history = False
+        self.is_history_pending = False
+
+        self.ui.chat_label_signal.emit(room)
+
+    def handle_server_room_left(self, room: str) -> None:
+        """Updates the chat title after the current user has left a room.
 
         Args:
-            second_username: the second user's username
+            room: the room name
         """
 
-        self.ui.chat_label_signal.emit(second_username)
+        self.room = None
+
+        self.ui.chat_label_signal.emit("")
 
     def handle_server_message(self, message: str) -> None:
         """Handles messages sent by the server by updating the chat
@@ -163,76 +251,101 @@ class Client:
 
         self.ui.signup_error_signal.emit(error)
 
-    def handle_server_messages(self, messages: List[Any]) -> None:
-        """Updates the current client's chat based on messages sent by other
-        clients and the messages stored on the server.
+    def handle_server_history(self, room: str, messages: List[Any], has_more: bool, before_id: Optional[int]) -> None:
+        """Updates the current client's chat with a page of the messages
+        stored on the server. The latest page is added to the bottom of the
+        chat, and older pages are added to the top. Pages for a room the
+        client has since left are ignored, and so are malformed messages.
 
         Args:
-            messages: the list of messages
+            room: the room name
+            messages: the page of messages, oldest first
+            has_more: are there more messages past the page
+            before_id: the id of the message the page ends before, if it is an older page
         """
 
-        for message in messages:
-            self.update_chat(message)
+        if room != self.room:
+            return
 
-    def update_chat(self, message: Any) -> None:
-        """Updates the chat because the UI is running on a separate thread, and
-        must therefore be called within the client code.
+        messages = [message for message in messages if self.is_valid_message(message)]
 
-        Args:
-            message: the message to be sent to the chat
-        """
+        if messages:
+            self.history_cursor = messages[0]["__id"]
 
-        self.ui.new_message_signal.emit(message["role"], message)
+        self.has_more_history = has_more
+        self.is_history_pending = False
 
-    def receive(self) -> Union[bytearray, None]:
-        """Receive data based on the length of the incoming data. Returns a
-        50-byte payload. Either all or no data is returned.
+        if before_id is not None:
+            self.ui.history_signal.emit(messages)
+        else:
+            self.ui.new_messages_signal.emit(messages)
 
-        Returns: data in the form of a bytearray or nothing
-        """
+    def request_history(self) -> None:
+        """Requests the page of messages before the oldest message loaded,
+        unless the whole history is loaded or a page is already on its way."""
 
-        while True:
-            raw_length = self.receive_all(HEADER_LENGTH)
+        if self.is_history_pending or not self.has_more_history or self.history_cursor is None:
+            return
 
-            if not raw_length:
-                break
+        self.is_history_pending = True
+        self.send({"type": "client_history", "before_id": self.history_cursor})
 
-            length = struct.unpack(">I", raw_length)[0]
-            message = self.receive_all(length)
+    def is_valid_message(self, message: Any) -> bool:
+        """Validates a chat message sent by the server, so a malformed one is
+        skipped instead of ending the receive thread.
 
-            if not message:
-                break
+        Args:
+            message: the message sent by the server
 
-            data = json.loads(message.decode("utf-8"))
+        Returns: the validity of the message
+        """
 
-            if not self.check_data_format(data):
-                break
+        if isinstance(message, dict) and self.__MESSAGE_SCHEMA.validate(message) is not None:
+            return True
 
-            self.handle_server_data(data)
-            Logger.info(f"Client: Received message: {data}")
+        Logger.warn("Client: Skipped a malformed message: %s", message)
 
-    def receive_all(self, length: int) -> Union[bytearray, None]:
-        """Receive all data sent from the server. If the server connection is
-        closed then nothing will be returned.
+        return False
 
-        Args:
-            length: the size of the data to be retrieved
+    def update_chat(self, message: Any) -> None:
+        """Updates the chat because the UI is running on a separate thread, and
+        must therefore be called within the client code. Malformed messages
+        are skipped.
 
-        Returns: data in the form of a bytearray or nothing
+        Args:
+            message: the message to be sent to the chat
         """
 
-        data = bytearray()
+        if not self.is_valid_message(message):
+            return
+
+        self.ui.new_message_signal.emit(message["role"], message)
+
+    @Utility.timed_event()
+    def receive(self) -> None:
+        """Receive frames sent by the server until the server connection is
+        closed, and executes the corresponding RPC for each frame. Closing
+        the connection also wakes up a client still waiting for its id."""
+
+        reader = FrameReader(self.socket)
 
-        while len(data) < length:
-            packet = self.socket.recv(length - len(data))
+        try:
+            while True:
+                frame = reader.read()
 
-            if not packet:
-                return None
+                if frame is None:
+                    break
 
-            data.extend(packet)
+                data = CodecRegistry.decode(frame)
 
-        return data
+                if not self.dispatcher.dispatch(data):
+                    break
 
+                Logger.info("Client: Received message: %s", data)
+        finally:
+            self.handshake.set()
+
+    @Utility.timed_event()
     def send(self, data: Any) -> None:
         """Sends data to the server. The payload contains the header along with
         the data.
@@ -241,7 +354,7 @@ class Client:
             data: the data to be sent to the server
         """
 
-        message = json.dumps(data).encode("utf-8")
+        message = self.codec.encode(data)
         message = struct.pack(">I", len(message)) + message
 
         self.socket.sendall(message)
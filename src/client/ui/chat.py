@@ -40,7 +40,9 @@ from PySide6.QtGui import (
     QRadialGradient,
     QTransform,
 )
-from PySide6.QtWidgets import QApplication, QFrame, QLabel, QLineEdit, QPushButton, QScrollArea, QSizePolicy, QWidget
+from PySide6.QtWidgets import QApplication, QFrame, QLabel, QLineEdit, QPushButton, QSizePolicy, QWidget
+
+from src.client.ui.custom.message_view import MessageView
 from src.common.resources import ui_rc
 
 
@@ -55,18 +57,18 @@ class Ui_Chat(object):
         sizePolicy.setHeightForWidth(Chat.sizePolicy().hasHeightForWidth())
         Chat.setSizePolicy(sizePolicy)
         Chat.setStyleSheet("background-color: #0C111D;\n" "/*background-color: white;")
-        self.scrollArea = QScrollArea(Chat)
-        self.scrollArea.setObjectName("scrollArea")
-        self.scrollArea.setGeometry(QRect(384, 79, 896, 581))
+        self.message_view = MessageView(Chat)
+        self.message_view.setObjectName("message_view")
+        self.message_view.setGeometry(QRect(384, 79, 896, 581))
         sizePolicy1 = QSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Minimum)
         sizePolicy1.setHorizontalStretch(0)
         sizePolicy1.setVerticalStretch(0)
-        sizePolicy1.setHeightForWidth(self.scrollArea.sizePolicy().hasHeightForWidth())
-        self.scrollArea.setSizePolicy(sizePolicy1)
-        self.scrollArea.setFocusPolicy(Qt.NoFocus)
-        self.scrollArea.setStyleSheet(
-            "/* ScrollArea */\n"
-            "QScrollArea {\n"
+        sizePolicy1.setHeightForWidth(self.message_view.sizePolicy().hasHeightForWidth())
+        self.message_view.setSizePolicy(sizePolicy1)
+        self.message_view.setFocusPolicy(Qt.NoFocus)
+        self.message_view.setStyleSheet(
+            "/* MessageView */\n"
+            "MessageView {\n"
             "    border: 2px solid #161B27;  /* Set border thickness and color */\n"
             "    background-color: transparent;  /* Optional: Set background color to transparent */\n"
             "}\n"
@@ -89,8 +91,8 @@ class Ui_Chat(object):
             "/* Scrollbar handle (the draggable part) */\n"
             "QScrollBar::handle:vertical {\n"
             "    background-color: #969696;  /* Custom handle color */\n"
-            "    b"
-            "order-radius: 4px;  /* Rounded corners */\n"
+            "    "
+            "border-radius: 4px;  /* Rounded corners */\n"
             "    min-height: 10px;  /* Reduce the minimum height to make the handle smaller */\n"
             "    width: 6px;  /* Make the handle thinner */\n"
             "}\n"
@@ -122,11 +124,7 @@ class Ui_Chat(object):
             "}\n"
             ""
         )
-        self.scrollArea.setWidgetResizable(True)
-        self.scrollAreaWidgetContents = QWidget()
-        self.scrollAreaWidgetContents.setObjectName("scrollAreaWidgetContents")
-        self.scrollAreaWidgetContents.setGeometry(QRect(0, 0, 892, 577))
-        self.scrollArea.setWidget(self.scrollAreaWidgetContents)
+        self.message_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.chat_label = QLabel(Chat)
         self.chat_label.setObjectName("chat_label")
         self.chat_label.setGeometry(QRect(460, 20, 801, 40))
@@ -240,9 +238,19 @@ class Ui_Chat(object):
         self.message_size_label = QLabel(Chat)
         self.message_size_label.setObjectName("message_size_label")
         self.message_size_label.setGeometry(QRect(1100, 680, 101, 21))
-        self.message_size_label.setStyleSheet("background-color: transparent;\n" "color: #8b8d93;\n" "font-size: 14px;")
+        self.message_size_label.setStyleSheet(
+            "QLabel {\n"
+            "	background-color: transparent;\n"
+            "	color: #8b8d93;\n"
+            "	font-size: 14px;\n"
+            "}\n"
+            "\n"
+            'QLabel[full="true"] {\n'
+            "	color: #ff6d79;\n"
+            "}"
+        )
         self.message_size_label.setAlignment(Qt.AlignRight | Qt.AlignTrailing | Qt.AlignVCenter)
-        QWidget.setTabOrder(self.scrollArea, self.message_input)
+        QWidget.setTabOrder(self.message_view, self.message_input)
         QWidget.setTabOrder(self.message_input, self.send_button)
 
         self.retranslateUi(Chat)
@@ -0,0 +1,209 @@
+"""This module provides the MessageDelegate class used to paint the messages
+of the chat's GUI."""
+
+import collections
+
+from typing import Any, Dict, OrderedDict
+
+from PySide6.QtCore import QModelIndex, QPoint, QRect, QSize, Qt
+
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter
+
+from PySide6.QtWidgets import QStyleOptionViewItem, QStyledItemDelegate, QWidget
+
+from src.client.ui.custom.message_model import MESSAGE_ROLE
+from src.client.ui.custom.text_wrapper import TextWrapper
+
+from src.common.constants.constants import (
+    BLUE,
+    DARK_BLUE,
+    GREY,
+    MESSAGE_CACHE_SIZE,
+    MESSAGE_PADDING,
+    MESSAGE_RADIUS,
+    MESSAGE_SPACING,
+    MESSAGE_WIDTH,
+    NAME_MARGIN,
+    WHITE,
+)
+
+
+class MessageDelegate(QStyledItemDelegate):
+    """The MessageDelegate class is a child class of QStyledItemDelegate and
+    paints each message 'bubble' straight onto the chat view, instead of
+    building a widget tree per message. Only the rows on screen are painted,
+    and only their wrapped text is kept around.
+
+    Attributes:
+        wrapped_texts: the most recently painted messages' wrapped text, keyed by content
+    """
+
+    def __init__(self, parent: QWidget) -> None:
+        """Initialises the MessageDelegate instance.
+
+        Args:
+            parent: the chat view
+        """
+
+        super().__init__(parent)
+
+        self.wrapped_texts: OrderedDict[str, str] = collections.OrderedDict()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        """Returns the size of a message row.
+
+        Args:
+            option: the style options of the row
+            index: the index of the message
+
+        Returns: the size of the row
+        """
+
+        return QSize(MESSAGE_WIDTH, self.get_height(option.font, index.data(MESSAGE_ROLE)))
+
+    def get_height(self, font: QFont, message: Dict[str, Any]) -> int:
+        """Measures the height of a message row.
+
+        Args:
+            font: the font of the chat
+            message: the message
+
+        Returns: the height of the row
+        """
+
+        name_height = QFontMetrics(self.get_bold_font(font)).height()
+
+        if message["role"] != "client":
+            return MESSAGE_SPACING + name_height
+
+        text_height = self.get_text_rect(font, message["content"]).height()
+
+        return MESSAGE_SPACING + name_height + text_height + 2 * MESSAGE_PADDING
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        """Paints a message row.
+
+        Args:
+            painter: the painter of the chat view
+            option: the style options of the row
+            index: the index of the message
+        """
+
+        message = index.data(MESSAGE_ROLE)
+        rect = option.rect.adjusted(0, MESSAGE_SPACING, 0, 0)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        if message["role"] == "client":
+            self.paint_client_message(painter, option.font, rect, message["username"], message["content"])
+        else:
+            self.paint_server_message(painter, option.font, rect, message["content"])
+
+        painter.restore()
+
+    def paint_client_message(self, painter: QPainter, font: QFont, rect: QRect, sender: str, message: str) -> None:
+        """Paints a client message, based on who is sending it. The current
+        user's messages are on the right and everyone else's are on the left.
+
+        Args:
+            painter: the painter of the chat view
+            font: the font of the chat
+            rect: the area of the row
+            sender: the sender
+            message: the message
+        """
+
+        is_receiver = sender == "You"
+
+        bold_font = self.get_bold_font(font)
+        name_height = QFontMetrics(bold_font).height()
+        name_rect = rect.adjusted(NAME_MARGIN, 0, -NAME_MARGIN, 0)
+
+        painter.setFont(bold_font)
+        painter.setPen(QColor(*WHITE))
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignRight if is_receiver else Qt.AlignmentFlag.AlignLeft, sender)
+
+        text_rect = self.get_text_rect(font, message)
+        bubble_rect = QRect(0, 0, text_rect.width() + 2 * MESSAGE_PADDING, text_rect.height() + 2 * MESSAGE_PADDING)
+
+        if is_receiver:
+            bubble_rect.moveTopRight(QPoint(rect.right(), rect.top() + name_height))
+        else:
+            bubble_rect.moveTopLeft(QPoint(rect.left(), rect.top() + name_height))
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(*(BLUE if is_receiver else DARK_BLUE)))
+        painter.drawRoundedRect(bubble_rect, MESSAGE_RADIUS, MESSAGE_RADIUS)
+
+        painter.setFont(font)
+        painter.setPen(QColor(*(WHITE if is_receiver else GREY)))
+        painter.drawText(
+            bubble_rect.adjusted(MESSAGE_PADDING, MESSAGE_PADDING, -MESSAGE_PADDING, -MESSAGE_PADDING),
+            Qt.AlignmentFlag.AlignLeft,
+            self.get_wrapped_text(font, message),
+        )
+
+    def paint_server_message(self, painter: QPainter, font: QFont, rect: QRect, message: str) -> None:
+        """Paints a server message in the middle of the row.
+
+        Args:
+            painter: the painter of the chat view
+            font: the font of the chat
+            rect: the area of the row
+            message: the message sent from the server
+        """
+
+        painter.setFont(self.get_bold_font(font))
+        painter.setPen(QColor(*GREY))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignHCenter, message)
+
+    def get_bold_font(self, font: QFont) -> QFont:
+        """Returns the bold version of a font, used for names and server
+        messages.
+
+        Args:
+            font: the font of the chat
+
+        Returns: the bold font
+        """
+
+        bold_font = QFont(font)
+        bold_font.setBold(True)
+
+        return bold_font
+
+    def get_text_rect(self, font: QFont, message: str) -> QRect:
+        """Measures the wrapped text of a message.
+
+        Args:
+            font: the font of the chat
+            message: the message
+
+        Returns: the area taken up by the wrapped text
+        """
+
+        return QFontMetrics(font).boundingRect(QRect(0, 0, MESSAGE_WIDTH, 0), 0, self.get_wrapped_text(font, message))
+
+    def get_wrapped_text(self, font: QFont, message: str) -> str:
+        """Returns the wrapped text of a message. Only the most recently used
+        messages are kept, so memory does not grow with the chat.
+
+        Args:
+            font: the font of the chat
+            message: the message
+
+        Returns: the wrapped text
+        """
+
+        wrapped_text = self.wrapped_texts.get(message)
+
+        if wrapped_text is None:
+            wrapped_text = self.wrapped_texts[message] = TextWrapper.get_wrapped_text(message, font, MESSAGE_WIDTH)
+
+            if len(self.wrapped_texts) > MESSAGE_CACHE_SIZE:
+                self.wrapped_texts.popitem(last=False)
+        else:
+            self.wrapped_texts.move_to_end(message)
+
+        return wrapped_text
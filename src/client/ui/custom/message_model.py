@@ -0,0 +1,96 @@
+"""This module provides the MessageModel class holding the messages shown in
+the chat's GUI."""
+
+from typing import Any, Dict, List
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+MESSAGE_ROLE = Qt.ItemDataRole.UserRole
+
+
+class MessageModel(QAbstractListModel):
+    """The MessageModel class is a child class of QAbstractListModel and holds
+    the messages of the chat. Messages are plain data, the view only asks the
+    delegate to paint the rows that are visible.
+
+    Attributes:
+        messages: the messages, oldest first
+    """
+
+    def __init__(self) -> None:
+        """Initialises the MessageModel instance."""
+
+        super().__init__()
+
+        self.messages: List[Dict[str, Any]] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Returns the number of messages.
+
+        Args:
+            parent: the parent index, messages have no children
+
+        Returns: the number of messages
+        """
+
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        """Returns the data of a message for a role.
+
+        Args:
+            index: the index of the message
+            role: the role of the data
+
+        Returns: the content for the display role, the message for the message role, or nothing
+        """
+
+        if not index.isValid():
+            return None
+
+        message = self.messages[index.row()]
+
+        if role == MESSAGE_ROLE:
+            return message
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return message["content"]
+
+        return None
+
+    def append_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """Adds messages to the bottom of the chat.
+
+        Args:
+            messages: the messages, oldest first
+        """
+
+        if not messages:
+            return
+
+        count = len(self.messages)
+
+        self.beginInsertRows(QModelIndex(), count, count + len(messages) - 1)
+        self.messages.extend(messages)
+        self.endInsertRows()
+
+    def prepend_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """Adds older messages to the top of the chat.
+
+        Args:
+            messages: the older messages, oldest first
+        """
+
+        if not messages:
+            return
+
+        self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+        self.messages[:0] = messages
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        """Removes every message."""
+
+        self.beginResetModel()
+        self.messages.clear()
+        self.endResetModel()
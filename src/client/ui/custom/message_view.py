@@ -0,0 +1,277 @@
+"""This module provides the MessageView class used to show the messages of the
+chat's GUI."""
+
+import bisect
+import itertools
+
+from typing import List, Optional
+
+from PySide6.QtCore import QItemSelection, QItemSelectionModel, QModelIndex, QPoint, QRect, Qt
+
+from PySide6.QtGui import QPaintEvent, QPainter, QRegion
+
+from PySide6.QtWidgets import QAbstractItemView, QStyleOptionViewItem, QWidget
+
+
+class MessageView(QAbstractItemView):
+    """The MessageView class is a child class of QAbstractItemView and shows
+    the messages of the chat as a single column of rows painted by the item
+    delegate. Each row is measured once when it is inserted, and the position
+    of every row is kept as a running total of the row heights. Appending a
+    message only measures the new row, and painting only visits the rows on
+    screen, so neither slows down as the chat grows.
+
+    Attributes:
+        heights: the height of each message row
+        offsets: the position of the top of each message row, followed by the total height
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        """Initialises the MessageView instance.
+
+        Args:
+            parent: the parent widget
+        """
+
+        super().__init__(parent)
+
+        self.heights: List[int] = []
+        self.offsets: List[int] = [0]
+
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+
+    def get_view_option(self) -> QStyleOptionViewItem:
+        """Returns the style options passed to the item delegate.
+
+        Returns: the style options
+        """
+
+        option = QStyleOptionViewItem()
+        self.initViewItemOption(option)
+
+        return option
+
+    def update_offsets(self, start: int) -> None:
+        """Recomputes the position of every row from a row onwards.
+
+        Args:
+            start: the first row whose position changed
+        """
+
+        positions = itertools.accumulate(itertools.chain([self.offsets[start]], self.heights[start:]))
+        self.offsets[start:] = positions
+
+    def rowsInserted(self, parent: QModelIndex, start: int, end: int) -> None:
+        """Measures the inserted rows and shifts the rows after them.
+
+        Args:
+            parent: the parent index, messages have no parent
+            start: the first inserted row
+            end: the last inserted row
+        """
+
+        option = self.get_view_option()
+        delegate = self.itemDelegate()
+        model = self.model()
+
+        heights = [delegate.sizeHint(option, model.index(row, 0)).height() for row in range(start, end + 1)]
+
+        self.heights[start:start] = heights
+        self.update_offsets(start)
+
+        super().rowsInserted(parent, start, end)
+
+        self.updateGeometries()
+        self.viewport().update()
+
+    def rowsAboutToBeRemoved(self, parent: QModelIndex, start: int, end: int) -> None:
+        """Forgets the rows that are about to be removed.
+
+        Args:
+            parent: the parent index, messages have no parent
+            start: the first removed row
+            end: the last removed row
+        """
+
+        del self.heights[start : end + 1]
+        self.update_offsets(start)
+
+        super().rowsAboutToBeRemoved(parent, start, end)
+
+        self.updateGeometries()
+        self.viewport().update()
+
+    def reset(self) -> None:
+        """Forgets every row, then measures the rows of the reset model."""
+
+        super().reset()
+
+        self.heights = []
+        self.offsets = [0]
+
+        if self.model() is not None and self.model().rowCount():
+            self.rowsInserted(QModelIndex(), 0, self.model().rowCount() - 1)
+        else:
+            self.updateGeometries()
+            self.viewport().update()
+
+    def updateGeometries(self) -> None:
+        """Fits the scroll bar to the total height of the rows."""
+
+        height = self.viewport().height()
+        scroll_bar = self.verticalScrollBar()
+
+        scroll_bar.setPageStep(height)
+        scroll_bar.setSingleStep(max(1, height // 20))
+        scroll_bar.setRange(0, max(0, self.offsets[-1] - height))
+
+        super().updateGeometries()
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """Paints the rows that are on screen.
+
+        Args:
+            event: the paint event
+        """
+
+        painter = QPainter(self.viewport())
+        option = self.get_view_option()
+        delegate = self.itemDelegate()
+        model = self.model()
+
+        top = self.verticalOffset() + event.rect().top()
+        bottom = self.verticalOffset() + event.rect().bottom()
+        width = self.viewport().width()
+
+        row = max(0, bisect.bisect_right(self.offsets, top) - 1)
+
+        while row < len(self.heights) and self.offsets[row] <= bottom:
+            option.rect = QRect(0, self.offsets[row] - self.verticalOffset(), width, self.heights[row])
+            delegate.paint(painter, option, model.index(row, 0))
+            row += 1
+
+        painter.end()
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        """Scrolls the painted rows, so only the newly exposed rows are
+        painted.
+
+        Args:
+            dx: the horizontal distance scrolled
+            dy: the vertical distance scrolled
+        """
+
+        self.viewport().scroll(dx, dy)
+
+    def visualRect(self, index: QModelIndex) -> QRect:
+        """Returns the area of a row on screen.
+
+        Args:
+            index: the index of the message
+
+        Returns: the area of the row
+        """
+
+        if not index.isValid():
+            return QRect()
+
+        row = index.row()
+
+        return QRect(0, self.offsets[row] - self.verticalOffset(), self.viewport().width(), self.heights[row])
+
+    def indexAt(self, point: QPoint) -> QModelIndex:
+        """Returns the index of the row at a point on screen.
+
+        Args:
+            point: the point on screen
+
+        Returns: the index of the message or an invalid index
+        """
+
+        row = bisect.bisect_right(self.offsets, point.y() + self.verticalOffset()) - 1
+
+        if 0 <= row < len(self.heights):
+            return self.model().index(row, 0)
+
+        return QModelIndex()
+
+    def scrollTo(
+        self, index: QModelIndex, hint: QAbstractItemView.ScrollHint = QAbstractItemView.ScrollHint.EnsureVisible
+    ) -> None:
+        """Scrolls just enough to show a row.
+
+        Args:
+            index: the index of the message
+            hint: where the row should be shown, only ensuring it is visible is supported
+        """
+
+        if not index.isValid():
+            return
+
+        row = index.row()
+        scroll_bar = self.verticalScrollBar()
+
+        if self.offsets[row] < scroll_bar.value():
+            scroll_bar.setValue(self.offsets[row])
+        elif self.offsets[row + 1] > scroll_bar.value() + self.viewport().height():
+            scroll_bar.setValue(self.offsets[row + 1] - self.viewport().height())
+
+    def moveCursor(self, cursorAction: QAbstractItemView.CursorAction, modifiers: Qt.KeyboardModifier) -> QModelIndex:
+        """Messages cannot be selected, so there is no cursor to move.
+
+        Args:
+            cursorAction: the cursor action
+            modifiers: the keyboard modifiers
+
+        Returns: an invalid index
+        """
+
+        return QModelIndex()
+
+    def horizontalOffset(self) -> int:
+        """Rows always fit the width of the view.
+
+        Returns: no horizontal offset
+        """
+
+        return 0
+
+    def verticalOffset(self) -> int:
+        """Returns how far the view is scrolled down.
+
+        Returns: the vertical offset
+        """
+
+        return self.verticalScrollBar().value()
+
+    def isIndexHidden(self, index: QModelIndex) -> bool:
+        """Messages are never hidden.
+
+        Args:
+            index: the index of the message
+
+        Returns: False
+        """
+
+        return False
+
+    def setSelection(self, rect: QRect, command: QItemSelectionModel.SelectionFlag) -> None:
+        """Messages cannot be selected.
+
+        Args:
+            rect: the selected area
+            command: the selection command
+        """
+
+    def visualRegionForSelection(self, selection: QItemSelection) -> QRegion:
+        """Messages cannot be selected.
+
+        Args:
+            selection: the selection
+
+        Returns: an empty region
+        """
+
+        return QRegion()
@@ -0,0 +1,132 @@
+"""This module provides the text wrapping engine used to fit messages to the
+width of the chat."""
+
+import bisect
+import itertools
+
+from typing import Dict, List
+
+from PySide6.QtGui import QFont, QFontMetricsF
+
+
+class GlyphWidths(dict):
+    """The GlyphWidths class is a child class of dict and maps each character
+    to its advance in a font. A character is measured the first time it is
+    looked up, so a font only ever measures each character once.
+
+    Attributes:
+        font_metrics: the metrics of the font
+    """
+
+    def __init__(self, font: QFont) -> None:
+        """Initialises the GlyphWidths instance.
+
+        Args:
+            font: the font to measure
+        """
+
+        super().__init__()
+
+        self.font_metrics: QFontMetricsF = QFontMetricsF(font)
+
+    def __missing__(self, char: str) -> float:
+        """Measures a character that has not been looked up before.
+
+        Args:
+            char: the character
+
+        Returns: the advance of the character
+        """
+
+        width = self[char] = self.font_metrics.horizontalAdvance(char)
+
+        return width
+
+
+class TextWrapper:
+    """The TextWrapper class provides global static methods for wrapping text.
+    A paragraph is measured once, as a running total of the cached advances
+    of its characters, and the end of each line is found by a binary search
+    over that total. Wrapping is therefore linear in the length of the text,
+    instead of measuring every line again for each character added to it.
+
+    Attributes:
+        __GLYPH_WIDTHS: the cached character advances, keyed by font
+    """
+
+    __GLYPH_WIDTHS: Dict[str, GlyphWidths] = {}
+
+    @staticmethod
+    def get_glyph_widths(font: QFont) -> GlyphWidths:
+        """Returns the cached character advances of a font.
+
+        Args:
+            font: the font
+
+        Returns: the character advances
+        """
+
+        key = font.key()
+        glyph_widths = TextWrapper.__GLYPH_WIDTHS.get(key)
+
+        if glyph_widths is None:
+            glyph_widths = TextWrapper.__GLYPH_WIDTHS[key] = GlyphWidths(font)
+
+        return glyph_widths
+
+    @staticmethod
+    def get_wrapped_text(text: str, font: QFont, max_width: int) -> str:
+        """Returns the wrapped text for the original text. Existing line breaks
+        are kept.
+
+        Args:
+            text: the original text
+            font: the font that the text uses
+            max_width: the width of the text before wrapping
+
+        Returns: the wrapped text of the original text
+        """
+
+        glyph_widths = TextWrapper.get_glyph_widths(font)
+        lines: List[str] = []
+
+        for paragraph in text.split("\n"):
+            TextWrapper.wrap_paragraph(paragraph, glyph_widths, max_width, lines)
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def wrap_paragraph(paragraph: str, glyph_widths: GlyphWidths, max_width: int, lines: List[str]) -> None:
+        """Wraps a paragraph without line breaks. Each line ends at the last
+        space that fits, or is cut mid-word if its first word does not fit.
+        Spaces at a line break are dropped.
+
+        Args:
+            paragraph: the paragraph
+            glyph_widths: the character advances of the font
+            max_width: the width of the text before wrapping
+            lines: the wrapped lines, which the paragraph's lines are added to
+        """
+
+        advances = [0.0]
+        advances.extend(itertools.accumulate(map(glyph_widths.__getitem__, paragraph)))
+
+        start = 0
+
+        while advances[-1] - advances[start] > max_width:
+            end = max(start + 1, bisect.bisect_right(advances, advances[start] + max_width, start) - 1)
+
+            if paragraph[end] != " ":
+                space = paragraph.rfind(" ", start, end)
+
+                if space > start:
+                    end = space
+
+            lines.append(paragraph[start:end].rstrip(" "))
+
+            start = end
+
+            while start < len(paragraph) and paragraph[start] == " ":
+                start += 1
+
+        lines.append(paragraph[start:])
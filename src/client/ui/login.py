@@ -166,7 +166,14 @@ class Ui_Login(object):
         self.eye_icon.setGeometry(QRect(760, 593, 24, 24))
         self.eye_icon.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         self.eye_icon.setStyleSheet(
-            "QLabel {\n" "	image: url(:/icons/ui/icons/eye_closed.png);\n" "	background-color: transparent;\n" "}"
+            "QLabel {\n"
+            "	image: url(:/icons/ui/icons/eye_closed.png);\n"
+            "	background-color: transparent;\n"
+            "}\n"
+            "\n"
+            'QLabel[password_visible="true"] {\n'
+            "	image: url(:/icons/ui/icons/eye_opened.png);\n"
+            "}"
         )
         self.sign_up_button = QPushButton(Login)
         self.sign_up_button.setObjectName("sign_up_button")
@@ -166,7 +166,14 @@ class Ui_Signup(object):
         self.eye_icon.setGeometry(QRect(760, 593, 24, 24))
         self.eye_icon.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         self.eye_icon.setStyleSheet(
-            "QLabel {\n" "	image: url(:/icons/ui/icons/eye_closed.png);\n" "	background-color: transparent;\n" "}"
+            "QLabel {\n"
+            "	image: url(:/icons/ui/icons/eye_closed.png);\n"
+            "	background-color: transparent;\n"
+            "}\n"
+            "\n"
+            'QLabel[password_visible="true"] {\n'
+            "	image: url(:/icons/ui/icons/eye_opened.png);\n"
+            "}"
         )
         QWidget.setTabOrder(self.username_input, self.password_input)
         QWidget.setTabOrder(self.password_input, self.sign_up_button)
@@ -2,19 +2,15 @@
 
 from __future__ import annotations
 
-from typing import Any, TYPE_CHECKING
+from typing import Any, List, TYPE_CHECKING
 
 from PySide6.QtCore import Qt, Signal
 
 from PySide6.QtWidgets import (
     QApplication,
-    QHBoxLayout,
-    QLabel,
     QLineEdit,
     QMainWindow,
-    QSizePolicy,
     QStackedWidget,
-    QVBoxLayout,
     QWidget,
 )
 
@@ -22,10 +18,10 @@ from PySide6.QtWidgets import (
 from src.client.ui.chat import Ui_Chat
 from src.client.ui.login import Ui_Login
 from src.client.ui.signup import Ui_Signup
-from src.client.ui.custom.message_widget import MessageWidget
+from src.client.ui.custom.message_model import MessageModel
+from src.client.ui.custom.message_delegate import MessageDelegate
 
 from src.common.constants.constants import (
-    ICONS,
     MAXIMUM_MESSAGE_LENGTH,
     WINDOW_HEIGHT,
     WINDOW_TITLE,
@@ -43,6 +39,8 @@ class UI(QMainWindow):
 
     Attributes:
         new_message_signal: the new message signal
+        new_messages_signal: the new messages signal
+        history_signal: the older messages signal
         login_error_signal: the login error signal
         signup_error_signal: the signup error signal
         chat_label_signal: the chat label signal
@@ -54,11 +52,14 @@ class UI(QMainWindow):
         chat_widget: the chat widget
         signup: the signup instance
         signup_widget: the signup widget
-        chat_layout: the chat layout
+        message_model: the messages shown in the chat
         is_password_visible: is the password visible
+        history_offset: the distance from the bottom of the chat kept while older messages are added
     """
 
     new_message_signal: Signal = Signal(str, dict)
+    new_messages_signal: Signal = Signal(list)
+    history_signal: Signal = Signal(list)
     chat_label_signal: Signal = Signal(str)
     login_error_signal: Signal = Signal(str)
     signup_error_signal: Signal = Signal(str)
@@ -87,8 +88,9 @@ class UI(QMainWindow):
         self.signup: Ui_Signup = Ui_Signup()
         self.signup_widget: QWidget = QWidget()
 
-        self.chat_layout: QVBoxLayout = None
+        self.message_model: MessageModel = MessageModel()
         self.is_password_visible: int = 0
+        self.history_offset: int = 0
 
         self.initialise()
 
@@ -148,7 +150,7 @@ class UI(QMainWindow):
 
         self.login.error_label.hide()
 
-        self.chat_label_signal.connect(self.handle_second_username)
+        self.chat_label_signal.connect(self.handle_room)
         self.login_error_signal.connect(self.handle_server_login)
 
     def initialise_chat_page(self) -> None:
@@ -158,8 +160,8 @@ class UI(QMainWindow):
 
         self.stacked_widget.addWidget(self.chat_widget)
 
-        self.chat_layout = QVBoxLayout(self.chat.scrollAreaWidgetContents)
-        self.chat_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.chat.message_view.setModel(self.message_model)
+        self.chat.message_view.setItemDelegate(MessageDelegate(self.chat.message_view))
 
         self.chat.send_button.clicked.connect(self.handle_messaging)
 
@@ -168,10 +170,12 @@ class UI(QMainWindow):
         self.chat.message_input.textChanged.connect(self.handle_message_length)
         self.chat.message_input.returnPressed.connect(self.handle_messaging)
 
-        self.chat.scrollArea.setWidgetResizable(True)
-        self.chat.scrollArea.verticalScrollBar().rangeChanged.connect(self.scroll_to_bottom)
+        self.chat.message_view.verticalScrollBar().rangeChanged.connect(self.scroll_to_bottom)
+        self.chat.message_view.verticalScrollBar().valueChanged.connect(self.handle_scroll)
 
         self.new_message_signal.connect(self.add_message)
+        self.new_messages_signal.connect(self.add_messages)
+        self.history_signal.connect(self.add_history)
 
     def centre_window(self) -> None:
         """Centres the application window."""
@@ -185,115 +189,62 @@ class UI(QMainWindow):
         self.setGeometry(x, y, WINDOW_WIDTH, WINDOW_HEIGHT)
 
     def add_message(self, role: str, message: Any) -> None:
-        """Adds a message to the chat based on the role.
+        """Adds a message to the bottom of the chat, which is scrolled down to
+        show it.
 
         Args:
             role: the role can be client or server
             message: the message to be added
         """
 
-        if role == "client":
-            self.add_client_message(message["username"], message["content"])
-        else:
-            self.add_server_message(message["content"])
+        self.add_messages([message])
 
-    def add_client_message(self, sender: str, message: str) -> None:
-        """Adds a client message to the chat, based on who is sending it.
+    def add_messages(self, messages: List[Any]) -> None:
+        """Adds messages to the bottom of the chat, which is scrolled down to
+        show them. The messages are inserted together, so the chat is laid
+        out and scrolled once rather than once per message.
 
         Args:
-            sender: the sender
-            message: the message to be added
+            messages: the messages to be added, oldest first
         """
 
-        entry_layout = QVBoxLayout()
-        entry_layout.setSpacing(0)
-
-        name_label = QLabel(sender)
-        name_label.setSizePolicy(QSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Fixed))
-
-        message_widget = MessageWidget(message, sender)
-        message_layout = QHBoxLayout()
-
-        if sender != "You":
-            self.add_sender_message(message_widget, name_label, entry_layout, message_layout)
-        else:
-            self.add_receiver_message(message_widget, name_label, entry_layout, message_layout)
+        self.history_offset = 0
+        self.message_model.append_messages(messages)
 
-        entry_layout.addLayout(message_layout)
-
-        self.chat_layout.addLayout(entry_layout)
-        self.chat_layout.setSpacing(20)
-        self.chat_layout.setContentsMargins(0, 10, 0, 0)
-
-    def add_receiver_message(
-        self,
-        message_widget: MessageWidget,
-        name_label: QLabel,
-        entry_layout: QVBoxLayout,
-        message_layout: QHBoxLayout,
-    ) -> None:
-        """Adds the receiver's message to the chat.
+    def add_history(self, messages: List[Any]) -> None:
+        """Adds older messages to the top of the chat. The chat keeps its
+        distance from the bottom, so the messages being read stay in place.
 
         Args:
-            widget: the message widget
-            name_label: the name label
-            entry_layout: the entry layout
-            message_layout: the message layout
+            messages: the older messages, oldest first
         """
 
-        name_label.setStyleSheet("color: white; font-weight: bold; margin-right: 10px;")
-        entry_layout.addWidget(name_label, alignment=Qt.AlignmentFlag.AlignRight)
-        message_layout.addStretch()
-        message_layout.addWidget(message_widget)
-
-    def add_sender_message(
-        self,
-        message_widget: MessageWidget,
-        name_label: QLabel,
-        entry_layout: QVBoxLayout,
-        message_layout: QHBoxLayout,
-    ) -> None:
-        """Adds the sender's message to the chat.
+        scroll_bar = self.chat.message_view.verticalScrollBar()
+        self.history_offset = scroll_bar.maximum() - scroll_bar.value()
 
-        Args:
-            widget: the message widget
-            name_label: the name label
-            entry_layout: the entry layout
-            message_layout: the message layout
-        """
+        self.message_model.prepend_messages(messages)
 
-        name_label.setStyleSheet("color: white; font-weight: bold; margin-left: 10px;")
-        entry_layout.addWidget(name_label, alignment=Qt.AlignmentFlag.AlignLeft)
-        message_layout.addWidget(message_widget)
-        message_layout.addStretch()
-
-    def add_server_message(self, message: str) -> None:
-        """Adds a server message to the chat.
+    def handle_room(self, room: str) -> None:
+        """Handles the current user joining or leaving a room. It clears the
+        chat and updates the chat title to reflect which room the current user
+        is chatting in.
 
         Args:
-            message: the message sent from the server
+            room: the room name, empty if the current user has left the room
         """
 
-        server_message_label = QLabel(message)
-        server_message_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        server_message_label.setStyleSheet("color: #787b82; font-weight: bold;")
-
-        entry_layout = QVBoxLayout()
-        entry_layout.addWidget(server_message_label, alignment=Qt.AlignmentFlag.AlignCenter)
-
-        self.chat_layout.addLayout(entry_layout)
-        self.chat_layout.setSpacing(20)
-        self.chat_layout.setContentsMargins(0, 10, 0, 0)
+        self.clear_chat()
 
-    def handle_second_username(self, second_username: str) -> None:
-        """Handles the second user's username. It updates the chat title to
-        reflect who the current user is chatting with.
+        if room:
+            self.chat.chat_label.setText(f"YOU ARE CHATTING IN #{room}")
+        else:
+            self.chat.chat_label.setText("YOU ARE NOT IN A ROOM")
 
-        Args:
-            second_username: the second user's username
-        """
+    def clear_chat(self) -> None:
+        """Removes every message from the chat."""
 
-        self.chat.chat_label.setText(f"YOU ARE CHATTING WITH {second_username}")
+        self.history_offset = 0
+        self.message_model.clear()
 
     def handle_login(self) -> None:
         """Handles the client logging in."""
@@ -347,10 +298,7 @@ class UI(QMainWindow):
 
         self.chat.message_size_label.setText(f"{message_length}/{MAXIMUM_MESSAGE_LENGTH}")
 
-        if message_length == MAXIMUM_MESSAGE_LENGTH:
-            self.chat.message_size_label.setStyleSheet("background-color: transparent; color: #ff6d79; font-size: 14px;")
-        else:
-            self.chat.message_size_label.setStyleSheet("background-color: transparent; color: #8b8d93; font-size: 14px;")
+        self.set_style_property(self.chat.message_size_label, "full", message_length == MAXIMUM_MESSAGE_LENGTH)
 
     def handle_messaging(self) -> None:
         """Handles the client sending messages to other clients."""
@@ -360,11 +308,37 @@ class UI(QMainWindow):
         if not message:
             return
 
+        if self.handle_command(message):
+            self.chat.message_input.setText("")
+            return
+
         self.client.send({"type": "client_message", "message": message})
 
-        self.add_client_message("You", message)
+        self.add_message("client", {"role": "client", "username": "You", "content": message})
         self.chat.message_input.setText("")
 
+    def handle_command(self, message: str) -> bool:
+        """Handles chat commands. '/join <room>' moves the client into a room
+        and '/leave' removes the client from its current room.
+
+        Args:
+            message: the message typed by the client
+
+        Returns: the validity of the command
+        """
+
+        command, _, argument = message.partition(" ")
+
+        if command == "/join" and argument.strip():
+            self.client.send({"type": "client_join_room", "room": argument.strip()})
+            return True
+
+        if command == "/leave":
+            self.client.send({"type": "client_leave_room"})
+            return True
+
+        return False
+
     def toggle_login_password_visibility(self, event: Any) -> None:
         """Toggles the password visibility for the login page.
 
@@ -392,23 +366,54 @@ class UI(QMainWindow):
 
         self.is_password_visible ^= 1
 
-        icon = ICONS[self.is_password_visible]
-        widget.eye_icon.setStyleSheet(f"QLabel {{ image: url({icon}); background-color: transparent; }}")
+        self.set_style_property(widget.eye_icon, "password_visible", bool(self.is_password_visible))
 
         if self.is_password_visible:
             widget.password_input.setEchoMode(QLineEdit.Normal)
         else:
             widget.password_input.setEchoMode(QLineEdit.Password)
 
+    def set_style_property(self, widget: QWidget, name: str, value: bool) -> None:
+        """Switches a widget between the states styled by its stylesheet.
+        Stylesheets are only parsed when the pages are built, so switching
+        state only re-polishes the widget, and only when the state changes.
+
+        Args:
+            widget: the widget
+            name: the property used by the widget's stylesheet
+            value: the new state
+        """
+
+        if widget.property(name) == value:
+            return
+
+        widget.setProperty(name, value)
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+
     def scroll_to_bottom(self, min_val: int = None, max_val: int = None) -> None:
-        """Automatically scrolls the chat to the bottom.
+        """Automatically scrolls the chat to the bottom, or to where it was
+        before older messages were added to the top.
 
         Args:
             min_val: the minimum scroll value
             max_val: the maximum scroll value
         """
 
-        self.chat.scrollArea.verticalScrollBar().setValue(self.chat.scrollArea.verticalScrollBar().maximum())
+        scroll_bar = self.chat.message_view.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum() - self.history_offset)
+
+    def handle_scroll(self, value: int) -> None:
+        """Requests older messages once the chat is scrolled to the top.
+
+        Args:
+            value: the scroll value
+        """
+
+        scroll_bar = self.chat.message_view.verticalScrollBar()
+
+        if value == scroll_bar.minimum() and scroll_bar.maximum() > scroll_bar.minimum():
+            self.client.request_history()
 
     def show_login_page(self) -> None:
         """Switch to the login page."""
@@ -7,21 +7,7 @@ PATHS = {
     "database": ["src", "server", "database"],
     "keys": [".cache", "keys"],
     "certificates": [".cache", "certificates"],
-}
-
-CLIENT_TYPES = {
-    "server_assign_id",
-    "server_message",
-    "server_messages",
-    "server_login_error",
-    "server_signup_error",
-    "server_exchange_usernames",
-}
-
-SERVER_TYPES = {
-    "client_login",
-    "client_signup",
-    "client_message",
+    "profiles": [".cache", "profiles"],
 }
 
 COLLECTIONS = ["users", "messages"]
@@ -32,15 +18,61 @@ WINDOW_HEIGHT = 720
 
 MAXIMUM_MESSAGE_LENGTH = 1000
 
-ICONS = [":/icons/ui/icons/eye_closed.png", ":/icons/ui/icons/eye_opened.png"]
+# Logging
+LOGGING_MODE = "asynchronous"
+LOGGING_RATE_LIMITS = {"INFO": 1 << 9}
 
 # RSA
 KEY_LENGTH = 1 << 11
 CIPHER = "ECDHE-RSA-AES256-GCM-SHA384"
+TLS_VERSION = "TLSv1_2"
 
 # COLOURS
 RED = (255, 0, 0)
+WHITE = (255, 255, 255)
+GREY = (120, 123, 130)
+BLUE = (85, 66, 246)
+DARK_BLUE = (22, 27, 38)
+
+# Chat
+MESSAGE_WIDTH = 600
+MESSAGE_PADDING = 10
+MESSAGE_RADIUS = 15
+MESSAGE_SPACING = 20
+MESSAGE_CACHE_SIZE = 1 << 8
+NAME_MARGIN = 10
 
 # Client-server Constants
+CODEC_PREFERENCE = ["msgpack", "json"]
 HEADER_LENGTH = 1 << 2
-MAX_CLIENTS = 2
+FRAME_BUFFER_SIZE = 1 << 16
+MAXIMUM_FRAME_LENGTH = 1 << 24
+DEFAULT_ROOM = "general"
+HISTORY_PAGE_SIZE = 50
+MAXIMUM_HISTORY_PAGE_SIZE = 1 << 9
+SERVER_BACKLOG = 1 << 10
+SSL_HANDSHAKE_TIMEOUT = 10
+CONNECTION_TIMEOUT = 10
+OUTBOUND_QUEUE_SIZE = 1 << 8
+OUTBOUND_QUEUE_POLICY = "drop_oldest"
+OUTBOUND_QUEUE_TIMEOUT = 5
+AUTHENTICATION_QUEUE_SIZE = 1 << 6
+AUTHENTICATION_TIMEOUT = 10
+PRESENCE_SNAPSHOT_INTERVAL = 0
+MESSAGE_DURABILITY = "batched"
+MESSAGE_BATCH_SIZE = 1 << 7
+MESSAGE_BATCH_INTERVAL = 0.05
+
+# Cluster
+CLUSTER_SERVER = "server"
+CLUSTER_WORKERS = 0
+CLUSTER_SHUTDOWN_TIMEOUT = 10
+
+# Metrics
+METRICS_HOST = "localhost"
+METRICS_PORT = 0
+METRICS_BUCKETS = [0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# Profiling
+PROFILE_FUNCTIONS = 0
+PROFILER_INTERVAL = 0.005
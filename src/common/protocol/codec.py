@@ -0,0 +1,194 @@
+"""This module contains the codecs used to encode and decode the data sent
+between the client and the server."""
+
+import json
+
+from typing import Any, Dict, List, Union
+
+from src.common.constants.constants import CODEC_PREFERENCE
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Codec:
+    """The Codec class is the interface shared by all codecs.
+
+    Attributes:
+        name: the name the codec is negotiated by
+    """
+
+    name: str = ""
+
+    def encode(self, data: Any) -> bytes:
+        """Encodes the data.
+
+        Args:
+            data: the data to be encoded
+
+        Returns: the encoded data
+        """
+
+        raise NotImplementedError
+
+    def decode(self, payload: Union[bytes, memoryview]) -> Any:
+        """Decodes the payload.
+
+        Args:
+            payload: the encoded data
+
+        Returns: the decoded data
+        """
+
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """The JsonCodec class encodes data as UTF-8 JSON. Every client and server
+    supports it, so it is used until another codec is negotiated."""
+
+    name: str = "json"
+
+    def encode(self, data: Any) -> bytes:
+        """Encodes the data as compact JSON.
+
+        Args:
+            data: the data to be encoded
+
+        Returns: the encoded data
+        """
+
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, payload: Union[bytes, memoryview]) -> Any:
+        """Decodes a JSON payload.
+
+        Args:
+            payload: the encoded data
+
+        Returns: the decoded data
+        """
+
+        return json.loads(str(payload, "utf-8"))
+
+
+class MessagePackCodec(Codec):
+    """The MessagePackCodec class encodes data as MessagePack, a compact binary
+    encoding that is smaller and faster to parse than JSON."""
+
+    name: str = "msgpack"
+
+    def encode(self, data: Any) -> bytes:
+        """Encodes the data as MessagePack.
+
+        Args:
+            data: the data to be encoded
+
+        Returns: the encoded data
+        """
+
+        return msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, payload: Union[bytes, memoryview]) -> Any:
+        """Decodes a MessagePack payload.
+
+        Args:
+            payload: the encoded data
+
+        Returns: the decoded data
+        """
+
+        try:
+            return msgpack.unpackb(payload, raw=False)
+        except msgpack.UnpackException as exception:
+            raise ValueError(str(exception)) from exception
+
+
+class CodecRegistry:
+    """The CodecRegistry class provides global static methods for negotiating
+    and looking up codecs. Every frame carries a map, which JSON always
+    encodes with a leading '{' while MessagePack never does, so frames can be
+    decoded without knowing which codec the peer has switched to.
+
+    Attributes:
+        __JSON: the JSON codec
+        __CODECS: the available codecs keyed by name
+    """
+
+    __JSON: Codec = JsonCodec()
+    __CODECS: Dict[str, Codec] = {JsonCodec.name: __JSON}
+
+    if msgpack is not None:
+        __CODECS[MessagePackCodec.name] = MessagePackCodec()
+
+    @staticmethod
+    def get_default() -> Codec:
+        """Retrieves the codec used before a codec has been negotiated.
+
+        Returns: the JSON codec
+        """
+
+        return CodecRegistry.__JSON
+
+    @staticmethod
+    def get_names() -> List[str]:
+        """Retrieves the names of the available codecs in order of
+        preference.
+
+        Returns: the names of the available codecs
+        """
+
+        return [name for name in CODEC_PREFERENCE if name in CodecRegistry.__CODECS]
+
+    @staticmethod
+    def get(name: str) -> Union[Codec, None]:
+        """Retrieves the codec with the corresponding name.
+
+        Args:
+            name: the codec name
+
+        Returns: the codec or nothing if the codec is not available
+        """
+
+        return CodecRegistry.__CODECS.get(name)
+
+    @staticmethod
+    def negotiate(names: List[str]) -> Codec:
+        """Picks the most preferred codec that is also supported by the peer.
+
+        Args:
+            names: the names of the codecs supported by the peer
+
+        Returns: the agreed codec, JSON if no other codec is shared
+        """
+
+        for name in CodecRegistry.get_names():
+            if name in names:
+                return CodecRegistry.__CODECS[name]
+
+        return CodecRegistry.__JSON
+
+    @staticmethod
+    def decode(payload: Union[bytes, memoryview]) -> Any:
+        """Decodes a payload with the codec it was encoded with.
+
+        Args:
+            payload: the encoded data
+
+        Returns: the decoded data or nothing if the payload is malformed
+        """
+
+        if not payload:
+            return None
+
+        codec = CodecRegistry.__JSON if payload[0] == ord("{") else CodecRegistry.get(MessagePackCodec.name)
+
+        if codec is None:
+            return None
+
+        try:
+            return codec.decode(payload)
+        except ValueError:
+            return None
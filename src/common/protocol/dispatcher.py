@@ -0,0 +1,126 @@
+"""This module contains the code for dispatching the data sent between the
+client and the server to the corresponding RPC."""
+
+import operator
+
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from src.common.utilities.logger import Logger
+
+
+class Schema:
+    """The Schema class describes the fields an RPC expects. The field lookup
+    is compiled into a single itemgetter when the schema is created, so
+    validating data costs one call plus a type check per field.
+
+    Attributes:
+        fields: the required field names and their types
+        defaults: the optional field names and their default values
+        getter: the compiled lookup of the required fields
+        types: the types of the required fields
+    """
+
+    def __init__(self, fields: Dict[str, type], defaults: Optional[Dict[str, Any]] = None) -> None:
+        """Initialises the Schema instance.
+
+        Args:
+            fields: the required field names and their types
+            defaults: the optional field names and their default values
+        """
+
+        self.fields: Dict[str, type] = fields
+        self.defaults: Dict[str, Any] = defaults or {}
+        self.getter: Union[Callable[[Dict[str, Any]], Any], None] = operator.itemgetter(*fields) if fields else None
+        self.types: Tuple[type, ...] = tuple(fields.values())
+
+    def validate(self, data: Dict[str, Any]) -> Union[Tuple[Any, ...], None]:
+        """Validates the data and extracts the arguments of the RPC.
+
+        Args:
+            data: the data to be validated
+
+        Returns: the required and then the optional field values or nothing if the data is invalid
+        """
+
+        arguments: Tuple[Any, ...] = ()
+
+        if self.getter is not None:
+            try:
+                values = self.getter(data)
+            except KeyError:
+                return None
+
+            arguments = values if len(self.types) > 1 else (values,)
+
+            for value, expected in zip(arguments, self.types):
+                if not isinstance(value, expected):
+                    return None
+
+        if self.defaults:
+            arguments += tuple(data.get(field, default) for field, default in self.defaults.items())
+
+        return arguments
+
+
+class Dispatcher:
+    """The Dispatcher class maps each data type to its RPC and the schema of
+    its fields. Unknown types and invalid fields are rejected with a single
+    lookup.
+
+    Attributes:
+        name: the name used to prefix log messages
+        routes: the RPCs and their schemas keyed by data type
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialises the Dispatcher instance.
+
+        Args:
+            name: the name used to prefix log messages
+        """
+
+        self.name: str = name
+        self.routes: Dict[str, Tuple[Callable[..., None], Schema]] = {}
+
+    def register(self, type: str, handler: Callable[..., None], schema: Schema) -> None:
+        """Registers the RPC for a data type.
+
+        Args:
+            type: the data type
+            handler: the RPC, called with the dispatch arguments followed by the field values
+            schema: the schema of the fields
+        """
+
+        self.routes[type] = (handler, schema)
+
+    def dispatch(self, data: Any, *args: Any) -> bool:
+        """Validates the data and executes the corresponding RPC.
+
+        Args:
+            data: the data to be dispatched
+            *args: the arguments passed to the RPC before the field values
+
+        Returns: the validity of the data
+        """
+
+        if not isinstance(data, dict):
+            Logger.error(f"{self.name}: Data is not in the correct format")
+            return False
+
+        type = data.get("type")
+        route = self.routes.get(type) if isinstance(type, str) else None
+
+        if route is None:
+            Logger.error(f"{self.name}: 'type': {type} is not a valid type")
+            return False
+
+        handler, schema = route
+        arguments = schema.validate(data)
+
+        if arguments is None:
+            Logger.error(f"{self.name}: 'type': {type} has missing or invalid fields")
+            return False
+
+        handler(*args, *arguments)
+
+        return True
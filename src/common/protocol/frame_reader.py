@@ -0,0 +1,114 @@
+"""This module contains the code for reading length-prefixed frames from a
+socket without allocating a new buffer for every packet."""
+
+import struct
+
+from ssl import SSLSocket
+
+from typing import Union
+
+from src.common.constants.constants import FRAME_BUFFER_SIZE, HEADER_LENGTH, MAXIMUM_FRAME_LENGTH
+
+
+class FrameReader:
+    """The FrameReader class reads frames from a connection into a single
+    reusable buffer with recv_into. A frame is handed out as a memoryview of
+    the buffer, so no copies are made until the frame is decoded. The buffer
+    grows when a frame does not fit, and several frames can be read with a
+    single call to recv_into.
+
+    Attributes:
+        HEADER: the struct used to unpack the frame header
+        connection: the connection to read from
+        buffer: the reusable receive buffer
+        view: a memoryview of the receive buffer
+        start: the offset of the first unread byte in the buffer
+        end: the offset after the last received byte in the buffer
+    """
+
+    HEADER: struct.Struct = struct.Struct(">I")
+
+    def __init__(self, connection: SSLSocket, size: int = FRAME_BUFFER_SIZE) -> None:
+        """Initialises the FrameReader instance.
+
+        Args:
+            connection: the connection to read from
+            size: the initial size of the receive buffer
+        """
+
+        self.connection: SSLSocket = connection
+        self.buffer: bytearray = bytearray(size)
+        self.view: memoryview = memoryview(self.buffer)
+        self.start: int = 0
+        self.end: int = 0
+
+    def read(self) -> Union[memoryview, None]:
+        """Reads the next frame from the connection. The returned memoryview is
+        only valid until the next call, as the buffer is reused.
+
+        Returns: the frame without its header or nothing if the connection is closed
+        """
+
+        if not self.fill(HEADER_LENGTH):
+            return None
+
+        length = self.HEADER.unpack_from(self.buffer, self.start)[0]
+
+        if length > MAXIMUM_FRAME_LENGTH:
+            return None
+
+        if not self.fill(HEADER_LENGTH + length):
+            return None
+
+        offset = self.start + HEADER_LENGTH
+        self.start = offset + length
+
+        return self.view[offset : self.start]
+
+    def fill(self, length: int) -> bool:
+        """Receives data until at least length unread bytes are buffered.
+
+        Args:
+            length: the number of unread bytes required
+
+        Returns: False if the connection was closed before enough data was received
+        """
+
+        if self.end - self.start >= length:
+            return True
+
+        self.reserve(length)
+
+        while self.end - self.start < length:
+            received = self.connection.recv_into(self.view[self.end :])
+
+            if not received:
+                return False
+
+            self.end += received
+
+        return True
+
+    def reserve(self, length: int) -> None:
+        """Makes room for length unread bytes after the start of the buffer.
+        Unread bytes are moved to the front of the buffer, and the buffer is
+        only replaced by a larger one if that is not enough.
+
+        Args:
+            length: the number of unread bytes required
+        """
+
+        unread = self.end - self.start
+
+        if len(self.buffer) < length:
+            buffer = bytearray(max(length, len(self.buffer) << 1))
+            buffer[:unread] = self.view[self.start : self.end]
+
+            self.view.release()
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+        elif self.start:
+            self.view[:unread] = self.view[self.start : self.end]
+
+        self.start = 0
+        self.end = unread
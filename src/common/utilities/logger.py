@@ -1,13 +1,106 @@
 """This module provides custom defined logging APIs."""
 
+import os
+import time
+import queue
+import atexit
 import logging
 import datetime
+import threading
 
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener
+
+from typing import Any, Dict, Optional
 
 from src.common.utilities.utility import Utility
 
-from src.common.constants.constants import PATHS
+from src.common.constants.constants import LOGGING_MODE, LOGGING_RATE_LIMITS, PATHS
+
+
+class RateLimitFilter(logging.Filter):
+    """The RateLimitFilter class is a child class of logging.Filter and caps
+    how many records of a level are logged per second. Each limited level
+    has a bucket of tokens that refills at the level's rate, and a record is
+    dropped when its bucket is empty. The next record logged at that level
+    notes how many records were dropped before it.
+
+    Attributes:
+        rate_limits: the maximum number of records per second, keyed by level
+        tokens: the tokens left in each level's bucket
+        timestamps: when each level's bucket was last refilled
+        dropped: the number of records dropped for each level since the last one logged
+        lock: the lock guarding the buckets
+    """
+
+    def __init__(self, rate_limits: Dict[str, int]) -> None:
+        """Initialises the RateLimitFilter instance.
+
+        Args:
+            rate_limits: the maximum number of records per second, keyed by level name
+        """
+
+        super().__init__()
+
+        self.rate_limits: Dict[int, int] = {logging.getLevelName(name): limit for name, limit in rate_limits.items()}
+        self.tokens: Dict[int, float] = {level: float(limit) for level, limit in self.rate_limits.items()}
+        self.timestamps: Dict[int, float] = dict.fromkeys(self.rate_limits, time.monotonic())
+        self.dropped: Dict[int, int] = dict.fromkeys(self.rate_limits, 0)
+        self.lock: threading.Lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Takes a token for a record, if its level is limited.
+
+        Args:
+            record: the record
+
+        Returns: should the record be logged
+        """
+
+        level = record.levelno
+        limit = self.rate_limits.get(level)
+
+        if limit is None:
+            return True
+
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(limit, self.tokens[level] + (now - self.timestamps[level]) * limit)
+
+            self.timestamps[level] = now
+
+            if tokens < 1:
+                self.tokens[level] = tokens
+                self.dropped[level] += 1
+                return False
+
+            self.tokens[level] = tokens - 1
+
+            dropped = self.dropped[level]
+            self.dropped[level] = 0
+
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} earlier {record.levelname} messages were dropped)"
+
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """The DeferredQueueHandler class is a child class of QueueHandler that
+    puts records on the queue as they are. QueueHandler formats each record
+    before queueing it, which would keep the formatting on the thread that
+    logged it. Arguments of a queued record must therefore not be changed
+    after they are logged."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Returns the record unformatted.
+
+        Args:
+            record: the record
+
+        Returns: the record
+        """
+
+        return record
 
 
 class Logger:
@@ -16,53 +109,98 @@ class Logger:
 
     Attributes:
         __LOGGER: the logger
+        __LISTENER: the thread writing queued records, when logging asynchronously
     """
 
     __LOGGER: Any = logging.getLogger()
+    __LISTENER: Optional[QueueListener] = None
 
     @staticmethod
-    def setup() -> None:
+    def setup(mode: Optional[str] = None, rate_limits: Dict[str, int] = LOGGING_RATE_LIMITS) -> None:
         """Perform application configurations before running the chat
-        application."""
+        application. In synchronous mode records are formatted and written
+        by the thread that logs them. In asynchronous mode records are only
+        queued, and a background thread formats and writes them, so logging
+        does not wait on the disk or terminal.
+
+        Args:
+            mode: synchronous or asynchronous, defaults to the LOGGING_MODE environment variable
+            rate_limits: the maximum number of records per second, keyed by level name
+        """
+
+        if Logger.__LOGGER.handlers:
+            return
+
+        mode = mode or os.getenv("LOGGING_MODE", LOGGING_MODE)
 
         filename = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
         path = Utility.get_path(PATHS["logs"], [filename])
 
-        logging.basicConfig(
-            level=logging.INFO,
-            format="[%(asctime)s - %(levelname)s] %(message)s",
-            handlers=[
-                logging.FileHandler(path),
-                logging.StreamHandler(),
-            ],
-        )
+        formatter = logging.Formatter("[%(asctime)s - %(levelname)s] %(message)s")
+        handlers = [logging.FileHandler(path), logging.StreamHandler()]
+
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        if mode == "asynchronous":
+            records = queue.SimpleQueue()
+
+            Logger.__LISTENER = QueueListener(records, *handlers)
+            Logger.__LISTENER.start()
+
+            atexit.register(Logger.shutdown)
+
+            handlers = [DeferredQueueHandler(records)]
+
+        for handler in handlers:
+            Logger.__LOGGER.addHandler(handler)
+
+        Logger.__LOGGER.addFilter(RateLimitFilter(rate_limits))
+        Logger.__LOGGER.setLevel(logging.INFO)
+
+    @staticmethod
+    def shutdown() -> None:
+        """Writes the records still queued and stops the background thread,
+        when logging asynchronously."""
+
+        if Logger.__LISTENER is None:
+            return
+
+        Logger.__LISTENER.stop()
+        Logger.__LISTENER = None
 
     @staticmethod
-    def info(message: str) -> None:
-        """Logs information.
+    def info(message: str, *args: Any) -> None:
+        """Logs information. The message is only formatted with the arguments
+        if the record is written.
 
         Args:
             message: the message to be logged
+            args: the arguments of the message's % placeholders
         """
 
-        Logger.__LOGGER.info(message)
+        Logger.__LOGGER.info(message, *args)
 
     @staticmethod
-    def warn(message: str) -> None:
-        """Logs warning.
+    def warn(message: str, *args: Any) -> None:
+        """Logs warning. The message is only formatted with the arguments if
+        the record is written.
 
         Args:
             message: the message to be logged
+            args: the arguments of the message's % placeholders
         """
 
-        Logger.__LOGGER.warning(message)
+        Logger.__LOGGER.warning(message, *args)
 
     @staticmethod
-    def error(message: str) -> None:
-        """Logs error.
+    def error(message: str, *args: Any) -> None:
+        """Logs error. The message is only formatted with the arguments if the
+        record is written.
 
         Args:
             message: the message to be logged
+            args: the arguments of the message's % placeholders
         """
 
-        Logger.__LOGGER.error(message)
+        Logger.__LOGGER.error(message, *args)
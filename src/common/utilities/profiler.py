@@ -0,0 +1,243 @@
+"""This module provides the code for timing functions on the hot paths of the
+client and the server."""
+
+import os
+import time
+import bisect
+import asyncio
+import functools
+import threading
+import contextlib
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from src.common.constants.constants import METRICS_BUCKETS, PROFILE_FUNCTIONS
+
+load_dotenv()
+
+
+class Timings:
+    """The Timings class is the histogram of the time taken by every call to a
+    function, in nanoseconds. It is safe to record into from multiple
+    threads.
+
+    Attributes:
+        bounds: the upper bounds of the buckets in nanoseconds, in ascending order
+        counts: the number of calls in each bucket, the last one being unbounded
+        total: the total time taken by every call in nanoseconds
+        count: the number of calls
+        lock: the lock guarding the histogram
+    """
+
+    def __init__(self, bounds: List[int]) -> None:
+        """Initialises the Timings instance.
+
+        Args:
+            bounds: the upper bounds of the buckets in nanoseconds, in ascending order
+        """
+
+        self.bounds: List[int] = bounds
+        self.counts: List[int] = [0] * (len(bounds) + 1)
+        self.total: int = 0
+        self.count: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def record(self, elapsed: int) -> None:
+        """Records the time taken by a call.
+
+        Args:
+            elapsed: the time taken in nanoseconds
+        """
+
+        index = bisect.bisect_left(self.bounds, elapsed)
+
+        with self.lock:
+            self.counts[index] += 1
+            self.total += elapsed
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], int, int]:
+        """Returns a consistent copy of the histogram.
+
+        Returns: the number of calls in each bucket, the total time in nanoseconds and the number of calls
+        """
+
+        with self.lock:
+            return list(self.counts), self.total, self.count
+
+
+class Timer:
+    """The Timer class holds the time taken by a timed block of code.
+
+    Attributes:
+        elapsed: the seconds the block took, set once it is done
+    """
+
+    def __init__(self) -> None:
+        """Initialises the Timer instance."""
+
+        self.elapsed: float = 0.0
+
+
+class Profiler:
+    """The Profiler class provides global static methods to time functions and
+    blocks of code. The time taken by every call is recorded into a histogram
+    per function, which the server exposes with its metrics.
+
+    Timing is enabled by the PROFILE_FUNCTIONS environment variable when the
+    functions are defined. Otherwise functions are left as they are, so
+    timing them costs nothing.
+
+    Attributes:
+        __ENABLED: are functions timed
+        __BOUNDS: the upper bounds of the buckets in nanoseconds
+        __TIMINGS: the timings keyed by function name
+        __LOCK: the lock guarding the timings
+    """
+
+    __ENABLED: bool = bool(int(os.getenv("PROFILE_FUNCTIONS", PROFILE_FUNCTIONS)))
+    __BOUNDS: List[int] = [int(bound * 1e9) for bound in METRICS_BUCKETS]
+    __TIMINGS: Dict[str, Timings] = {}
+    __LOCK: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """Returns whether functions are timed.
+
+        Returns: are functions timed
+        """
+
+        return Profiler.__ENABLED
+
+    @staticmethod
+    def is_timed(function: Callable[..., Any]) -> bool:
+        """Returns whether a function, or a method bound to an object, is
+        timed by the profiler.
+
+        Args:
+            function: the function
+
+        Returns: is the function timed
+        """
+
+        return getattr(function, "timings", None) is not None
+
+    @staticmethod
+    def get_bounds() -> List[int]:
+        """Returns the upper bounds of the buckets of every histogram.
+
+        Returns: the upper bounds in nanoseconds, in ascending order
+        """
+
+        return list(Profiler.__BOUNDS)
+
+    @staticmethod
+    def get_timings(name: str) -> Timings:
+        """Returns the timings of a function, creating them on first use.
+
+        Args:
+            name: the function name
+
+        Returns: the timings of the function
+        """
+
+        with Profiler.__LOCK:
+            timings = Profiler.__TIMINGS.get(name)
+
+            if timings is None:
+                timings = Profiler.__TIMINGS[name] = Timings(Profiler.__BOUNDS)
+
+            return timings
+
+    @staticmethod
+    def snapshot() -> Dict[str, Tuple[List[int], int, int]]:
+        """Returns a copy of the timings of every function called so far.
+
+        Returns: the bucket counts, total time in nanoseconds and number of calls, keyed by function name
+        """
+
+        with Profiler.__LOCK:
+            timings = sorted(Profiler.__TIMINGS.items())
+
+        return {name: function.snapshot() for name, function in timings if function.count}
+
+    @staticmethod
+    def timed(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """A decorator factory that creates a decorator recording the time
+        taken by every call to a function or coroutine function.
+
+        Args:
+            name: the name the calls are recorded under, defaults to the qualified name of the function
+
+        Returns: a decorator that wraps a function to time it, or leaves it as it is if timing is disabled
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            """Decorator that times the wrapped function.
+
+            Args:
+                func: the function to be wrapped
+
+            Returns: the wrapped function returning the result of the original function
+            """
+
+            if not Profiler.__ENABLED:
+                return func
+
+            timings = Profiler.get_timings(name or func.__qualname__)
+
+            if asyncio.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    start = time.perf_counter_ns()
+
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        timings.record(time.perf_counter_ns() - start)
+
+                coroutine_wrapper.timings = timings
+
+                return coroutine_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter_ns()
+
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    timings.record(time.perf_counter_ns() - start)
+
+            wrapper.timings = timings
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    @contextlib.contextmanager
+    def measure(name: Optional[str] = None) -> Iterator[Timer]:
+        """Times the enclosed block of code. The time taken is always held by
+        the timer, and is also recorded under the name if timing is enabled.
+
+        Args:
+            name: the name the block is recorded under, if it is recorded
+
+        Returns: the timer holding the seconds the block took once it is done
+        """
+
+        timer = Timer()
+        start = time.perf_counter_ns()
+
+        try:
+            yield timer
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            timer.elapsed = elapsed / 1e9
+
+            if Profiler.__ENABLED and name is not None:
+                Profiler.get_timings(name).record(elapsed)
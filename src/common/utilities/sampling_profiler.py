@@ -0,0 +1,169 @@
+"""This module provides the code for sampling the stacks of every thread of a
+running process, to find out where its time goes."""
+
+import os
+import sys
+import time
+import datetime
+import threading
+import collections
+
+from types import FrameType
+
+from typing import Counter, List, Optional
+
+from src.common.utilities.logger import Logger
+from src.common.utilities.profiler import Profiler
+from src.common.utilities.utility import Utility
+
+from src.common.constants.constants import PATHS, PROFILER_INTERVAL
+
+
+class SamplingProfiler:
+    """The SamplingProfiler class samples the stack of every other thread at
+    a fixed interval, counting how often each stack is seen. Threads waiting
+    on a socket or a lock are sampled too, so the profile shows where the
+    wall-clock time of each thread goes rather than only its CPU time.
+
+    Once stopped, the samples are written in the collapsed stack format, one
+    stack and its count per line, which flamegraph.pl and speedscope turn
+    into a flame graph. The timings of the timed functions are written
+    alongside, if functions are timed.
+
+    Attributes:
+        name: the name the profiles are written under
+        interval: the seconds between samples
+        samples: the number of times each collapsed stack was seen since the profiler was started
+        running: set while the profiler is sampling
+        thread: the sampling thread
+        lock: the lock making sure the profiler is started and stopped once at a time
+    """
+
+    def __init__(self, name: str, interval: float = PROFILER_INTERVAL) -> None:
+        """Initialises the SamplingProfiler instance.
+
+        Args:
+            name: the name the profiles are written under
+            interval: the seconds between samples
+        """
+
+        self.name: str = name
+        self.interval: float = interval
+        self.samples: Counter[str] = collections.Counter()
+        self.running: threading.Event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.lock: threading.Lock = threading.Lock()
+
+    def toggle(self) -> None:
+        """Starts sampling if the profiler is stopped, or stops it and writes
+        the profile if it is sampling. The profile is written on a separate
+        thread, so the toggle can be called from a signal handler."""
+
+        with self.lock:
+            if self.thread is None:
+                self.start()
+                return
+
+            self.running.clear()
+            thread, self.thread = self.thread, None
+
+        writer = threading.Thread(target=self.finish, args=(thread, self.samples), daemon=True)
+        writer.start()
+
+    def start(self) -> None:
+        """Starts sampling in the background, into a new count of stacks."""
+
+        self.samples = collections.Counter()
+        self.running.set()
+
+        self.thread = threading.Thread(target=self.sample, args=(self.samples,), name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+        Logger.info(f"Profiler: Sampling every {self.interval * 1000:g} ms")
+
+    def sample(self, samples: Counter[str]) -> None:
+        """Samples the stack of every other thread at every interval until
+        the profiler is stopped.
+
+        Args:
+            samples: the number of times each collapsed stack was seen
+        """
+
+        current = threading.get_ident()
+
+        while self.running.is_set():
+            start = time.perf_counter()
+
+            for ident, frame in sys._current_frames().items():
+                if ident != current:
+                    samples[self.collapse(frame)] += 1
+
+            time.sleep(max(0, self.interval - (time.perf_counter() - start)))
+
+    def collapse(self, frame: FrameType) -> str:
+        """Collapses a stack into a single line, from the outermost frame to
+        the innermost one.
+
+        Args:
+            frame: the innermost frame of the stack
+
+        Returns: the frames of the stack separated by semicolons
+        """
+
+        frames: List[str] = []
+
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        return ";".join(reversed(frames))
+
+    def finish(self, thread: threading.Thread, samples: Counter[str]) -> None:
+        """Waits for the sampling thread to stop, then writes the profile.
+
+        Args:
+            thread: the sampling thread
+            samples: the number of times each collapsed stack was seen
+        """
+
+        thread.join()
+
+        try:
+            path = self.write(samples)
+        except OSError as exception:
+            Logger.error(f"Profiler: Could not write the profile: {exception}")
+            return
+
+        Logger.info(f"Profiler: Wrote {sum(samples.values())} samples to {path}")
+
+    def write(self, samples: Counter[str]) -> str:
+        """Writes the samples in the collapsed stack format, and the timings
+        of the timed functions if there are any.
+
+        Args:
+            samples: the number of times each collapsed stack was seen
+
+        Returns: the path to the profile
+        """
+
+        directory = Utility.get_path(PATHS["profiles"])
+        os.makedirs(directory, exist_ok=True)
+
+        filename = f"{self.name}_{os.getpid()}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        path = os.path.join(directory, f"{filename}.folded")
+
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+        timings = Profiler.snapshot()
+
+        if timings:
+            with open(os.path.join(directory, f"{filename}.timings"), "w", encoding="utf-8") as file:
+                file.write(f"{'function':<48} {'calls':>10} {'total ms':>12} {'mean us':>10}\n")
+
+                for name, (_, total, count) in sorted(timings.items(), key=lambda item: -item[1][1]):
+                    file.write(f"{name:<48} {count:>10} {total / 1e6:>12.3f} {total / count / 1e3:>10.3f}\n")
+
+        return path
@@ -1,12 +1,10 @@
 """This module provides useful global static methods for all classes."""
 
 import os
-import time
-import functools
 
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, ContextManager, List, Optional
 
-from PySide6.QtGui import QFont, QFontMetrics
+from src.common.utilities.profiler import Profiler, Timer
 
 
 class Utility:
@@ -48,71 +46,30 @@ class Utility:
         return data
 
     @staticmethod
-    def get_wrapped_text(text: str, font: QFont, max_width: int) -> str:
-        """Returns the wrapped text for the original text.
+    def timed_event(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """A decorator factory that creates a decorator to record the time
+        taken by every call to a method, or coroutine method, in a histogram
+        per method. Methods are only timed if the PROFILE_FUNCTIONS
+        environment variable is set.
 
         Args:
-            text: the original text
-            font: the font that the text uses
-            max_width: the width of the text before wrapping
+            name: the name the calls are recorded under, defaults to the qualified name of the method
 
-        Returns: the wrapped text of the original text
+        Returns: a decorator that wraps a method to time it, returning the result of the original method
         """
 
-        font_metrics = QFontMetrics(font)
-
-        wrapped_text = ""
-        line = ""
-
-        for char in text:
-            if font_metrics.horizontalAdvance(line + char) > max_width:
-                wrapped_text += line + "\n"
-                line = char
-            else:
-                line += char
-
-        wrapped_text += line
-
-        return wrapped_text
+        return Profiler.timed(name)
 
     @staticmethod
-    def timed_event() -> Callable[[Callable[..., Any]], Callable[..., float]]:
-        """A decorator factory that creates a decorator to measure the
-        execution time of methods.
-
-        Returns: a decorator that wraps a method to measure the execution time
-        """
-
-        def decorator(func: Callable[..., Any]) -> Callable[..., float]:
-            """Decorator that measures the execution time of the wrapped
-            method.
-
-            Args:
-                func: the method to be wrapped and executed
+    def timed_block(name: Optional[str] = None) -> ContextManager[Timer]:
+        """Returns a context manager measuring the time taken by the enclosed
+        block of code, also recorded under the name if PROFILE_FUNCTIONS is
+        set.
 
-            Returns: the wrapped method that returns the elapsed time of the original method
-            """
-
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs) -> float:
-                """Wrapped method that executes the original method and
-                measures its execution time.
-
-                Args:
-                    *args: variable length argument list for the original method
-                    **kwargs: arbitrary keyword arguments for the original method
-
-                Returns: the elapsed time that the original method took to execute
-                """
-
-                start_time = time.time()
-                func(*args, **kwargs)
-                end_time = time.time()
-
-                elapsed_time = end_time - start_time
-
-                return elapsed_time
+        Args:
+            name: the name the block is recorded under, if it is recorded
 
-            return wrapper
+        Returns: a context manager yielding the timer holding the seconds the block took
+        """
 
-        return decorator
+        return Profiler.measure(name)
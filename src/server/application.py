@@ -9,6 +9,7 @@ from src.client.ui.ui import UI
 from src.client.client import Client
 
 from src.common.utilities.logger import Logger
+from src.common.utilities.utility import Utility
 
 
 class Application:
@@ -32,9 +33,16 @@ class Application:
         """Connects the client to the server."""
 
         Logger.info("Client: Waiting for server to respond with id")
-        elapsed_time = self.client.connect()
+
+        try:
+            with Utility.timed_block() as timer:
+                self.client.connect()
+        except ConnectionError as exception:
+            Logger.error(f"Client: {exception}")
+            sys.exit(1)
+
         Logger.info(f"Client: Connected to the server with id: {self.client.id}")
-        Logger.info(f"Client: Connection took {elapsed_time} seconds")
+        Logger.info(f"Client: Connection took {timer.elapsed} seconds")
 
     def run(self) -> None:
         """Run the application.
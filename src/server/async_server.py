@@ -0,0 +1,311 @@
+"""This module contains the code for defining an asyncio server interface."""
+
+import struct
+import asyncio
+
+from concurrent.futures import BrokenExecutor, Future
+
+from typing import Any, Callable, List, Optional, Union
+
+from src.server.server import Server
+
+from src.server.context.context import Context
+from src.server.context.outbound_queue import AsyncOutboundQueue
+
+from src.common.utilities.logger import Logger
+from src.common.utilities.utility import Utility
+
+from src.common.constants.constants import HEADER_LENGTH, MAXIMUM_FRAME_LENGTH, SERVER_BACKLOG, SSL_HANDSHAKE_TIMEOUT
+
+
+class AsyncServer(Server):
+    """The AsyncServer class serves every client connection on a single event
+    loop instead of a thread per client. It shares the framing and the RPCs of
+    the Server class, only the transport is different.
+
+    Attributes:
+        server: the asyncio server listening for client connections
+        saturated: the clients whose full outbound queues the current sender must wait for
+    """
+
+    def __init__(self) -> None:
+        """Initialises the asyncio server class fields."""
+
+        super().__init__()
+
+        self.server: asyncio.AbstractServer = None
+        self.saturated: List[Context] = []
+
+    def get_listening_socket(self) -> None:
+        """The listening sockets are owned by the event loop, so no blocking
+        socket is created.
+
+        Returns: nothing
+        """
+
+        return None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handles a new client connection accepted by the event loop.
+
+        Args:
+            reader: the stream reader for the client connection
+            writer: the stream writer for the client connection
+        """
+
+        address = writer.get_extra_info("peername")
+
+        id = self.id
+        self.id += 1
+
+        context = self.register_client(id, writer)
+        Logger.info(f"Server: Client connection from {address}")
+
+        writer_task = asyncio.ensure_future(self.write_frames(context))
+
+        await self.handle_client_stream(id, reader)
+        await writer_task
+
+    def create_outbound_queue(self) -> AsyncOutboundQueue:
+        """Creates the outbound queue for a new client connection, drained by a
+        writer task on the event loop.
+
+        Returns: the outbound queue
+        """
+
+        return AsyncOutboundQueue(policy=self.queue_policy)
+
+    async def write_frames(self, context: Context) -> None:
+        """Writes the frames queued for a client to its stream until the queue
+        is closed. Waiting for the stream to drain lets a slow client fill up
+        its own queue.
+
+        Args:
+            context: the client context
+        """
+
+        writer = context.connection
+
+        try:
+            while True:
+                frame = await context.outbound.get()
+
+                if frame is None or writer.is_closing():
+                    break
+
+                writer.write(frame)
+
+                self.metrics.frames_sent.inc()
+                self.metrics.bytes_sent.inc(len(frame))
+
+                await writer.drain()
+        except OSError:
+            Logger.warn(f"Server: Could not write to client {context.id}")
+            context.outbound.close()
+
+    @Utility.timed_event()
+    async def handle_client_stream(self, id: int, reader: asyncio.StreamReader) -> None:
+        """Handles any data sent from the client until the client connection
+        is closed.
+
+        Args:
+            id: the client connection id
+            reader: the stream reader for the client connection
+        """
+
+        connection = self.clients[id].connection
+
+        try:
+            while True:
+                data = await self.receive_stream(reader)
+
+                if not data:
+                    break
+
+                if not self.handle_client_frame(id, data):
+                    break
+
+                await self.wait_for_saturated_clients()
+        except OSError:
+            Logger.warn(f"Server: Client {id} connection was lost")
+        finally:
+            self.disconnect_client(id, connection)
+
+    @Utility.timed_event()
+    async def receive_stream(self, reader: asyncio.StreamReader) -> Union[bytes, None]:
+        """Receive data based on the length of the incoming data. Either all or
+        no data is returned. Frames longer than the maximum frame length are
+        refused before they are read, like the threaded server does.
+
+        Args:
+            reader: the stream reader for the client connection
+
+        Returns: data in the form of bytes or nothing
+        """
+
+        try:
+            raw_length = await reader.readexactly(HEADER_LENGTH)
+            length = struct.unpack(">I", raw_length)[0]
+
+            if length > MAXIMUM_FRAME_LENGTH:
+                Logger.warn(f"Server: Refused a frame of {length} bytes, the maximum is {MAXIMUM_FRAME_LENGTH}")
+                return None
+
+            return await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return None
+
+    def await_authentication(self, future: Optional[Future], callback: Callable[[Any], None]) -> None:
+        """Waits for an authentication job in a separate task, so the event
+        loop keeps serving other clients meanwhile.
+
+        Args:
+            future: the future result of the job or nothing if it was rejected
+            callback: the function called with the result or nothing if it failed
+        """
+
+        if future is None:
+            callback(None)
+            return
+
+        asyncio.ensure_future(self.wait_for_authentication(future, callback))
+
+    async def wait_for_authentication(self, future: Future, callback: Callable[[Any], None]) -> None:
+        """Waits for an authentication job without blocking the event loop. A
+        job that is still queued when the timeout runs out is cancelled. A
+        job that raised is logged and treated as failed, so the callback is
+        always called.
+
+        Args:
+            future: the future result of the job
+            callback: the function called with the result or nothing if it failed
+        """
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.authenticator.timeout)
+        except asyncio.TimeoutError:
+            Logger.warn("Server: Authentication job timed out")
+            result = None
+        except BrokenExecutor:
+            Logger.error("Server: Authentication pool is unavailable")
+            result = None
+        except Exception as exception:
+            Logger.error(f"Server: Authentication job failed: {exception!r}")
+            result = None
+
+        callback(result)
+        await self.wait_for_saturated_clients()
+
+    def send_frame(self, context: Context, frame: bytes) -> None:
+        """Queues an encoded frame to be written to the client without blocking
+        the event loop. Clients whose queues fill up under the block policy
+        are remembered, so the sender can wait for them to drain.
+
+        Args:
+            context: the client context
+            frame: the encoded frame
+        """
+
+        super().send_frame(context, frame)
+
+        if context.outbound.is_saturated():
+            self.saturated.append(context)
+
+    async def wait_for_saturated_clients(self) -> None:
+        """Waits for the clients whose queues were filled by the current sender
+        to drain them. Clients that do not drain in time are disconnected."""
+
+        saturated, self.saturated = self.saturated, []
+
+        for context in saturated:
+            if not await context.outbound.wait_for_space():
+                self.disconnect_slow_client(context)
+
+    def disconnect_slow_client(self, context: Context) -> None:
+        """Disconnects a client that does not drain its outbound queue. The
+        transport is aborted, so the client stream handler cleans up the
+        client as if it had disconnected.
+
+        Args:
+            context: the client context
+        """
+
+        Logger.warn(f"Server: Client {context.id} is too slow, disconnecting")
+        context.outbound.close()
+        context.connection.transport.abort()
+
+    def start(self) -> None:
+        """Starts the server and serves client connections until the server is
+        closed.
+
+        If the server connection closes, then client connections will
+        also be closed.
+        """
+
+        self.install_profiler_toggle()
+
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            Logger.info("Server: Server connection was closed manually via keyboard interrupt")
+
+    async def serve(self) -> None:
+        """Listens for client connections on the event loop."""
+
+        host, port = self.get_address()
+        Logger.info(f"Server: Listening for connections on {host}:{port}")
+
+        self.server = await asyncio.start_server(
+            self.handle_connection,
+            host,
+            port,
+            ssl=self.ssl_context,
+            backlog=SERVER_BACKLOG,
+            reuse_port=self.is_port_shared() or None,
+            ssl_handshake_timeout=SSL_HANDSHAKE_TIMEOUT,
+        )
+
+        self.start_metrics_endpoint()
+        self.start_presence_snapshots()
+
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.shutdown()
+
+    def start_presence_snapshots(self) -> None:
+        """Starts writing snapshots of the users who are online to the
+        database in a task on the event loop, if snapshots are enabled."""
+
+        if self.presence_snapshot_interval <= 0:
+            return
+
+        asyncio.ensure_future(self.schedule_presence_snapshots())
+
+    async def schedule_presence_snapshots(self) -> None:
+        """Writes a snapshot of the users who are online at every interval,
+        without blocking the event loop in between."""
+
+        while True:
+            await asyncio.sleep(self.presence_snapshot_interval)
+            self.snapshot_presence()
+
+    def disconnect_server(self) -> None:
+        """Stops listening for client connections."""
+
+        if self.server is None:
+            Logger.warn("CLI: Server is already disconnected")
+            return
+
+        self.server.close()
+        self.server = None
+
+        Logger.info("Server: Server disconnected")
+
+
+if __name__ == "__main__":
+    Logger.setup()
+
+    AsyncServer().start()
@@ -0,0 +1,177 @@
+"""This module contains the code for running password hashing and
+verification off the threads that serve client connections."""
+
+import os
+import time
+import functools
+import threading
+import multiprocessing
+
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor, TimeoutError
+
+from typing import Any, Callable, Optional, Union
+
+from src.server.metrics.metrics_registry import NULL_METRIC, Histogram, NullMetric
+
+from src.common.utilities.logger import Logger
+from src.common.utilities.security import Security
+
+from src.common.constants.constants import AUTHENTICATION_QUEUE_SIZE, AUTHENTICATION_TIMEOUT
+
+
+class Authenticator:
+    """The Authenticator class runs bcrypt in a bounded pool of worker
+    processes. bcrypt is slow by design, so a burst of logins is spread over
+    the workers instead of stalling the server. Jobs beyond the workers wait
+    in a bounded queue, and jobs beyond the queue are rejected straight away.
+
+    Attributes:
+        workers: the number of worker processes
+        timeout: how long a job may take before it is given up on
+        slots: the slots left for running and queued jobs
+        pending: the number of running and queued jobs
+        lock: the lock guarding the number of pending jobs
+        histogram: the histogram the time taken by each job is recorded into
+        executor: the pool of worker processes
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: int = AUTHENTICATION_QUEUE_SIZE,
+        timeout: float = AUTHENTICATION_TIMEOUT,
+        histogram: Union[Histogram, NullMetric] = NULL_METRIC,
+    ) -> None:
+        """Initialises the Authenticator instance. Workers are spawned rather
+        than forked, as the server is already running threads.
+
+        Args:
+            workers: the number of worker processes, defaults to the number of CPUs
+            queue_size: the maximum number of jobs waiting for a worker
+            timeout: how long a job may take before it is given up on
+            histogram: the histogram the time taken by each job is recorded into
+        """
+
+        self.workers: int = workers or os.cpu_count() or 1
+        self.timeout: float = timeout
+        self.slots: threading.BoundedSemaphore = threading.BoundedSemaphore(self.workers + queue_size)
+        self.pending: int = 0
+        self.lock: threading.Lock = threading.Lock()
+        self.histogram: Union[Histogram, NullMetric] = histogram
+        self.executor: ProcessPoolExecutor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def check_password(self, password: str, hashed_password: str) -> Optional[Future]:
+        """Submits a password check.
+
+        Args:
+            password: the password
+            hashed_password: the hashed password
+
+        Returns: the future validity of the match or nothing if the pool is busy
+        """
+
+        return self.submit(Security.check_password, password, hashed_password)
+
+    def hash_password(self, password: str) -> Optional[Future]:
+        """Submits a password to be hashed.
+
+        Args:
+            password: the plain text password
+
+        Returns: the future hashed password or nothing if the pool is busy
+        """
+
+        return self.submit(Security.get_hashed_password, password)
+
+    def submit(self, function: Callable, *args: Any) -> Optional[Future]:
+        """Submits a job to the pool if there is a slot left for it.
+
+        Args:
+            function: the function to run in a worker process
+            args: the arguments of the function
+
+        Returns: the future result of the job or nothing if the pool is busy
+        """
+
+        if not self.slots.acquire(blocking=False):
+            Logger.warn("Server: Authentication queue is full, rejecting job")
+            return None
+
+        start = time.perf_counter()
+
+        try:
+            future = self.executor.submit(function, *args)
+        except (BrokenExecutor, RuntimeError):
+            Logger.error("Server: Authentication pool is unavailable")
+            self.slots.release()
+            return None
+
+        with self.lock:
+            self.pending += 1
+
+        future.add_done_callback(functools.partial(self.release, function.__name__, start))
+
+        return future
+
+    def release(self, name: str, start: float, future: Future) -> None:
+        """Frees the slot of a finished or cancelled job, and records the
+        time a finished job took.
+
+        Args:
+            name: the name of the function run by the job
+            start: when the job was submitted
+            future: the future of the job
+        """
+
+        with self.lock:
+            self.pending -= 1
+
+        self.slots.release()
+
+        if not future.cancelled():
+            self.histogram.observe(time.perf_counter() - start, (name,))
+
+    def get_pending(self) -> int:
+        """Returns the number of running and queued jobs.
+
+        Returns: the number of pending jobs
+        """
+
+        return self.pending
+
+    def wait(self, future: Optional[Future]) -> Union[Any, None]:
+        """Blocks until a job is done. A job that is still queued when the
+        timeout runs out is cancelled. A job that raised, for example on a
+        corrupt stored hash, is logged and treated as failed.
+
+        Args:
+            future: the future of the job
+
+        Returns: the result of the job or nothing if it failed
+        """
+
+        if future is None:
+            return None
+
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            Logger.warn("Server: Authentication job timed out")
+            future.cancel()
+        except BrokenExecutor:
+            Logger.error("Server: Authentication pool is unavailable")
+        except Exception as exception:
+            Logger.error(f"Server: Authentication job failed: {exception!r}")
+
+        return None
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stops the worker processes, by default without waiting for running
+        jobs. A process that is itself a multiprocessing child must wait, as
+        it joins its children on exit before the pool is told to stop.
+
+        Args:
+            wait: should running jobs be waited for
+        """
+
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,166 @@
+"""This module contains the code for relaying the messages sent to rooms
+between the workers of a cluster."""
+
+import threading
+
+from multiprocessing.connection import Client, Connection, Listener
+
+from typing import Any, Callable, List
+
+from src.common.utilities.logger import Logger
+
+
+class MessageBus:
+    """The MessageBus class relays the data sent to rooms between workers over
+    a Unix socket. The data published by a worker is relayed to every other
+    worker without being decoded, and each worker sends it to the members of
+    the room it serves.
+
+    Attributes:
+        listener: the listener accepting worker connections
+        connections: the connections of the workers
+        lock: the lock guarding the connections, also making sure relayed data is not interleaved
+    """
+
+    def __init__(self, authkey: bytes) -> None:
+        """Initialises the MessageBus instance. The Unix socket is created in
+        a temporary directory that is removed on exit.
+
+        Args:
+            authkey: the key workers authenticate with
+        """
+
+        self.listener: Listener = Listener(family="AF_UNIX", authkey=authkey)
+        self.connections: List[Connection] = []
+        self.lock: threading.Lock = threading.Lock()
+
+    def start(self) -> None:
+        """Accepts worker connections in the background."""
+
+        thread = threading.Thread(target=self.accept, daemon=True)
+        thread.start()
+
+    def accept(self) -> None:
+        """Accepts worker connections until the bus is closed, and relays the
+        data of each on its own thread."""
+
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                break
+
+            with self.lock:
+                self.connections.append(connection)
+
+            thread = threading.Thread(target=self.relay, args=(connection,), daemon=True)
+            thread.start()
+
+    def relay(self, connection: Connection) -> None:
+        """Relays the data published by a worker to every other worker until
+        the worker disconnects.
+
+        Args:
+            connection: the worker connection
+        """
+
+        try:
+            while True:
+                data = connection.recv_bytes()
+
+                with self.lock:
+                    for other in self.connections:
+                        if other is not connection:
+                            other.send_bytes(data)
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self.lock:
+                if connection in self.connections:
+                    self.connections.remove(connection)
+
+            connection.close()
+
+    def close(self) -> None:
+        """Stops accepting worker connections and disconnects every worker."""
+
+        self.listener.close()
+
+        with self.lock:
+            for connection in self.connections:
+                connection.close()
+
+
+class MessageBusConnection:
+    """The MessageBusConnection class is a worker's connection to the message
+    bus. It publishes the data sent to rooms by the worker, and hands the
+    data published by other workers to a callback on a background thread.
+
+    Attributes:
+        connection: the connection to the bus
+        receive: the function called with the room name and data published by other workers
+        disconnect: the function called if the bus closes the connection
+        closed: has the worker closed the connection
+        lock: the lock making sure published data is not interleaved
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: bytes,
+        receive: Callable[[str, Any], None],
+        disconnect: Callable[[], None],
+    ) -> None:
+        """Initialises the MessageBusConnection instance.
+
+        Args:
+            address: the path of the Unix socket
+            authkey: the key to authenticate with
+            receive: the function called with the room name and data published by other workers
+            disconnect: the function called if the bus closes the connection
+        """
+
+        self.connection: Connection = Client(address, "AF_UNIX", authkey=authkey)
+        self.receive: Callable[[str, Any], None] = receive
+        self.disconnect: Callable[[], None] = disconnect
+        self.closed: bool = False
+        self.lock: threading.Lock = threading.Lock()
+
+    def start(self) -> None:
+        """Receives the data published by other workers in the background."""
+
+        thread = threading.Thread(target=self.receive_all, daemon=True)
+        thread.start()
+
+    def publish(self, room: str, data: Any) -> None:
+        """Publishes data sent to a room to the other workers.
+
+        Args:
+            room: the room name
+            data: the data sent to the room
+        """
+
+        try:
+            with self.lock:
+                self.connection.send((room, data))
+        except OSError:
+            Logger.warn(f"Server: Could not publish to room {room}, the message bus is closed")
+
+    def receive_all(self) -> None:
+        """Receives the data published by other workers until the connection
+        is closed."""
+
+        try:
+            while True:
+                room, data = self.connection.recv()
+                self.receive(room, data)
+        except (EOFError, OSError):
+            if not self.closed:
+                Logger.error("Server: Message bus closed the connection")
+                self.disconnect()
+
+    def close(self) -> None:
+        """Closes the connection to the bus."""
+
+        self.closed = True
+        self.connection.close()
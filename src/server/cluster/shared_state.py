@@ -0,0 +1,63 @@
+"""This module contains the code for sharing the state of the server between
+the processes of a cluster."""
+
+import threading
+
+from multiprocessing.managers import BaseManager
+
+from typing import NamedTuple
+
+from src.server.database.database import Database
+
+from src.server.presence.presence_registry import PresenceRegistry
+
+
+class PresenceOwner(NamedTuple):
+    """The PresenceOwner class identifies the client connection a user is
+    online on, across every worker of a cluster.
+
+    Attributes:
+        username: the username
+        worker: the index of the worker serving the client connection
+        id: the client id within the worker
+    """
+
+    username: str
+    worker: int
+    id: int
+
+
+class SharedState(BaseManager):
+    """The SharedState class serves the database and the presence registry of
+    a cluster from the supervisor process over a Unix socket. Workers call
+    them through proxies, so record ids, usernames and presence stay
+    consistent whichever worker serves a client. Every worker thread gets its
+    own connection, and the database is safe to use from the threads serving
+    them."""
+
+    @staticmethod
+    def serve(database: Database, presence: PresenceRegistry, authkey: bytes) -> str:
+        """Serves the state to the workers in the background, on a Unix socket
+        in a temporary directory that is removed on exit.
+
+        Args:
+            database: the database
+            presence: the presence registry
+            authkey: the key workers authenticate with
+
+        Returns: the path of the Unix socket
+        """
+
+        SharedState.register("get_database", callable=lambda: database)
+        SharedState.register("get_presence", callable=lambda: presence)
+
+        server = SharedState(authkey=authkey).get_server()
+
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        return server.address
+
+
+SharedState.register("get_database")
+SharedState.register("get_presence")
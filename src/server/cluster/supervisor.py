@@ -0,0 +1,204 @@
+"""This module contains the code for running the server as a cluster of
+worker processes."""
+
+import os
+import time
+import signal
+import multiprocessing
+
+from multiprocessing.connection import wait
+
+from typing import List
+
+from dotenv import load_dotenv
+
+from src.server.database.database import Database
+from src.server.database.write_behind_queue import Durability
+
+from src.server.presence.presence_registry import PresenceRegistry
+
+from src.server.cluster.message_bus import MessageBus
+from src.server.cluster.shared_state import SharedState
+from src.server.cluster.worker import WORKERS, run_worker
+
+from src.common.utilities.logger import Logger
+from src.common.utilities.sampling_profiler import SamplingProfiler
+
+from src.common.constants.constants import (
+    CLUSTER_SERVER,
+    CLUSTER_SHUTDOWN_TIMEOUT,
+    CLUSTER_WORKERS,
+    MESSAGE_BATCH_INTERVAL,
+    MESSAGE_BATCH_SIZE,
+    MESSAGE_DURABILITY,
+    PRESENCE_SNAPSHOT_INTERVAL,
+    PROFILER_INTERVAL,
+)
+
+load_dotenv()
+
+
+class Supervisor:
+    """The Supervisor class runs the server as several worker processes, so
+    decoding, encoding and TLS are spread over every CPU instead of sharing
+    one interpreter lock. Workers listen on the same port with SO_REUSEPORT,
+    and the kernel spreads new connections between them. The supervisor
+    owns the database and the presence registry, which workers use over a
+    Unix socket, and relays the data sent to rooms between workers over the
+    message bus, so members of a room can chat from different workers.
+
+    If a worker exits, the supervisor stops the whole cluster rather than
+    leaving its users unreachable, so it can be restarted cleanly.
+
+    Sending SIGUSR1 to the supervisor toggles the sampling profiler of the
+    supervisor, which serves the database, and of every worker.
+
+    Attributes:
+        kind: the kind of server each worker runs, server or async_server
+        workers: the number of worker processes
+        authkey: the key workers authenticate with
+        database: the database shared by the workers
+        presence: the users who are online on any worker
+        presence_snapshot_interval: the seconds between snapshots of the users who are online, disabled if not positive
+        snapshot_version: the version of the presence registry last written to the database
+        bus: the message bus relaying data between workers
+        processes: the worker processes
+        profiler: the sampling profiler of the supervisor
+    """
+
+    def __init__(self, kind: str = CLUSTER_SERVER, workers: int = CLUSTER_WORKERS) -> None:
+        """Initialises the Supervisor instance.
+
+        Args:
+            kind: the kind of server each worker runs, server or async_server
+            workers: the number of worker processes, defaults to the number of CPUs
+        """
+
+        if kind not in WORKERS:
+            raise ValueError(f"Unknown kind of server: {kind}")
+
+        self.kind: str = kind
+        self.workers: int = workers or os.cpu_count() or 1
+        self.authkey: bytes = os.urandom(32)
+        self.database: Database = Database(
+            Durability(os.getenv("MESSAGE_DURABILITY", MESSAGE_DURABILITY)),
+            int(os.getenv("MESSAGE_BATCH_SIZE", MESSAGE_BATCH_SIZE)),
+            float(os.getenv("MESSAGE_BATCH_INTERVAL", MESSAGE_BATCH_INTERVAL)),
+        )
+        self.presence: PresenceRegistry = PresenceRegistry()
+        self.presence_snapshot_interval: float = float(os.getenv("PRESENCE_SNAPSHOT_INTERVAL", PRESENCE_SNAPSHOT_INTERVAL))
+        self.snapshot_version: int = 0
+        self.bus: MessageBus = MessageBus(self.authkey)
+        self.processes: List[multiprocessing.Process] = []
+        self.profiler: SamplingProfiler = SamplingProfiler(
+            type(self).__name__, float(os.getenv("PROFILER_INTERVAL", PROFILER_INTERVAL))
+        )
+
+    def start(self) -> None:
+        """Serves the shared state, starts the workers, and supervises them
+        until a worker exits or the supervisor is interrupted. Workers are
+        spawned rather than forked, as the supervisor is already running
+        threads. Unless set, the authentication workers are split between
+        the workers."""
+
+        state_address = SharedState.serve(self.database, self.presence, self.authkey)
+        self.bus.start()
+
+        os.environ.setdefault("AUTHENTICATION_WORKERS", str(max(1, (os.cpu_count() or 1) // self.workers)))
+
+        context = multiprocessing.get_context("spawn")
+
+        for index in range(self.workers):
+            process = context.Process(
+                target=run_worker,
+                args=(self.kind, index, state_address, self.bus.listener.address, self.authkey),
+                name=f"worker-{index}",
+            )
+            process.start()
+
+            self.processes.append(process)
+
+        Logger.info(f"Supervisor: Started {self.workers} {self.kind} workers")
+
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.toggle_profilers())
+
+        try:
+            self.supervise()
+        except KeyboardInterrupt:
+            Logger.info("Supervisor: Cluster was stopped manually via keyboard interrupt")
+        finally:
+            self.shutdown()
+
+    def supervise(self) -> None:
+        """Waits for a worker to exit, writing a snapshot of the users who are
+        online at every interval meanwhile, if snapshots are enabled."""
+
+        interval = self.presence_snapshot_interval if self.presence_snapshot_interval > 0 else 1
+
+        while True:
+            wait([process.sentinel for process in self.processes], interval)
+
+            for process in self.processes:
+                if not process.is_alive():
+                    Logger.error(f"Supervisor: Worker {process.name} exited with code {process.exitcode}")
+                    return
+
+            if self.presence_snapshot_interval > 0:
+                self.snapshot_presence()
+
+    def toggle_profilers(self) -> None:
+        """Toggles the sampling profiler of the supervisor and of every
+        worker that is still running."""
+
+        self.profiler.toggle()
+
+        for process in self.processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGUSR1)
+
+    def snapshot_presence(self) -> None:
+        """Writes the users who are online to the database, unless nobody has
+        logged in or disconnected since the last snapshot."""
+
+        version, usernames = self.presence.snapshot()
+
+        if version == self.snapshot_version:
+            return
+
+        self.database.save_presence(usernames)
+        self.snapshot_version = version
+
+    def shutdown(self) -> None:
+        """Stops every worker, letting it disconnect its clients first, then
+        releases the shared state. Workers that do not stop in time are
+        killed."""
+
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + CLUSTER_SHUTDOWN_TIMEOUT
+
+        for process in self.processes:
+            process.join(max(0, deadline - time.monotonic()))
+
+            if process.is_alive():
+                Logger.warn(f"Supervisor: Worker {process.name} did not stop in time, killing it")
+                process.kill()
+                process.join()
+
+        self.bus.close()
+
+        if self.presence_snapshot_interval > 0:
+            self.snapshot_presence()
+
+        self.database.close()
+
+        Logger.info("Supervisor: Cluster stopped")
+
+
+if __name__ == "__main__":
+    Logger.setup()
+
+    Supervisor(os.getenv("CLUSTER_SERVER", CLUSTER_SERVER), int(os.getenv("CLUSTER_WORKERS", CLUSTER_WORKERS))).start()
@@ -0,0 +1,264 @@
+"""This module contains the code for the server processes of a cluster."""
+
+import os
+import signal
+import asyncio
+
+from typing import Any, List, Optional, Tuple
+
+from src.server.server import Server
+from src.server.async_server import AsyncServer
+
+from src.server.context.context import Context
+
+from src.server.cluster.message_bus import MessageBusConnection
+from src.server.cluster.shared_state import PresenceOwner, SharedState
+
+from src.common.utilities.logger import Logger
+
+
+class ClusterPresence:
+    """The ClusterPresence class is a worker's view of the presence registry
+    shared by the cluster. Client contexts cannot leave the worker, so each
+    is identified by the worker and its client id instead.
+
+    Attributes:
+        registry: the proxy of the shared presence registry
+        worker: the index of the worker
+    """
+
+    def __init__(self, registry: Any, worker: int) -> None:
+        """Initialises the ClusterPresence instance.
+
+        Args:
+            registry: the proxy of the shared presence registry
+            worker: the index of the worker
+        """
+
+        self.registry: Any = registry
+        self.worker: int = worker
+
+    def claim(self, username: str, context: Context) -> bool:
+        """Marks a user as online on a client connection, unless they are
+        already online on another one, on any worker.
+
+        Args:
+            username: the username
+            context: the client context
+
+        Returns: the validity of the claim
+        """
+
+        return self.registry.claim(username, PresenceOwner(username, self.worker, context.id))
+
+    def release(self, context: Context) -> None:
+        """Marks the user of a client connection as offline.
+
+        Args:
+            context: the client context
+        """
+
+        if context.username is not None:
+            self.registry.release(PresenceOwner(context.username, self.worker, context.id))
+
+    def snapshot(self) -> Tuple[int, List[str]]:
+        """Retrieves the users who are online on any worker.
+
+        Returns: the number of changes made so far and the sorted usernames
+        """
+
+        return self.registry.snapshot()
+
+
+class ClusterWorker:
+    """The ClusterWorker class turns a server into a worker of a cluster. The
+    worker listens on the same port as the other workers, and uses the
+    database and the presence registry served by the supervisor. The data it
+    sends to a room is also published on the message bus, so the members of
+    the room served by other workers receive it too. The supervisor owns the
+    shared state, so it also writes the presence snapshots. Each worker keeps
+    its own metrics, served on the metrics port offset by its index.
+
+    Attributes:
+        index: the index of the worker
+        state: the connection to the state shared by the cluster
+        bus: the connection to the message bus
+    """
+
+    def __init__(self, index: int, state_address: str, bus_address: str, authkey: bytes) -> None:
+        """Initialises the ClusterWorker instance.
+
+        Args:
+            index: the index of the worker
+            state_address: the path of the Unix socket serving the shared state
+            bus_address: the path of the Unix socket of the message bus
+            authkey: the key to authenticate with
+        """
+
+        self.index: int = index
+        self.state: SharedState = SharedState(state_address, authkey)
+        self.state.connect()
+
+        super().__init__()
+
+        self.presence_snapshot_interval = 0
+        self.bus: MessageBusConnection = MessageBusConnection(
+            bus_address, authkey, self.receive_from_bus, self.disconnect_from_bus
+        )
+
+    def create_database(self) -> Any:
+        """Connects to the database served by the supervisor.
+
+        Returns: the proxy of the database
+        """
+
+        return self.state.get_database()
+
+    def create_presence_registry(self) -> ClusterPresence:
+        """Connects to the presence registry served by the supervisor.
+
+        Returns: the worker's view of the presence registry
+        """
+
+        return ClusterPresence(self.state.get_presence(), self.index)
+
+    def is_port_shared(self) -> bool:
+        """Returns whether other server processes listen on the same port.
+
+        Returns: is the port shared
+        """
+
+        return True
+
+    def get_metrics_address(self) -> Tuple[str, int]:
+        """Returns the address the metrics of this worker are served on, the
+        metrics port offset by the index of the worker.
+
+        Returns: the metrics host and port, where a port of 0 disables metrics
+        """
+
+        host, port = super().get_metrics_address()
+
+        return host, port + self.index if port > 0 else port
+
+    def send_to_room(self, room: str, data: Any, sender: Optional[int] = None) -> None:
+        """Sends data to the members of a room served by this worker, except
+        for the sender, and publishes it to the other workers.
+
+        Args:
+            room: the room name
+            data: the data to be sent to the room
+            sender: the id of the client who sent the data, if it was a client
+        """
+
+        super().send_to_room(room, data, sender)
+        self.bus.publish(room, data)
+
+    def receive_from_bus(self, room: str, data: Any) -> None:
+        """Sends data published by another worker to the members of a room
+        served by this worker. The sender is served by the other worker.
+
+        Args:
+            room: the room name
+            data: the data sent to the room
+        """
+
+        super().send_to_room(room, data)
+
+    def disconnect_from_bus(self) -> None:
+        """Stops the worker once the supervisor has gone, as it can no longer
+        reach the members of its rooms on the other workers."""
+
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    def shutdown(self) -> None:
+        """Disconnects every client, then releases the resources of the
+        worker. The shared state is left to the supervisor. Workers are
+        multiprocessing children, so they wait for the authentication pool
+        to stop."""
+
+        self.disconnect_all_clients()
+        self.authenticator.shutdown(wait=True)
+        self.stop_metrics_endpoint()
+        self.bus.close()
+
+
+class ThreadedWorker(ClusterWorker, Server):
+    """The ThreadedWorker class is a cluster worker serving each client
+    connection on its own thread."""
+
+    def start(self) -> None:
+        """Starts receiving from the message bus, then starts the server."""
+
+        self.bus.start()
+
+        super().start()
+
+
+class AsyncWorker(ClusterWorker, AsyncServer):
+    """The AsyncWorker class is a cluster worker serving every client
+    connection on a single event loop. Data published by other workers is
+    received on a separate thread, so it is handed over to the event loop.
+
+    Attributes:
+        loop: the event loop serving the client connections
+    """
+
+    def __init__(self, index: int, state_address: str, bus_address: str, authkey: bytes) -> None:
+        """Initialises the AsyncWorker instance.
+
+        Args:
+            index: the index of the worker
+            state_address: the path of the Unix socket serving the shared state
+            bus_address: the path of the Unix socket of the message bus
+            authkey: the key to authenticate with
+        """
+
+        super().__init__(index, state_address, bus_address, authkey)
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def serve(self) -> None:
+        """Starts receiving from the message bus, then listens for client
+        connections on the event loop."""
+
+        self.loop = asyncio.get_event_loop()
+        self.bus.start()
+
+        await super().serve()
+
+    def receive_from_bus(self, room: str, data: Any) -> None:
+        """Hands data published by another worker over to the event loop.
+
+        Args:
+            room: the room name
+            data: the data sent to the room
+        """
+
+        try:
+            self.loop.call_soon_threadsafe(super().receive_from_bus, room, data)
+        except RuntimeError:
+            Logger.warn(f"Server: Dropped data sent to room {room}, the event loop is closed")
+
+
+WORKERS = {"server": ThreadedWorker, "async_server": AsyncWorker}
+
+
+def run_worker(kind: str, index: int, state_address: str, bus_address: str, authkey: bytes) -> None:
+    """Runs a worker until the supervisor stops it. Interrupts are left to the
+    supervisor, which stops workers with SIGTERM.
+
+    Args:
+        kind: the kind of server, server or async_server
+        index: the index of the worker
+        state_address: the path of the Unix socket serving the shared state
+        bus_address: the path of the Unix socket of the message bus
+        authkey: the key to authenticate with
+    """
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    Logger.setup()
+
+    WORKERS[kind](index, state_address, bus_address, authkey).start()
@@ -1,23 +1,41 @@
 """This module contains the code for providing the server client contexts."""
 
+from asyncio import StreamWriter
+
 from ssl import SSLSocket
 
+from typing import Union
+
+from src.server.context.outbound_queue import OutboundQueue
+
+from src.common.protocol.codec import Codec, CodecRegistry
+
 
 class Context:
     """The Context class is a used by the server to store necessary data for a
     user's session.
 
     Attributes:
-        connection: the client connection
+        id: the client id
+        connection: the client connection, a stream writer when served by the asyncio server
+        outbound: the frames waiting to be written to the client connection
         username: the username
+        room: the name of the room the client is in
+        codec: the codec used to encode frames sent to the client
     """
 
-    def __init__(self, connection: SSLSocket) -> None:
+    def __init__(self, id: int, connection: Union[SSLSocket, StreamWriter], outbound: OutboundQueue) -> None:
         """Intialises the Context instance.
 
         Args:
+            id: the client id
             connection: the client connection
+            outbound: the outbound queue of the client connection
         """
 
-        self.connection: SSLSocket = connection
+        self.id: int = id
+        self.connection: Union[SSLSocket, StreamWriter] = connection
+        self.outbound: OutboundQueue = outbound
         self.username: str = None
+        self.room: str = None
+        self.codec: Codec = CodecRegistry.get_default()
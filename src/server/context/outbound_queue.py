@@ -0,0 +1,244 @@
+"""This module contains the code for queueing frames that are waiting to be
+written to a client connection."""
+
+import asyncio
+import threading
+import collections
+
+from enum import Enum
+
+from typing import Deque, Union
+
+from src.common.constants.constants import OUTBOUND_QUEUE_SIZE, OUTBOUND_QUEUE_TIMEOUT
+
+
+class OverflowPolicy(Enum):
+    """The OverflowPolicy enum defines what happens when a frame is queued for
+    a client whose outbound queue is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    DISCONNECT = "disconnect"
+    BLOCK = "block"
+
+
+class OutboundQueue:
+    """The OutboundQueue class is a bounded queue of frames waiting to be
+    written to a client connection by a dedicated writer thread. A slow client
+    fills up its own queue instead of stalling the client that sent the
+    message.
+
+    Attributes:
+        frames: the queued frames
+        maxsize: the maximum number of queued frames
+        policy: the policy applied when the queue is full
+        timeout: how long a blocked sender waits for room in the queue
+        closed: is the queue closed
+        condition: the condition guarding the queued frames
+    """
+
+    def __init__(
+        self,
+        maxsize: int = OUTBOUND_QUEUE_SIZE,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        timeout: float = OUTBOUND_QUEUE_TIMEOUT,
+    ) -> None:
+        """Initialises the OutboundQueue instance.
+
+        Args:
+            maxsize: the maximum number of queued frames
+            policy: the policy applied when the queue is full
+            timeout: how long a blocked sender waits for room in the queue
+        """
+
+        self.frames: Deque[bytes] = collections.deque()
+        self.maxsize: int = maxsize
+        self.policy: OverflowPolicy = policy
+        self.timeout: float = timeout
+        self.closed: bool = False
+        self.condition: threading.Condition = threading.Condition()
+
+    def put(self, frame: bytes) -> bool:
+        """Queues a frame to be written to the client. Frames queued after the
+        queue is closed are discarded.
+
+        Args:
+            frame: the encoded frame
+
+        Returns: False if the client is too slow and must be disconnected
+        """
+
+        with self.condition:
+            if self.closed:
+                return True
+
+            if len(self.frames) >= self.maxsize and not self.make_room():
+                self.closed = True
+                self.condition.notify_all()
+                return False
+
+            if self.closed:
+                return True
+
+            self.frames.append(frame)
+            self.condition.notify_all()
+
+            return True
+
+    def make_room(self) -> bool:
+        """Makes room for a new frame in a full queue according to the
+        overflow policy. Must be called while holding the condition.
+
+        Returns: the validity of the attempt
+        """
+
+        if self.policy is OverflowPolicy.DROP_OLDEST:
+            self.frames.popleft()
+            return True
+
+        if self.policy is OverflowPolicy.BLOCK:
+            return self.condition.wait_for(lambda: self.closed or len(self.frames) < self.maxsize, self.timeout)
+
+        return False
+
+    def get(self) -> Union[bytes, None]:
+        """Waits for the next frame to be written to the client. Frames that
+        were queued before the queue was closed are still returned.
+
+        Returns: the next frame or nothing if the queue is closed and empty
+        """
+
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or self.frames)
+
+            if not self.frames:
+                return None
+
+            frame = self.frames.popleft()
+            self.condition.notify_all()
+
+            return frame
+
+    def close(self) -> None:
+        """Closes the queue and wakes up the writer and any blocked senders."""
+
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self) -> int:
+        """Returns the number of queued frames.
+
+        Returns: the number of queued frames
+        """
+
+        return len(self.frames)
+
+
+class AsyncOutboundQueue(OutboundQueue):
+    """The AsyncOutboundQueue class is an outbound queue drained by a writer
+    task on the event loop. Senders run on the event loop as well, so they can
+    never block in put. Under the block policy the frame is queued anyway and
+    the sender is expected to wait for room with wait_for_space before it
+    reads its next frame.
+
+    Attributes:
+        readable: the event set while there are queued frames
+        writable: the event set while the queue is not full
+    """
+
+    def __init__(
+        self,
+        maxsize: int = OUTBOUND_QUEUE_SIZE,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        timeout: float = OUTBOUND_QUEUE_TIMEOUT,
+    ) -> None:
+        """Initialises the AsyncOutboundQueue instance.
+
+        Args:
+            maxsize: the maximum number of queued frames
+            policy: the policy applied when the queue is full
+            timeout: how long a blocked sender waits for room in the queue
+        """
+
+        super().__init__(maxsize, policy, timeout)
+
+        self.readable: asyncio.Event = asyncio.Event()
+        self.writable: asyncio.Event = asyncio.Event()
+        self.writable.set()
+
+    def put(self, frame: bytes) -> bool:
+        """Queues a frame to be written to the client without blocking.
+
+        Args:
+            frame: the encoded frame
+
+        Returns: False if the client is too slow and must be disconnected
+        """
+
+        if self.closed:
+            return True
+
+        if len(self.frames) >= self.maxsize:
+            if self.policy is OverflowPolicy.DISCONNECT:
+                self.close()
+                return False
+
+            if self.policy is OverflowPolicy.DROP_OLDEST:
+                self.frames.popleft()
+
+        self.frames.append(frame)
+        self.readable.set()
+
+        if len(self.frames) >= self.maxsize:
+            self.writable.clear()
+
+        return True
+
+    def is_saturated(self) -> bool:
+        """Check if a sender must wait for the queue to drain before sending
+        more frames.
+
+        Returns: the validity of the check
+        """
+
+        return self.policy is OverflowPolicy.BLOCK and not self.writable.is_set()
+
+    async def wait_for_space(self) -> bool:
+        """Waits until the queue is no longer full.
+
+        Returns: False if the client did not drain the queue in time
+        """
+
+        try:
+            await asyncio.wait_for(self.writable.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        return True
+
+    async def get(self) -> Union[bytes, None]:
+        """Waits for the next frame to be written to the client.
+
+        Returns: the next frame or nothing if the queue is closed and empty
+        """
+
+        while not self.frames:
+            if self.closed:
+                return None
+
+            self.readable.clear()
+            await self.readable.wait()
+
+        frame = self.frames.popleft()
+
+        if len(self.frames) < self.maxsize:
+            self.writable.set()
+
+        return frame
+
+    def close(self) -> None:
+        """Closes the queue and wakes up the writer and any waiting senders."""
+
+        self.closed = True
+        self.readable.set()
+        self.writable.set()
@@ -1,49 +1,124 @@
 """This module contains the code for creating a database, and provides APIs for
 the server to query and fetch data."""
 
+import json
+import threading
+import contextlib
+
 from datetime import datetime, timezone
 
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import unqlite
 
+from src.server.database.read_write_lock import ReadWriteLock
+from src.server.database.write_behind_queue import Durability, WriteBehindQueue
+
 from src.common.utilities.utility import Utility
-from src.common.utilities.security import Security
 
-from src.common.constants.constants import COLLECTIONS, PATHS
+from src.common.constants.constants import (
+    COLLECTIONS,
+    DEFAULT_ROOM,
+    MESSAGE_BATCH_INTERVAL,
+    MESSAGE_BATCH_SIZE,
+    MESSAGE_DURABILITY,
+    PATHS,
+)
 
 
 class Database:
     """The Database class provides APIs for querying and fetching data.
+    Messages are written behind by default: each message is given its record
+    id straight away, but is stored together with the messages sent around
+    it in a single transaction. Reading messages writes any queued messages
+    first, so a page of history always includes them.
+
+    The database is shared by the threads of the server. Reads hold a read
+    lock, so they run alongside each other and never see a half written
+    change. Writes hold the write lock for a whole transaction, so a check
+    and the write depending on it cannot be interleaved with another
+    thread's write. Every method is timed, if PROFILE_FUNCTIONS is set.
 
     Attributes:
         __DATABASE_FILE: the path to the database file on the disk
+        __INDEX: the key prefix shared by every index
+        __USER_INDEX: the key prefix of the username to user record id index
+        __MESSAGE_INDEX: the key prefix of the room position to message record id index
+        __MESSAGE_COUNT: the key prefix of the number of messages indexed per room
+        __PRESENCE: the key of the latest snapshot of the users who are online
         database: the database instance using unqlite
+        lock: the lock shared by the threads reading and writing the database
+        next_message_id: the record id the next message is stored under
+        message_lock: the lock making sure messages are queued in the order of their record ids
+        messages: the messages waiting to be stored, or nothing if messages are stored immediately
     """
 
     __DATABASE_FILE = Utility.get_path(PATHS["database"], ["chat.db"])
+    __INDEX = "index:"
+    __USER_INDEX = "index:users:"
+    __MESSAGE_INDEX = "index:messages:"
+    __MESSAGE_COUNT = "index:message_count:"
+    __PRESENCE = "presence"
+
+    def __init__(
+        self,
+        durability: Durability = Durability(MESSAGE_DURABILITY),
+        batch_size: int = MESSAGE_BATCH_SIZE,
+        batch_interval: float = MESSAGE_BATCH_INTERVAL,
+        path: Optional[str] = None,
+    ) -> None:
+        """Initialises the Database instance.
 
-    def __init__(self) -> None:
-        """Initialises the Database instance."""
+        Args:
+            durability: whether messages are stored immediately or in batches
+            batch_size: the number of queued messages that triggers a batch
+            batch_interval: how long a queued message may wait before it is stored
+            path: the path to the database file, defaults to the chat database
+        """
 
-        self.database = unqlite.UnQLite(self.__DATABASE_FILE)
+        self.database = unqlite.UnQLite(path or self.__DATABASE_FILE)
+        self.lock: ReadWriteLock = ReadWriteLock()
 
         self.clear_collections()
         self.create_collections()
 
+        self.next_message_id: int = len(self.database.collection("messages"))
+        self.message_lock: threading.Lock = threading.Lock()
+        self.messages: Optional[WriteBehindQueue] = None
+
+        if durability is Durability.BATCHED:
+            self.messages = WriteBehindQueue(self.store_messages, batch_size, batch_interval)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Holds the write lock and runs the enclosed reads and writes in a
+        single transaction, which is committed at the end, or rolled back if
+        an error is raised. Reads inside the transaction see its writes."""
+
+        with self.lock.write(), self.database.transaction():
+            yield
+
+    @Utility.timed_event()
     def create_collections(self) -> None:
-        """Creates all of the necessary collections."""
+        """Creates all of the necessary collections, in a transaction of their
+        own, so rolling back a later transaction cannot undo them."""
 
-        for collection in COLLECTIONS:
-            self.database.collection(collection).create()
+        with self.transaction():
+            for collection in COLLECTIONS:
+                self.database.collection(collection).create()
 
-    def create_user(self, username: str, password: str) -> None:
+    @Utility.timed_event()
+    def create_user(self, username: str, password: str) -> bool:
         """Creates and stores the user in the database given their username and
-        password.
+        password, unless the username is taken. The username is added to the
+        user index. Checking and creating happen in the same transaction, so
+        two users signing up with the same username cannot both succeed.
 
         Args:
             username: the username
             password: the password
+
+        Returns: was the user created
         """
 
         timestamp = datetime.now(timezone.utc).isoformat()
@@ -51,19 +126,36 @@ class Database:
         user = {
             "username": username,
             "password": password,
-            "online": True,
             "created_at": timestamp,
         }
 
-        self.database.collection("users").store(user)
+        key = self.get_user_index_key(username)
+
+        with self.transaction():
+            if key in self.database:
+                return False
 
-    def create_message(self, role: str, content: str, username: Optional[str] = "") -> None:
-        """Creates a message to be stored in the database.
+            self.database[key] = str(self.database.collection("users").store(user))
+
+        return True
+
+    @Utility.timed_event()
+    def create_message(
+        self, role: str, content: str, username: Optional[str] = "", room: Optional[str] = DEFAULT_ROOM
+    ) -> Dict[str, Any]:
+        """Creates a message to be stored in the database. The message is
+        given its record id, then either stored straight away or queued to be
+        stored with the next batch. If storing it straight away fails, the
+        error is raised, and the next record id is taken from the stored
+        messages again.
 
         Args:
             role: the role, can be client or server, ideally should be using enums
             content: the content to be stored
             username: the username
+            room: the room the message was sent to
+
+        Returns: the stored message along with its record id
         """
 
         timestamp = datetime.now(timezone.utc).isoformat()
@@ -71,74 +163,307 @@ class Database:
         message = {
             "role": role,
             "username": username,
+            "room": room,
             "content": content,
             "timestamp": timestamp,
         }
 
-        self.database.collection("messages").store(message)
+        with self.message_lock:
+            message["__id"] = self.next_message_id
+            self.next_message_id += 1
+
+            if self.messages is None:
+                try:
+                    self.store_messages([message])
+                except Exception:
+                    self.reset_message_id()
+                    raise
+            else:
+                self.messages.put(message)
+
+        return message
+
+    @Utility.timed_event()
+    def store_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """Stores messages in a single transaction, and appends each message
+        to the message index of its room. Record ids are given out in order,
+        so the collection assigns each message the id it was created with. If
+        it does not, the transaction is rolled back rather than indexing the
+        wrong records.
+
+        Args:
+            messages: the messages, in the order of their record ids
+        """
+
+        counts: Dict[str, int] = {}
+
+        with self.transaction():
+            last_id = self.database.collection("messages").store(
+                [{key: value for key, value in message.items() if key != "__id"} for message in messages]
+            )
+
+            if last_id != messages[-1]["__id"]:
+                raise RuntimeError(f"Message {messages[-1]['__id']} was stored under record id {last_id}")
+
+            for message in messages:
+                room = message["room"]
+
+                if room not in counts:
+                    counts[room] = self.get_message_count(room)
 
+                self.database[self.get_message_index_key(room, counts[room])] = str(message["__id"])
+                counts[room] += 1
+
+            for room, count in counts.items():
+                self.database[self.get_message_count_key(room)] = str(count)
+
+    def reset_message_id(self) -> None:
+        """Takes the next record id from the number of stored messages, after
+        a message could not be stored. The message lock must be held."""
+
+        with self.lock.read():
+            self.next_message_id = len(self.database.collection("messages"))
+
+    @Utility.timed_event()
+    def flush_messages(self) -> None:
+        """Stores the queued messages straight away."""
+
+        if self.messages is not None:
+            self.messages.flush()
+
+    @Utility.timed_event()
+    def count_queued_messages(self) -> int:
+        """Retrieves the number of messages waiting to be stored.
+
+        Returns: the number of queued messages
+        """
+
+        return len(self.messages) if self.messages is not None else 0
+
+    def get_user_index_key(self, username: str) -> str:
+        """Retrieves the key under which the record id of a user is indexed.
+
+        Args:
+            username: the username
+
+        Returns: the index key
+        """
+
+        return self.__USER_INDEX + username
+
+    @Utility.timed_event()
     def get_username(self, username: str) -> Any:
-        """Retrieves the user for the queried username.
+        """Retrieves the user for the queried username. The user is looked up
+        through the user index instead of scanning the users collection.
 
         Args:
             username: the queried username
 
-        Returns: the user with the matching username
+        Returns: the user with the matching username or nothing
         """
 
-        return self.database.collection("users").filter(lambda user: user["username"] == username)
+        key = self.get_user_index_key(username)
 
-    def get_username_and_password(self, username: str, password: str) -> Any:
-        """Retrieves the user with the matching username and password.
+        with self.lock.read():
+            if key not in self.database:
+                return None
+
+            return self.database.collection("users").fetch(int(self.database[key]))
+
+    def get_message_index_key(self, room: str, position: int) -> str:
+        """Retrieves the key under which the record id of the message at a
+        position in a room is indexed.
 
         Args:
-            username: the queried username
-            password: the queried password
+            room: the room name
+            position: the position of the message in the room
+
+        Returns: the index key
+        """
 
-        Returns: the user with the matching username and password
+        return f"{self.__MESSAGE_INDEX}{position}:{room}"
+
+    def get_message_count_key(self, room: str) -> str:
+        """Retrieves the key under which the number of messages in a room is
+        stored.
+
+        Args:
+            room: the room name
+
+        Returns: the count key
+        """
+
+        return self.__MESSAGE_COUNT + room
+
+    @Utility.timed_event()
+    def get_message_count(self, room: str) -> int:
+        """Retrieves the number of messages sent to a room.
+
+        Args:
+            room: the room name
+
+        Returns: the number of messages
+        """
+
+        key = self.get_message_count_key(room)
+
+        with self.lock.read():
+            if key not in self.database:
+                return 0
+
+            return int(self.database[key])
+
+    @Utility.timed_event()
+    def get_message_id(self, room: str, position: int) -> int:
+        """Retrieves the record id of the message at a position in a room.
+
+        Args:
+            room: the room name
+            position: the position of the message in the room
+
+        Returns: the record id
+        """
+
+        with self.lock.read():
+            return int(self.database[self.get_message_index_key(room, position)])
+
+    @Utility.timed_event()
+    def get_message_timestamp(self, room: str, position: int) -> datetime:
+        """Retrieves the time at which the message at a position in a room was
+        sent.
+
+        Args:
+            room: the room name
+            position: the position of the message in the room
+
+        Returns: the timestamp
         """
 
-        return self.database.collection("users").filter(
-            lambda user: user["username"] == username and Security.check_password(password, user["password"])
-        )
+        with self.lock.read():
+            message = self.database.collection("messages").fetch(self.get_message_id(room, position))
+
+        return datetime.fromisoformat(message["timestamp"])
 
-    def get_messages(self) -> Any:
-        """Retrieves all messages sent.
+    @Utility.timed_event()
+    def find_message_position(self, room: str, key: Callable[[str, int], Any], value: Any) -> int:
+        """Finds the position of the first message in a room whose key is
+        greater than the value. Messages are indexed in the order they are
+        sent, so both their record ids and timestamps are sorted, and a binary
+        search only fetches a logarithmic number of index entries.
 
-        Returns: all messages stored in the messages collection
+        Args:
+            room: the room name
+            key: the function retrieving the key of the message at a position
+            value: the value to compare the keys to
+
+        Returns: the position of the first message with a greater key
         """
 
-        return self.database.collection("messages").all()
+        with self.lock.read():
+            low, high = 0, self.get_message_count(room)
+
+            while low < high:
+                middle = (low + high) // 2
+
+                if key(room, middle) > value:
+                    high = middle
+                else:
+                    low = middle + 1
+
+            return low
+
+    @Utility.timed_event()
+    def get_messages(
+        self,
+        room: str,
+        limit: int,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+    ) -> Tuple[List[Any], bool]:
+        """Retrieves a page of the messages sent to a room, oldest first. The
+        page ends right before the message with the given id when paging
+        backwards, or starts right after the given message id or time when
+        catching up. Otherwise, the page holds the latest messages. The whole
+        page is read under one read lock, so it is a consistent snapshot.
+
+        Args:
+            room: the room name
+            limit: the maximum number of messages in the page
+            before_id: the record id the page ends before
+            after_id: the record id the page starts after
+            since: the time the page starts after
+
+        Returns: the page of messages and whether there are more messages past the page
+        """
+
+        self.flush_messages()
+
+        with self.lock.read():
+            count = self.get_message_count(room)
 
+            if before_id is not None:
+                end = self.find_message_position(room, self.get_message_id, before_id - 1)
+                start = max(0, end - limit)
+                has_more = start > 0
+            elif after_id is not None or since is not None:
+                if after_id is not None:
+                    start = self.find_message_position(room, self.get_message_id, after_id)
+                else:
+                    start = self.find_message_position(room, self.get_message_timestamp, since)
+
+                end = min(count, start + limit)
+                has_more = end < count
+            else:
+                end = count
+                start = max(0, end - limit)
+                has_more = start > 0
+
+            collection = self.database.collection("messages")
+            messages = [collection.fetch(self.get_message_id(room, position)) for position in range(start, end)]
+
+        return messages, has_more
+
+    @Utility.timed_event()
     def get_last_message(self) -> Any:
         """Retrieves the last message sent by any client.
 
         Returns: the last message sent
         """
 
-        collection = self.database.collection("messages")
+        self.flush_messages()
+
+        with self.lock.read():
+            collection = self.database.collection("messages")
 
-        return collection.fetch(collection.last_record_id())
+            return collection.fetch(collection.last_record_id())
 
-    def update_user_online_status(self, username: str, status: bool) -> None:
-        """Sets a user's online status to the actual status. For example, if a
-        user disconnects, then their status should be set to False.
+    @Utility.timed_event()
+    def save_presence(self, usernames: List[str]) -> None:
+        """Stores a snapshot of the users who are online, replacing the
+        previous snapshot.
 
         Args:
-            username: the user's username
-            status: the status to be set
+            usernames: the usernames of the users who are online
         """
 
-        users = self.get_username(username)
+        with self.transaction():
+            self.database[self.__PRESENCE] = json.dumps(usernames)
 
-        if not users:
-            return
+    @Utility.timed_event()
+    def get_presence(self) -> List[str]:
+        """Retrieves the latest snapshot of the users who are online.
 
-        user = users[0]
-        user["online"] = status
+        Returns: the usernames of the users who were online
+        """
 
-        self.database.collection("users").update(user["__id"], user)
+        with self.lock.read():
+            if self.__PRESENCE not in self.database:
+                return []
 
+            return json.loads(self.database[self.__PRESENCE])
+
+    @Utility.timed_event()
     def output_collection(self, collection_name: str) -> None:
         """Displays all records in all collections. This should only be used
         for debugging purposes.
@@ -147,10 +472,28 @@ class Database:
             collection_name: the name of the collections
         """
 
-        print(self.database.collection(collection_name).all())
+        with self.lock.read():
+            print(self.database.collection(collection_name).all())
+
+    @Utility.timed_event()
+    def close(self) -> None:
+        """Stores the queued messages, then closes the database once no
+        thread is using it."""
+
+        if self.messages is not None:
+            self.messages.close()
 
+        with self.lock.write():
+            self.database.close()
+
+    @Utility.timed_event()
     def clear_collections(self) -> None:
-        """Clears all collections."""
+        """Clears all collections, their indexes and the presence snapshot,
+        in a transaction of their own."""
+
+        with self.transaction():
+            for key in [key for key in self.database.keys() if key.startswith(self.__INDEX) or key == self.__PRESENCE]:
+                self.database.delete(key)
 
-        for collection in COLLECTIONS:
-            self.database.collection(collection).drop()
+            for collection in COLLECTIONS:
+                self.database.collection(collection).drop()
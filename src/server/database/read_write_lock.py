@@ -0,0 +1,101 @@
+"""This module contains the code for sharing the database between the threads
+of the server."""
+
+import threading
+import contextlib
+
+from typing import Iterator, Optional
+
+
+class ReadWriteLock:
+    """The ReadWriteLock class lets any number of threads read at the same
+    time, while a thread that writes has the lock to itself. Waiting writers
+    are let in before new readers, so a steady stream of reads cannot starve
+    writes. A thread may take the lock again while it holds it, so locked
+    methods can call each other, and a writer may also read. A reader cannot
+    become a writer, as two readers doing so would wait on each other.
+
+    Attributes:
+        readers: the number of threads reading
+        writer: the thread writing
+        writes: the number of times the writer has taken the lock
+        waiting_writers: the number of threads waiting to write
+        local: the number of times each reading thread has taken the lock
+        condition: the condition guarding the lock's state
+    """
+
+    def __init__(self) -> None:
+        """Initialises the ReadWriteLock instance."""
+
+        self.readers: int = 0
+        self.writer: Optional[threading.Thread] = None
+        self.writes: int = 0
+        self.waiting_writers: int = 0
+        self.local: threading.local = threading.local()
+        self.condition: threading.Condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        """Holds the lock for reading."""
+
+        depth = getattr(self.local, "depth", 0)
+
+        if depth or self.writer is threading.current_thread():
+            self.local.depth = depth + 1
+
+            try:
+                yield
+            finally:
+                self.local.depth = depth
+
+            return
+
+        with self.condition:
+            while self.writer is not None or self.waiting_writers:
+                self.condition.wait()
+
+            self.readers += 1
+
+        self.local.depth = 1
+
+        try:
+            yield
+        finally:
+            self.local.depth = 0
+
+            with self.condition:
+                self.readers -= 1
+
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        """Holds the lock for writing."""
+
+        current_thread = threading.current_thread()
+
+        if getattr(self.local, "depth", 0) and self.writer is not current_thread:
+            raise RuntimeError("A thread reading the database cannot start writing to it")
+
+        with self.condition:
+            if self.writer is not current_thread:
+                self.waiting_writers += 1
+
+                while self.writer is not None or self.readers:
+                    self.condition.wait()
+
+                self.waiting_writers -= 1
+                self.writer = current_thread
+
+            self.writes += 1
+
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writes -= 1
+
+                if not self.writes:
+                    self.writer = None
+                    self.condition.notify_all()
@@ -0,0 +1,159 @@
+"""This module contains the code for queueing records that are waiting to be
+written to the database."""
+
+import time
+import threading
+
+from enum import Enum
+
+from typing import Any, Callable, List, Optional
+
+from src.common.utilities.logger import Logger
+
+from src.common.constants.constants import MESSAGE_BATCH_INTERVAL, MESSAGE_BATCH_SIZE
+
+
+class Durability(Enum):
+    """The Durability enum defines when a message is written to the
+    database."""
+
+    IMMEDIATE = "immediate"
+    BATCHED = "batched"
+
+
+class WriteBehindQueue:
+    """The WriteBehindQueue class collects records and writes them in batches
+    on a dedicated writer thread. A batch is written once it is full, or once
+    its oldest record has waited for the interval, so a single transaction is
+    committed for many records instead of one per record. A batch that fails
+    to be written stays queued, and is retried in order after the interval.
+
+    Attributes:
+        write: the function writing a batch of records in a single transaction
+        batch_size: the number of records that triggers a write
+        interval: how long a record may wait before it is written
+        records: the queued records
+        closed: is the queue closed
+        condition: the condition guarding the queued records
+        flush_lock: the lock making sure batches are written one at a time and in order
+        writer: the writer thread
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[Any]], None],
+        batch_size: int = MESSAGE_BATCH_SIZE,
+        interval: float = MESSAGE_BATCH_INTERVAL,
+    ) -> None:
+        """Initialises the WriteBehindQueue instance, and starts its writer
+        thread.
+
+        Args:
+            write: the function writing a batch of records in a single transaction
+            batch_size: the number of records that triggers a write
+            interval: how long a record may wait before it is written
+        """
+
+        self.write: Callable[[List[Any]], None] = write
+        self.batch_size: int = batch_size
+        self.interval: float = interval
+        self.records: List[Any] = []
+        self.closed: bool = False
+        self.condition: threading.Condition = threading.Condition()
+        self.flush_lock: threading.Lock = threading.Lock()
+        self.writer: threading.Thread = threading.Thread(target=self.write_batches, daemon=True)
+
+        self.writer.start()
+
+    def put(self, record: Any) -> None:
+        """Queues a record to be written. The writer thread is woken up by the
+        first record of a batch, to start the interval, and by the record that
+        fills the batch.
+
+        Args:
+            record: the record
+        """
+
+        with self.condition:
+            self.records.append(record)
+
+            if len(self.records) == 1 or len(self.records) >= self.batch_size:
+                self.condition.notify()
+
+    def write_batches(self) -> None:
+        """Waits for a batch to fill up or for its interval to run out, then
+        writes it, until the queue is closed."""
+
+        while True:
+            with self.condition:
+                while not self.records and not self.closed:
+                    self.condition.wait()
+
+                if self.closed:
+                    return
+
+                deadline = time.monotonic() + self.interval
+
+                while len(self.records) < self.batch_size and not self.closed:
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        break
+
+                    self.condition.wait(remaining)
+
+            if not self.flush():
+                with self.condition:
+                    if not self.closed:
+                        self.condition.wait(self.interval)
+
+    def flush(self) -> bool:
+        """Writes every queued record straight away. If the write fails, the
+        records are put back at the front of the queue, so they are retried
+        before any record queued meanwhile.
+
+        Returns: were the queued records written
+        """
+
+        with self.flush_lock:
+            with self.condition:
+                records, self.records = self.records, []
+
+            if not records:
+                return True
+
+            try:
+                self.write(records)
+            except Exception as exception:
+                Logger.error(f"Server: Could not write {len(records)} queued records, retrying: {exception}")
+
+                with self.condition:
+                    self.records[:0] = records
+
+                return False
+
+            return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stops the writer thread, then writes the records still queued.
+
+        Args:
+            timeout: how long to wait for a batch being written
+        """
+
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+        self.writer.join(timeout)
+
+        if not self.flush():
+            Logger.error(f"Server: Dropped {len(self.records)} queued records that could not be written")
+
+    def __len__(self) -> int:
+        """Returns the number of queued records.
+
+        Returns: the number of queued records
+        """
+
+        return len(self.records)
@@ -0,0 +1,79 @@
+"""This module contains the code for serving the metrics of the server to a
+Prometheus scraper over HTTP."""
+
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from typing import Any, Tuple
+
+from src.server.metrics.metrics_registry import MetricsRegistry
+
+from src.common.utilities.logger import Logger
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """The MetricsRequestHandler class answers a scrape with the rendered
+    metrics of the registry served by its endpoint."""
+
+    def do_GET(self) -> None:
+        """Sends the rendered metrics, or a 404 for any other path."""
+
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.server.registry.render().encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keeps scrapes out of the server log.
+
+        Args:
+            format: the format of the message
+            *args: the values of the message
+        """
+
+
+class MetricsEndpoint(ThreadingHTTPServer):
+    """The MetricsEndpoint class serves the metrics of a registry at /metrics
+    on a background thread, in the Prometheus text exposition format. It is
+    meant to be reached locally, so it is served over plain HTTP.
+
+    Attributes:
+        registry: the registry of the metrics served
+    """
+
+    daemon_threads = True
+
+    def __init__(self, registry: MetricsRegistry, address: Tuple[str, int]) -> None:
+        """Initialises the MetricsEndpoint instance, listening on the address.
+
+        Args:
+            registry: the registry of the metrics served
+            address: the host and port to listen on
+        """
+
+        super().__init__(address, MetricsRequestHandler)
+
+        self.registry: MetricsRegistry = registry
+
+    def start(self) -> None:
+        """Serves scrapes in the background."""
+
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+
+        host, port = self.server_address[:2]
+        Logger.info(f"Server: Serving metrics on http://{host}:{port}/metrics")
+
+    def close(self) -> None:
+        """Stops serving scrapes and closes the listening socket."""
+
+        self.shutdown()
+        self.server_close()
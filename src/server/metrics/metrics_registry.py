@@ -0,0 +1,462 @@
+"""This module contains the code for collecting metrics about the server and
+rendering them in the Prometheus text exposition format."""
+
+import time
+import bisect
+import threading
+
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+from src.common.utilities.profiler import Profiler
+
+from src.common.constants.constants import METRICS_BUCKETS
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    """The Metric class is the base of every metric kept by a registry.
+
+    Attributes:
+        kind: the Prometheus type of the metric
+        name: the metric name
+        help: the description of the metric
+        label_names: the names of the labels telling the series of the metric apart
+    """
+
+    kind: str = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Labels = ()) -> None:
+        """Initialises the Metric instance.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+            label_names: the names of the labels telling the series of the metric apart
+        """
+
+        self.name: str = name
+        self.help: str = help
+        self.label_names: Labels = label_names
+
+    def render(self) -> List[str]:
+        """Renders the metric in the Prometheus text exposition format.
+
+        Returns: the lines describing the metric, followed by a line per sample
+        """
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{self.format_labels(labels)} {value!r}" for name, labels, value in self.collect())
+
+        return lines
+
+    def collect(self) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        """Returns the current samples of the metric.
+
+        Returns: the sample name, labels and value of every sample
+        """
+
+        raise NotImplementedError
+
+    def collect_histogram(
+        self, labels: List[Tuple[str, str]], bounds: List[str], counts: List[int], total: float, count: int
+    ) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        """Returns the samples of a histogram series.
+
+        Args:
+            labels: the label names and values of the series
+            bounds: the formatted upper bounds of the buckets, the last one being +Inf
+            counts: the number of observations in each bucket
+            total: the sum of the observations
+            count: the number of observations
+
+        Returns: the cumulative count of every bucket, then the sum and the count
+        """
+
+        samples = []
+        cumulative = 0
+
+        for bound, bucket in zip(bounds, counts):
+            cumulative += bucket
+            samples.append((f"{self.name}_bucket", labels + [("le", bound)], cumulative))
+
+        samples.append((f"{self.name}_sum", labels, total))
+        samples.append((f"{self.name}_count", labels, count))
+
+        return samples
+
+    def format_labels(self, labels: List[Tuple[str, str]]) -> str:
+        """Formats the labels of a sample, escaping their values.
+
+        Args:
+            labels: the label names and values
+
+        Returns: the formatted labels, or nothing if there are none
+        """
+
+        if not labels:
+            return ""
+
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+class Counter(Metric):
+    """The Counter class counts events, such as frames or bytes received. It
+    is safe to increment from multiple threads.
+
+    Attributes:
+        values: the count of every series keyed by label values
+        lock: the lock guarding the values
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Labels = ()) -> None:
+        """Initialises the Counter instance.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+            label_names: the names of the labels telling the series of the metric apart
+        """
+
+        super().__init__(name, help, label_names)
+
+        self.values: Dict[Labels, float] = {} if label_names else {(): 0}
+        self.lock: threading.Lock = threading.Lock()
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        """Increments the count of a series.
+
+        Args:
+            amount: the amount to increment by
+            labels: the label values of the series
+        """
+
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def collect(self) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        """Returns the count of every series.
+
+        Returns: the sample name, labels and value of every sample
+        """
+
+        with self.lock:
+            values = sorted(self.values.items())
+
+        return [(self.name, list(zip(self.label_names, labels)), value) for labels, value in values]
+
+
+class Gauge(Metric):
+    """The Gauge class reports a value that goes up and down, such as the
+    number of connected clients. The value is read by a function when the
+    metrics are rendered, so keeping it up to date costs nothing.
+
+    Attributes:
+        function: the function returning the current value
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, function: Callable[[], float]) -> None:
+        """Initialises the Gauge instance.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+            function: the function returning the current value
+        """
+
+        super().__init__(name, help)
+
+        self.function: Callable[[], float] = function
+
+    def collect(self) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        """Returns the current value.
+
+        Returns: the sample name, labels and value of every sample
+        """
+
+        return [(self.name, [], float(self.function()))]
+
+
+class Histogram(Metric):
+    """The Histogram class counts observations, such as latencies, into
+    buckets. It is safe to observe from multiple threads.
+
+    Attributes:
+        buckets: the upper bounds of the buckets, in ascending order
+        series: the bucket counts, sum and count of every series keyed by label values
+        lock: the lock guarding the series
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Labels = (), buckets: Sequence[float] = METRICS_BUCKETS) -> None:
+        """Initialises the Histogram instance.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+            label_names: the names of the labels telling the series of the metric apart
+            buckets: the upper bounds of the buckets, in ascending order
+        """
+
+        super().__init__(name, help, label_names)
+
+        self.buckets: List[float] = sorted(buckets)
+        self.series: Dict[Labels, List[Any]] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Counts an observation into the series.
+
+        Args:
+            value: the observed value
+            labels: the label values of the series
+        """
+
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self.lock:
+            series = self.series.get(labels)
+
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        """Returns the cumulative bucket counts, the sum and the count of
+        every series.
+
+        Returns: the sample name, labels and value of every sample
+        """
+
+        with self.lock:
+            series = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self.series.items())
+
+        samples = []
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+
+        for labels, (counts, total, count) in series:
+            samples.extend(self.collect_histogram(list(zip(self.label_names, labels)), bounds, counts, total, count))
+
+        return samples
+
+
+class FunctionTimings(Metric):
+    """The FunctionTimings class reports the time taken by the functions
+    timed by the profiler as a histogram labelled by function name."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str) -> None:
+        """Initialises the FunctionTimings instance.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+        """
+
+        super().__init__(name, help, ("function",))
+
+    def collect(self) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        """Returns the cumulative bucket counts, the sum and the count of
+        every function called so far, in seconds.
+
+        Returns: the sample name, labels and value of every sample
+        """
+
+        samples = []
+        bounds = [repr(bound / 1e9) for bound in Profiler.get_bounds()] + ["+Inf"]
+
+        for function, (counts, total, count) in Profiler.snapshot().items():
+            samples.extend(self.collect_histogram([("function", function)], bounds, counts, total / 1e9, count))
+
+        return samples
+
+
+class NullMetric:
+    """The NullMetric class stands in for every metric of a disabled
+    registry, ignoring anything recorded into it."""
+
+    def inc(self, amount: float = 1, labels: Labels = ()) -> None:
+        """Ignores an increment.
+
+        Args:
+            amount: the amount to increment by
+            labels: the label values of the series
+        """
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """Ignores an observation.
+
+        Args:
+            value: the observed value
+            labels: the label values of the series
+        """
+
+
+class TimedCalls:
+    """The TimedCalls class wraps an object, recording how long every method
+    call takes into a histogram labelled by the method name. Methods already
+    timed by the profiler are passed through untimed, so no call is measured
+    twice. Other attributes are passed through.
+
+    Attributes:
+        target: the wrapped object
+        histogram: the histogram the call durations are recorded into
+    """
+
+    def __init__(self, target: Any, histogram: Histogram) -> None:
+        """Initialises the TimedCalls instance.
+
+        Args:
+            target: the wrapped object
+            histogram: the histogram the call durations are recorded into
+        """
+
+        self.target: Any = target
+        self.histogram: Histogram = histogram
+
+    def __getattr__(self, name: str) -> Any:
+        """Returns an attribute of the wrapped object, timing it if it is a
+        method not timed by the profiler. Timed methods are cached, so they
+        are only wrapped once.
+
+        Args:
+            name: the attribute name
+
+        Returns: the attribute
+        """
+
+        attribute = getattr(self.target, name)
+
+        if not callable(attribute) or Profiler.is_timed(attribute):
+            return attribute
+
+        histogram = self.histogram
+        labels = (name,)
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, labels)
+
+        self.__dict__[name] = timed
+
+        return timed
+
+
+class MetricsRegistry:
+    """The MetricsRegistry class keeps the metrics of the server and renders
+    them for scraping. A disabled registry hands out metrics that do nothing
+    and renders nothing, so recording on the hot paths costs a single call.
+
+    Attributes:
+        enabled: are metrics collected
+        metrics: the registered metrics, in the order they are rendered
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """Initialises the MetricsRegistry instance.
+
+        Args:
+            enabled: are metrics collected
+        """
+
+        self.enabled: bool = enabled
+        self.metrics: List[Metric] = []
+
+    def counter(self, name: str, help: str, label_names: Labels = ()) -> Union[Counter, NullMetric]:
+        """Registers a counter.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+            label_names: the names of the labels telling the series of the metric apart
+
+        Returns: the counter
+        """
+
+        return self.register(Counter(name, help, label_names)) if self.enabled else NULL_METRIC
+
+    def gauge(self, name: str, help: str, function: Callable[[], float]) -> Union[Gauge, NullMetric]:
+        """Registers a gauge.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+            function: the function returning the current value
+
+        Returns: the gauge
+        """
+
+        return self.register(Gauge(name, help, function)) if self.enabled else NULL_METRIC
+
+    def histogram(
+        self, name: str, help: str, label_names: Labels = (), buckets: Sequence[float] = METRICS_BUCKETS
+    ) -> Union[Histogram, NullMetric]:
+        """Registers a histogram.
+
+        Args:
+            name: the metric name
+            help: the description of the metric
+            label_names: the names of the labels telling the series of the metric apart
+            buckets: the upper bounds of the buckets, in ascending order
+
+        Returns: the histogram
+        """
+
+        return self.register(Histogram(name, help, label_names, buckets)) if self.enabled else NULL_METRIC
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds a metric to the registry.
+
+        Args:
+            metric: the metric
+
+        Returns: the metric
+        """
+
+        self.metrics.append(metric)
+
+        return metric
+
+    def time_calls(self, target: Any, histogram: Union[Histogram, NullMetric]) -> Any:
+        """Times every method call made to an object, if metrics are
+        collected.
+
+        Args:
+            target: the object
+            histogram: the histogram the call durations are recorded into
+
+        Returns: the timed object, or the object itself if metrics are not collected
+        """
+
+        return TimedCalls(target, histogram) if self.enabled else target
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format.
+
+        Returns: the rendered metrics
+        """
+
+        lines = []
+
+        for metric in self.metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+NULL_METRIC = NullMetric()
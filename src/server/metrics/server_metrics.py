@@ -0,0 +1,101 @@
+"""This module contains the code for defining the metrics kept by the
+server."""
+
+from typing import Any, Dict, Union
+
+from src.server.context.context import Context
+
+from src.server.authenticator.authenticator import Authenticator
+
+from src.server.metrics.metrics_registry import Counter, FunctionTimings, Histogram, MetricsRegistry, NullMetric
+
+from src.common.utilities.profiler import Profiler
+
+
+class ServerMetrics:
+    """The ServerMetrics class defines the metrics the server records on its
+    hot paths, and the gauges read from its state when the metrics are
+    scraped. The timings of the functions timed by the profiler are reported
+    too, if functions are timed.
+
+    Attributes:
+        registry: the registry keeping the metrics
+        frames_received: the frames received from clients
+        bytes_received: the bytes received from clients, including headers
+        frames_sent: the frames written to clients
+        bytes_sent: the bytes written to clients, including headers
+        handler_seconds: the time taken to decode and handle a frame, by data type
+        database_seconds: the time taken by database calls, by method, unless the method is timed by the profiler
+        authentication_seconds: the time taken by authentication jobs, including waiting for a worker, by function
+    """
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        """Initialises the ServerMetrics instance.
+
+        Args:
+            registry: the registry keeping the metrics
+        """
+
+        self.registry: MetricsRegistry = registry
+        self.frames_received: Union[Counter, NullMetric] = registry.counter(
+            "chat_frames_received_total", "Frames received from clients."
+        )
+        self.bytes_received: Union[Counter, NullMetric] = registry.counter(
+            "chat_bytes_received_total", "Bytes received from clients, including frame headers."
+        )
+        self.frames_sent: Union[Counter, NullMetric] = registry.counter("chat_frames_sent_total", "Frames written to clients.")
+        self.bytes_sent: Union[Counter, NullMetric] = registry.counter(
+            "chat_bytes_sent_total", "Bytes written to clients, including frame headers."
+        )
+        self.handler_seconds: Union[Histogram, NullMetric] = registry.histogram(
+            "chat_handler_seconds", "Time taken to decode and handle a frame from a client.", ("type",)
+        )
+        self.database_seconds: Union[Histogram, NullMetric] = registry.histogram(
+            "chat_database_seconds", "Time taken by database calls.", ("method",)
+        )
+        self.authentication_seconds: Union[Histogram, NullMetric] = registry.histogram(
+            "chat_authentication_seconds",
+            "Time taken to hash or check a password with bcrypt, including waiting for a worker.",
+            ("function",),
+        )
+
+        if registry.enabled and Profiler.is_enabled():
+            registry.register(FunctionTimings("chat_function_seconds", "Time taken by the functions timed by the profiler."))
+
+    def time_database(self, database: Any) -> Any:
+        """Times every call made to the database. Methods timed by the
+        profiler are reported with the function timings instead, so they are
+        not timed twice.
+
+        Args:
+            database: the database
+
+        Returns: the timed database, or the database itself if metrics are not collected
+        """
+
+        return self.registry.time_calls(database, self.database_seconds)
+
+    def watch(self, clients: Dict[int, Context], authenticator: Authenticator, database: Any) -> None:
+        """Registers the gauges read from the state of the server. The
+        database is read directly, so scrapes are not timed as database
+        calls.
+
+        Args:
+            clients: the client contexts keyed by client id
+            authenticator: the worker pool hashing and checking passwords
+            database: the database
+        """
+
+        gauges = [
+            ("chat_connected_clients", "Client connections currently open.", lambda: len(clients)),
+            (
+                "chat_outbound_queue_frames",
+                "Frames waiting in the outbound queues of every client.",
+                lambda: sum(len(context.outbound) for context in list(clients.values())),
+            ),
+            ("chat_authentication_jobs", "Authentication jobs running or waiting for a worker.", authenticator.get_pending),
+            ("chat_queued_messages", "Messages waiting to be written to the database.", database.count_queued_messages),
+        ]
+
+        for name, help, function in gauges:
+            self.registry.gauge(name, help, function)
@@ -0,0 +1,73 @@
+"""This module contains the code for keeping track of the users who are
+online."""
+
+import threading
+
+from typing import Dict, List, Tuple
+
+from src.server.context.context import Context
+
+
+class PresenceRegistry:
+    """The PresenceRegistry class maps the username of every logged in user to
+    their client context. Presence only lasts as long as the connection, so it
+    is kept in memory instead of being written to the database on every login
+    and disconnect. It is safe to use from multiple client handler threads.
+
+    Attributes:
+        users: the client contexts keyed by username
+        version: the number of changes made, used to tell whether a snapshot is stale
+        lock: the lock guarding the users
+    """
+
+    def __init__(self) -> None:
+        """Initialises the PresenceRegistry instance."""
+
+        self.users: Dict[str, Context] = {}
+        self.version: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def claim(self, username: str, context: Context) -> bool:
+        """Marks a user as online on a client connection, unless they are
+        already online on another one. Checking and claiming happen under the
+        same lock, so two simultaneous logins cannot both succeed.
+
+        Args:
+            username: the username
+            context: the client context
+
+        Returns: the validity of the claim
+        """
+
+        with self.lock:
+            if username in self.users:
+                return False
+
+            self.users[username] = context
+            self.version += 1
+
+            return True
+
+    def release(self, context: Context) -> None:
+        """Marks the user of a client connection as offline, unless they are
+        online on another one.
+
+        Args:
+            context: the client context
+        """
+
+        with self.lock:
+            if self.users.get(context.username) != context:
+                return
+
+            del self.users[context.username]
+            self.version += 1
+
+    def snapshot(self) -> Tuple[int, List[str]]:
+        """Retrieves the users who are online.
+
+        Returns: the number of changes made so far and the sorted usernames
+        """
+
+        with self.lock:
+            return self.version, sorted(self.users)
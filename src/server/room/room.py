@@ -0,0 +1,59 @@
+"""This module contains the code for defining a chat room."""
+
+from typing import Dict, List
+
+from src.server.context.context import Context
+
+
+class Room:
+    """The Room class stores the members of a chat room. Members are keyed by
+    their client id, so membership checks are constant time.
+
+    Attributes:
+        name: the room name
+        members: the client contexts of the room members
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialises the Room instance.
+
+        Args:
+            name: the room name
+        """
+
+        self.name: str = name
+        self.members: Dict[int, Context] = {}
+
+    def add(self, context: Context) -> None:
+        """Adds a client to the room.
+
+        Args:
+            context: the client context
+        """
+
+        self.members[context.id] = context
+
+    def remove(self, context: Context) -> None:
+        """Removes a client from the room.
+
+        Args:
+            context: the client context
+        """
+
+        self.members.pop(context.id, None)
+
+    def get_members(self) -> List[Context]:
+        """Retrieves a snapshot of the room members.
+
+        Returns: the client contexts of the room members
+        """
+
+        return list(self.members.values())
+
+    def is_empty(self) -> bool:
+        """Check if the room has no members.
+
+        Returns: the validity of the check
+        """
+
+        return not self.members
@@ -0,0 +1,85 @@
+"""This module contains the code for keeping track of the chat rooms hosted by
+the server."""
+
+import threading
+
+from typing import Dict, List, Optional
+
+from src.server.room.room import Room
+
+from src.server.context.context import Context
+
+
+class RoomRegistry:
+    """The RoomRegistry class maps room names to rooms. Rooms are created when
+    the first member joins and removed when the last member leaves. It is safe
+    to use from multiple client handler threads.
+
+    Attributes:
+        rooms: the rooms keyed by their name
+        lock: the lock guarding the rooms
+    """
+
+    def __init__(self) -> None:
+        """Initialises the RoomRegistry instance."""
+
+        self.rooms: Dict[str, Room] = {}
+        self.lock: threading.Lock = threading.Lock()
+
+    def join(self, name: str, context: Context) -> Room:
+        """Adds a client to a room, creating the room if it does not exist.
+
+        Args:
+            name: the room name
+            context: the client context
+
+        Returns: the joined room
+        """
+
+        with self.lock:
+            room = self.rooms.get(name)
+
+            if room is None:
+                room = self.rooms[name] = Room(name)
+
+            room.add(context)
+            context.room = name
+
+            return room
+
+    def leave(self, context: Context) -> Optional[Room]:
+        """Removes a client from its current room. Empty rooms are removed.
+
+        Args:
+            context: the client context
+
+        Returns: the room that was left or nothing if the client was not in a room
+        """
+
+        with self.lock:
+            room = self.rooms.get(context.room)
+            context.room = None
+
+            if room is None:
+                return None
+
+            room.remove(context)
+
+            if room.is_empty():
+                del self.rooms[room.name]
+
+            return room
+
+    def get_members(self, name: str) -> List[Context]:
+        """Retrieves a snapshot of the members of a room.
+
+        Args:
+            name: the room name
+
+        Returns: the client contexts of the room members
+        """
+
+        with self.lock:
+            room = self.rooms.get(name)
+
+            return room.get_members() if room is not None else []
@@ -1,26 +1,68 @@
 """This module contains the code for defining a server interface."""
 
 import os
-import json
+import time
 import struct
+import signal
+import functools
 import socket
 import threading
 
-from ssl import PROTOCOL_TLSv1_2, SSLContext, SSLSocket
+from datetime import datetime, timezone
 
-from typing import Any, List, Union
+from ssl import PROTOCOL_TLS_SERVER, SSLContext, SSLError, SSLSocket, TLSVersion
+
+from concurrent.futures import Future
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from dotenv import load_dotenv
 
 from src.server.database.database import Database
+from src.server.database.write_behind_queue import Durability
 
 from src.server.context.context import Context
+from src.server.context.outbound_queue import OutboundQueue, OverflowPolicy
+
+from src.server.room.room_registry import RoomRegistry
+
+from src.server.presence.presence_registry import PresenceRegistry
+
+from src.server.authenticator.authenticator import Authenticator
+
+from src.server.metrics.metrics_registry import MetricsRegistry
+from src.server.metrics.metrics_endpoint import MetricsEndpoint
+from src.server.metrics.server_metrics import ServerMetrics
+
+from src.common.protocol.codec import Codec, CodecRegistry
+from src.common.protocol.dispatcher import Dispatcher, Schema
+from src.common.protocol.frame_reader import FrameReader
 
 from src.common.utilities.logger import Logger
 from src.common.utilities.utility import Utility
-from src.common.utilities.security import Security
-
-from src.common.constants.constants import CIPHER, HEADER_LENGTH, MAX_CLIENTS, PATHS, SERVER_TYPES
+from src.common.utilities.sampling_profiler import SamplingProfiler
+
+from src.common.constants.constants import (
+    AUTHENTICATION_QUEUE_SIZE,
+    AUTHENTICATION_TIMEOUT,
+    CIPHER,
+    DEFAULT_ROOM,
+    HEADER_LENGTH,
+    HISTORY_PAGE_SIZE,
+    MAXIMUM_HISTORY_PAGE_SIZE,
+    MESSAGE_BATCH_INTERVAL,
+    MESSAGE_BATCH_SIZE,
+    MESSAGE_DURABILITY,
+    METRICS_HOST,
+    METRICS_PORT,
+    OUTBOUND_QUEUE_POLICY,
+    PATHS,
+    PRESENCE_SNAPSHOT_INTERVAL,
+    PROFILER_INTERVAL,
+    SERVER_BACKLOG,
+    SSL_HANDSHAKE_TIMEOUT,
+    TLS_VERSION,
+)
 
 load_dotenv()
 
@@ -30,16 +72,35 @@ class Server:
     certificate is generated using openSSL, however, in practice, we should use
     a trusted key-store and certificate-store like Amazon KMS.
 
+    Every connection is secured by the same TLS context, so a client
+    reconnecting with the session, or session ticket, of an earlier
+    connection resumes it and skips the key exchange.
+
+    If the METRICS_PORT environment variable is set, the server records
+    metrics on its hot paths and serves them for scraping. Otherwise the
+    metrics do nothing. Sending SIGUSR1 to the server starts a sampling
+    profiler, and sending it again writes the profile.
+
     Attributes:
         __KEY: the server private key
         __HOST: the server host
         __PORT: the server port
         __CERTIFICATE: the digital certificate
-        socket: the server socket secured under TLS
+        ssl_context: the TLS context used to secure client connections
+        socket: the socket listening for client connections, whose connections are secured under TLS
         id: the auto-incrementing client id
-        clients: a list containing client resources
-        database: the database
-        client_slots: the available client slots
+        clients: the client resources keyed by client id
+        metrics: the metrics recorded by the server
+        metrics_endpoint: the endpoint serving the metrics, if metrics are enabled
+        database: the database, timed if metrics are enabled
+        rooms: the chat rooms hosted by the server
+        presence: the users who are online
+        presence_snapshot_interval: the seconds between snapshots of the users who are online, disabled if not positive
+        snapshot_version: the version of the presence registry last written to the database
+        queue_policy: the policy applied when a client's outbound queue is full
+        authenticator: the worker pool hashing and checking passwords
+        dispatcher: the dispatcher executing the RPCs sent by clients
+        profiler: the sampling profiler toggled by SIGUSR1
     """
 
     __KEY = Utility.get_path(PATHS["keys"], ["server.key"])
@@ -50,63 +111,247 @@ class Server:
     def __init__(self) -> None:
         """Initialises the server class fields."""
 
-        self.socket: SSLSocket = self.get_secure_socket()
+        self.ssl_context: SSLContext = self.get_ssl_context()
+        self.socket: socket.socket = self.get_listening_socket()
         self.id: int = 0
-        self.clients: List[Context] = [None, None]
-        self.database: Database = Database()
-        self.client_slots: int = 0
+        self.clients: Dict[int, Context] = {}
+        self.metrics: ServerMetrics = ServerMetrics(MetricsRegistry(self.get_metrics_address()[1] > 0))
+        self.metrics_endpoint: Optional[MetricsEndpoint] = None
+
+        database = self.create_database()
+
+        self.database: Database = self.metrics.time_database(database)
+        self.rooms: RoomRegistry = RoomRegistry()
+        self.presence: PresenceRegistry = self.create_presence_registry()
+        self.presence_snapshot_interval: float = float(os.getenv("PRESENCE_SNAPSHOT_INTERVAL", PRESENCE_SNAPSHOT_INTERVAL))
+        self.snapshot_version: int = 0
+        self.queue_policy: OverflowPolicy = OverflowPolicy(os.getenv("OUTBOUND_QUEUE_POLICY", OUTBOUND_QUEUE_POLICY))
+        self.authenticator: Authenticator = Authenticator(
+            int(os.getenv("AUTHENTICATION_WORKERS", 0)),
+            int(os.getenv("AUTHENTICATION_QUEUE_SIZE", AUTHENTICATION_QUEUE_SIZE)),
+            float(os.getenv("AUTHENTICATION_TIMEOUT", AUTHENTICATION_TIMEOUT)),
+            self.metrics.authentication_seconds,
+        )
+        self.dispatcher: Dispatcher = self.create_dispatcher()
+        self.profiler: SamplingProfiler = SamplingProfiler(
+            type(self).__name__, float(os.getenv("PROFILER_INTERVAL", PROFILER_INTERVAL))
+        )
+
+        self.metrics.watch(self.clients, self.authenticator, database)
+
+    def create_database(self) -> Database:
+        """Creates the database, configured by the MESSAGE_DURABILITY,
+        MESSAGE_BATCH_SIZE and MESSAGE_BATCH_INTERVAL environment variables.
+
+        Returns: the database
+        """
+
+        return Database(
+            Durability(os.getenv("MESSAGE_DURABILITY", MESSAGE_DURABILITY)),
+            int(os.getenv("MESSAGE_BATCH_SIZE", MESSAGE_BATCH_SIZE)),
+            float(os.getenv("MESSAGE_BATCH_INTERVAL", MESSAGE_BATCH_INTERVAL)),
+        )
 
-    def get_secure_socket(self) -> SSLSocket:
-        """Returns a secure socket wrapped with a TLS protection layer.
+    def create_presence_registry(self) -> PresenceRegistry:
+        """Creates the registry of the users who are online.
 
-        Returns: a secure socket wrapped with a protection layer; TLS
+        Returns: the presence registry
         """
 
-        unsecure_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        return PresenceRegistry()
+
+    def get_ssl_context(self) -> SSLContext:
+        """Returns the server-side TLS context loaded with the server
+        certificate and private key. The context is pinned to the TLS version
+        set by the TLS_VERSION environment variable, TLSv1_2 or TLSv1_3. The
+        cipher only applies to TLS 1.2, as TLS 1.3 negotiates its own.
+
+        Returns: the TLS context used to secure client connections
+        """
 
-        context = SSLContext(PROTOCOL_TLSv1_2)
+        version = TLSVersion[os.getenv("TLS_VERSION", TLS_VERSION)]
+
+        context = SSLContext(PROTOCOL_TLS_SERVER)
+        context.minimum_version = version
+        context.maximum_version = version
         context.load_cert_chain(certfile=self.__CERTIFICATE, keyfile=self.__KEY)
         context.load_verify_locations(self.__CERTIFICATE)
         context.set_ciphers(CIPHER)
 
-        return context.wrap_socket(unsecure_socket, server_side=True)
+        return context
+
+    def get_listening_socket(self) -> socket.socket:
+        """Returns the socket listening for client connections. The socket
+        itself is not secured, each accepted connection is wrapped with a TLS
+        protection layer instead, so a failed handshake only affects its own
+        connection. If other processes listen on the same port, the kernel
+        spreads new connections between their sockets.
+
+        Returns: the listening socket
+        """
+
+        listening_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+        if self.is_port_shared():
+            listening_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+        return listening_socket
+
+    def is_port_shared(self) -> bool:
+        """Returns whether other server processes listen on the same port.
+
+        Returns: is the port shared
+        """
+
+        return False
+
+    def get_address(self) -> Tuple[str, int]:
+        """Returns the address the server listens on.
+
+        Returns: the server host and port
+        """
+
+        return self.__HOST, self.__PORT
+
+    def get_metrics_address(self) -> Tuple[str, int]:
+        """Returns the address the metrics are served on, set by the
+        METRICS_HOST and METRICS_PORT environment variables.
+
+        Returns: the metrics host and port, where a port of 0 disables metrics
+        """
+
+        return os.getenv("METRICS_HOST", METRICS_HOST), int(os.getenv("METRICS_PORT", METRICS_PORT))
 
     def add_client(self, id: int, connection: SSLSocket) -> None:
-        """Handles adding a new client connection. It sends the id assigned to
-        the client connection to the client.
+        """Handles adding a new client connection on its own thread.
+
+        Args:
+            id: the client id
+            connection: the client connection, before its TLS handshake
+        """
+
+        thread = threading.Thread(target=self.serve_client, args=(id, connection))
+        thread.start()
+
+    def serve_client(self, id: int, connection: SSLSocket) -> None:
+        """Completes the TLS handshake of a new client connection, then
+        handles the client. Its outbound queue is drained by a dedicated
+        writer thread. A client failing the handshake, for example one pinned
+        to another TLS version, is disconnected without affecting the others.
+
+        Args:
+            id: the client id
+            connection: the client connection, before its TLS handshake
+        """
+
+        try:
+            connection.settimeout(SSL_HANDSHAKE_TIMEOUT)
+            connection.do_handshake()
+            connection.settimeout(None)
+        except (SSLError, ConnectionError, socket.timeout) as exception:
+            Logger.warn(f"Server: Client {id} failed the TLS handshake: {exception}")
+            connection.close()
+            return
+
+        context = self.register_client(id, connection)
+
+        writer = threading.Thread(target=self.write_frames, args=(context,), daemon=True)
+        writer.start()
+
+        self.handle_client(id)
+
+    def register_client(self, id: int, connection: Any) -> Context:
+        """Stores the context of a new client connection and sends the id
+        assigned to the client connection to the client.
 
         Args:
             id: the client id
             connection: the client connection
+
+        Returns: the client context
         """
 
-        self.clients[id] = Context(connection)
-        self.client_slots |= 1 << id
+        context = Context(id, connection, self.create_outbound_queue())
+        self.clients[id] = context
 
-        self.send(connection, {"type": "server_assign_id", "id": id})
-        self.id += 1
+        self.send(context, {"type": "server_assign_id", "id": id, "codecs": CodecRegistry.get_names()})
 
-        thread = threading.Thread(target=self.handle_client, args=(id,))
-        thread.start()
+        return context
+
+    def create_outbound_queue(self) -> OutboundQueue:
+        """Creates the outbound queue for a new client connection.
+
+        Returns: the outbound queue
+        """
+
+        return OutboundQueue(policy=self.queue_policy)
+
+    def write_frames(self, context: Context) -> None:
+        """Writes the frames queued for a client to its connection until the
+        queue is closed.
+
+        Args:
+            context: the client context
+        """
+
+        try:
+            while True:
+                frame = context.outbound.get()
+
+                if frame is None:
+                    break
+
+                context.connection.sendall(frame)
+
+                self.metrics.frames_sent.inc()
+                self.metrics.bytes_sent.inc(len(frame))
+        except OSError:
+            Logger.warn(f"Server: Could not write to client {context.id}")
+            context.outbound.close()
+
+    def create_dispatcher(self) -> Dispatcher:
+        """Creates the dispatcher mapping each type of data sent by a client to
+        the corresponding RPC.
+
+        Returns: the dispatcher
+        """
 
-    def handle_client_data(self, id: int, data: Any) -> None:
-        """Handles the data sent by the client with the corresponding id. It
-        executes the corresponding RPC.
+        dispatcher = Dispatcher("Server")
+
+        dispatcher.register("client_login", self.handle_client_login, Schema({"username": str, "password": str}))
+        dispatcher.register("client_signup", self.handle_client_signup, Schema({"username": str, "password": str}))
+        dispatcher.register("client_message", self.handle_client_message, Schema({"message": str}))
+        dispatcher.register("client_join_room", self.handle_client_join_room, Schema({"room": str}))
+        dispatcher.register("client_leave_room", self.handle_client_leave_room, Schema({}))
+        dispatcher.register("client_codec", self.handle_client_codec, Schema({"codec": str}))
+        dispatcher.register(
+            "client_history",
+            self.handle_client_history,
+            Schema({}, {"limit": HISTORY_PAGE_SIZE, "before_id": None, "after_id": None, "since": None}),
+        )
+
+        return dispatcher
+
+    def handle_client_codec(self, id: int, name: str) -> None:
+        """Handles the codec chosen by the client. Frames sent to the client
+        are encoded with the codec from now on.
 
         Args:
             id: the client id
-            data: the data sent by the client
+            name: the codec name
         """
 
-        if data["type"] == "client_login":
-            self.handle_client_login(id, data["username"], data["password"])
-        if data["type"] == "client_signup":
-            self.handle_client_signup(id, data["username"], data["password"])
-        if data["type"] == "client_message":
-            self.handle_client_message(id, data["message"])
+        codec = CodecRegistry.get(name)
+
+        if codec is None:
+            Logger.warn(f"Server: Client {id} chose an unsupported codec: {name}")
+            return
+
+        self.clients[id].codec = codec
 
     def handle_client_login(self, id: int, username: str, password: str) -> None:
-        """Handles the client login request.
+        """Handles the client login request. The password is checked by the
+        authenticator, and the login is completed once the check is done.
 
         Args:
             id: the client id
@@ -114,21 +359,53 @@ class Server:
             password: the user's password
         """
 
-        if not self.check_login_details(id, username, password):
+        user = self.check_login_details(id, username, password)
+
+        if user is None:
+            return
+
+        future = self.authenticator.check_password(password, user["password"])
+
+        self.await_authentication(future, functools.partial(self.complete_client_login, id, username))
+
+    def complete_client_login(self, id: int, username: str, valid: Optional[bool]) -> None:
+        """Completes the client login request once the password is checked.
+        Whether the client is logged in is checked again, as another request
+        may have completed meanwhile.
+
+        Args:
+            id: the client id
+            username: the user's username
+            valid: the validity of the password or nothing if it could not be checked
+        """
+
+        if id not in self.clients:
+            return
+
+        if valid is None:
+            self.send_server_login_error(id, "Server is busy, please try again later")
+            return
+
+        if not valid:
+            self.send_server_login_error(id, "Incorrect username or password")
+            return
+
+        if self.clients[id].username is not None:
+            self.send_server_login_error(id, "Already logged in")
+            return
+
+        if not self.presence.claim(username, self.clients[id]):
+            self.send_server_login_error(id, "User is already online")
             return
 
         self.send_server_login_error(id, "")
         self.clients[id].username = username
 
-        if self.clients[1] is not None:
-            self.send_messages_to_second_client()
-            self.exchange_usernames()
-
-        self.database.update_user_online_status(username, True)
-        self.send_server_message_to_clients(f"{username} joined the chat")
+        self.join_room(id, DEFAULT_ROOM)
 
     def handle_client_signup(self, id: int, username: str, password: str) -> None:
-        """Handles the client signup request.
+        """Handles the client signup request. The password is hashed by the
+        authenticator, and the signup is completed once the hash is done.
 
         Args:
             id: the client id
@@ -139,39 +416,197 @@ class Server:
         if not self.check_signup_details(id, username, password):
             return
 
-        password = Security.get_hashed_password(password)
+        future = self.authenticator.hash_password(password)
+
+        self.await_authentication(future, functools.partial(self.complete_client_signup, id, username))
+
+    def complete_client_signup(self, id: int, username: str, password: Optional[str]) -> None:
+        """Completes the client signup request once the password is hashed.
+        The username is checked again, as it may have been taken meanwhile,
+        and so is whether the client is logged in.
+
+        Args:
+            id: the client id
+            username: the user's username
+            password: the hashed password or nothing if it could not be hashed
+        """
+
+        if id not in self.clients:
+            return
+
+        if password is None:
+            self.send_server_signup_error(id, "Server is busy, please try again later")
+            return
+
+        if self.clients[id].username is not None:
+            self.send_server_signup_error(id, "Already logged in")
+            return
+
+        if not self.database.create_user(username, password):
+            self.send_server_signup_error(id, "Username must be unique")
+            return
+
+        if not self.presence.claim(username, self.clients[id]):
+            self.send_server_signup_error(id, "User is already online")
+            return
 
-        self.database.create_user(username, password)
         self.send_server_signup_error(id, "")
         self.clients[id].username = username
 
-        if self.clients[1] is not None:
-            self.send_messages_to_second_client()
-            self.exchange_usernames()
-
-        self.send_server_message_to_clients(f"{username} joined the chat")
+        self.join_room(id, DEFAULT_ROOM)
 
     def handle_client_message(self, id: int, message: str) -> None:
-        """Handles the client request when a message is sent.
+        """Handles the client request when a message is sent. The message is
+        stored in the room history and sent to the other members of the room.
+
+        Args:
+            id: the client id
+            message: the message to be sent to the room
+        """
+
+        context = self.clients[id]
+
+        if context.room is None:
+            Logger.warn(f"Server: Client {id} sent a message without joining a room")
+            return
+
+        message = self.database.create_message("client", message, context.username, context.room)
+        self.send_message_to_room(id, message)
+
+    def handle_client_join_room(self, id: int, room: str) -> None:
+        """Handles the client request to join a room.
+
+        Args:
+            id: the client id
+            room: the name of the room to join
+        """
+
+        if self.clients[id].username is None:
+            Logger.warn(f"Server: Client {id} must be logged in to join a room")
+            return
+
+        if not (isinstance(room, str) and room):
+            Logger.warn(f"Server: Client {id} requested an invalid room")
+            return
+
+        self.join_room(id, room)
+
+    def handle_client_history(self, id: int, limit: Any, before_id: Any, after_id: Any, since: Any) -> None:
+        """Handles the client request for a page of the history of its room.
+        The client either pages backwards from the oldest message it has, or
+        catches up from the newest message it has or from a point in time.
 
         Args:
             id: the client id
-            message: the message to be sent to the receiver
+            limit: the maximum number of messages in the page
+            before_id: the id of the message the page ends before
+            after_id: the id of the message the page starts after
+            since: the ISO 8601 time the page starts after
         """
 
-        if not self.check_all_clients_slots_taken():
-            self.database.create_message("client", message, self.clients[id].username)
-            Logger.warn("Server: Second user has not joined the server yet")
+        context = self.clients[id]
+
+        if context.room is None:
+            Logger.warn(f"Server: Client {id} requested history without joining a room")
+            return
+
+        if not self.check_history_details(limit, before_id, after_id, since):
+            Logger.warn(f"Server: Client {id} sent an invalid history request")
             return
 
-        self.send_message_to_client(id, message)
+        if since is not None:
+            since = datetime.fromisoformat(since)
 
-    def send_messages_to_second_client(self) -> None:
-        """Sends stored messages to the second client."""
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
 
-        data = {"type": "server_messages", "messages": self.database.get_messages()}
-        self.send(self.clients[1].connection, data)
+        self.send_history(id, context.room, min(limit, MAXIMUM_HISTORY_PAGE_SIZE), before_id, after_id, since)
 
+    def handle_client_leave_room(self, id: int) -> None:
+        """Handles the client request to leave its current room.
+
+        Args:
+            id: the client id
+        """
+
+        if self.clients[id].room is None:
+            Logger.warn(f"Server: Client {id} is not in a room")
+            return
+
+        self.leave_room(id)
+
+    def join_room(self, id: int, room: str) -> None:
+        """Moves the client into a room. The client leaves its current room,
+        receives the history of the new room, and the members of the new room
+        are notified.
+
+        Args:
+            id: the client id
+            room: the name of the room to join
+        """
+
+        context = self.clients[id]
+
+        if context.room is not None:
+            self.leave_room(id)
+
+        self.rooms.join(room, context)
+
+        self.send(context, {"type": "server_room_joined", "room": room})
+        self.send_history(id, room, HISTORY_PAGE_SIZE)
+        self.send_server_message_to_room(room, f"{context.username} joined the chat")
+
+    def leave_room(self, id: int) -> None:
+        """Removes the client from its current room and notifies the remaining
+        members.
+
+        Args:
+            id: the client id
+        """
+
+        context = self.clients[id]
+        room = self.rooms.leave(context)
+
+        if room is None:
+            return
+
+        self.send(context, {"type": "server_room_left", "room": room.name})
+        self.send_server_message_to_room(room.name, f"{context.username} has left the chat")
+
+    def send_history(
+        self,
+        id: int,
+        room: str,
+        limit: int,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+    ) -> None:
+        """Sends a page of the stored messages of a room to the client. The
+        page holds the latest messages unless a cursor is given.
+
+        Args:
+            id: the client id
+            room: the room name
+            limit: the maximum number of messages in the page
+            before_id: the id of the message the page ends before
+            after_id: the id of the message the page starts after
+            since: the time the page starts after
+        """
+
+        messages, has_more = self.database.get_messages(room, limit, before_id, after_id, since)
+
+        data = {
+            "type": "server_history",
+            "room": room,
+            "messages": messages,
+            "has_more": has_more,
+            "before_id": before_id,
+        }
+
+        self.send(self.clients[id], data)
+
+    @Utility.timed_event()
     def handle_client(self, id: int) -> None:
         """Handles the client connections. It handles any data sent from the
         client.
@@ -181,26 +616,50 @@ class Server:
         """
 
         connection = self.clients[id].connection
+        reader = FrameReader(connection)
 
         try:
             while True:
-                data = self.receive(connection)
+                frame = reader.read()
 
-                if not data:
+                if frame is None:
                     break
 
-                data = json.loads(data.decode("utf-8"))
-
-                if not self.check_data_format(data):
+                if not self.handle_client_frame(id, frame):
                     break
-
-                self.handle_client_data(id, data)
-                Logger.info(f"Server: Received data from client: {data}")
+        except OSError:
+            Logger.warn(f"Server: Client {id} connection was lost")
         finally:
             self.disconnect_client(id, connection)
 
-            if self.check_all_clients_disconnected():
-                self.disconnect_server()
+    @Utility.timed_event()
+    def handle_client_frame(self, id: int, frame: Union[bytes, memoryview]) -> bool:
+        """Decodes a frame received from the client with the corresponding id
+        and executes the corresponding RPC. The time taken is only recorded
+        for valid frames, so the data types recorded are the registered ones.
+
+        Args:
+            id: the client id
+            frame: the encoded data sent by the client
+
+        Returns: the validity of the frame
+        """
+
+        start = time.perf_counter()
+
+        self.metrics.frames_received.inc()
+        self.metrics.bytes_received.inc(HEADER_LENGTH + len(frame))
+
+        data = CodecRegistry.decode(frame)
+
+        if not self.dispatcher.dispatch(data, id):
+            return False
+
+        self.metrics.handler_seconds.observe(time.perf_counter() - start, (data["type"],))
+
+        Logger.info("Server: Received data from client: %s", data)
+
+        return True
 
     def send_server_login_error(self, id: int, error: str) -> None:
         """Sends a login error message to the client with the corresponding id.
@@ -211,19 +670,7 @@ class Server:
         """
 
         data = {"type": "server_login_error", "error": error}
-        self.send(self.clients[id].connection, data)
-
-    def exchange_usernames(self) -> None:
-        """Exchange usernames between the first client and the second
-        client."""
-
-        if not self.check_all_clients_slots_taken():
-            Logger.warn("Server: There is only one user online")
-            return
-
-        for id in range(MAX_CLIENTS):
-            data = {"type": "server_exchange_usernames", "username": self.clients[id ^ 1].username}
-            self.send(self.clients[id].connection, data)
+        self.send(self.clients[id], data)
 
     def send_server_signup_error(self, id: int, error: str) -> None:
         """Sends a signup error message to the client with the corresponding
@@ -235,113 +682,115 @@ class Server:
         """
 
         data = {"type": "server_signup_error", "error": error}
-        self.send(self.clients[id].connection, data)
+        self.send(self.clients[id], data)
 
-    def send_message_to_client(self, id: int, message: str) -> None:
-        """Sends a message to the receiver.
+    def send_message_to_room(self, id: int, message: Dict[str, Any]) -> None:
+        """Sends a client message to the other members of the sender's room.
 
         Args:
             id: the sender
-            message: the message to be sent to the receiver
+            message: the stored message to be sent to the room
         """
 
-        if not self.check_all_clients_slots_taken():
-            Logger.warn("Server: There is only one user online")
-            return
-
-        receiver_id = id ^ 1
-
-        serialised_message = {
-            "role": "client",
-            "username": self.clients[id].username,
-            "content": message,
-        }
+        context = self.clients[id]
 
-        data = {"type": "server_message", "message": serialised_message}
-        self.send(self.clients[receiver_id].connection, data)
+        self.send_to_room(context.room, {"type": "server_message", "message": message}, id)
 
-    def send_server_message_to_clients(self, message: str) -> None:
-        """Sends a server message to all clients.
+    def send_server_message_to_room(self, room: str, message: str) -> None:
+        """Sends a server message to all members of a room.
 
         Args:
-            message: the message to be sent to all clients
+            room: the room name
+            message: the message to be sent to the room
         """
 
-        role = "server"
+        data = {"type": "server_message", "message": self.database.create_message("server", message, room=room)}
 
-        serialised_message = {
-            "role": role,
-            "content": message,
-        }
-
-        for client in self.clients:
-            if client is not None:
-                data = {"type": "server_message", "message": serialised_message}
-                self.send(client.connection, data)
-
-        self.database.create_message(role, message)
+        self.send_to_room(room, data)
 
-    def check_all_clients_slots_taken(self) -> bool:
-        """Check if all client slots are taken.
+    def send_to_room(self, room: str, data: Any, sender: Optional[int] = None) -> None:
+        """Sends data to the members of a room, except for the sender.
 
-        Returns: the validity of the check
+        Args:
+            room: the room name
+            data: the data to be sent to the room
+            sender: the id of the client who sent the data, if it was a client
         """
 
-        return self.client_slots == (1 << MAX_CLIENTS) - 1
+        self.broadcast([member for member in self.rooms.get_members(room) if member.id != sender], data)
 
-    def check_data_format(self, data: Any) -> bool:
-        """Check if the data sent from the client is valid or not. It should
-        include a 'type', so that the corresponding RPC can be executed.
+    def check_login_details(self, id: int, username: str, password: str) -> Any:
+        """Validates the user's login details. A client that is already
+        logged in cannot log in again, as its username would stay claimed.
+        The user is returned, so the password can be checked without
+        fetching it again.
 
         Args:
-            data: the data sent from the client
+            id: the client id
+            username: the user's username
+            password: the user's password
 
-        Returns: the validity of the data
+        Returns: the user if their login details are valid, otherwise nothing
         """
 
-        if not isinstance(data, dict):
-            Logger.error("Server: data is not in the correct format")
-            return False
+        if self.clients[id].username is not None:
+            self.send_server_login_error(id, "Already logged in")
+            return None
 
-        if "type" not in data:
-            Logger.error("Server: 'type' is not present in data")
-            return False
+        if not (username and password):
+            self.send_server_login_error(id, "Username and password are required")
+            return None
 
-        if data["type"] not in SERVER_TYPES:
-            Logger.error(f"Server: 'type': {data['type']} is not a valid type")
-            return False
+        user = self.database.get_username(username)
 
-        return True
+        if user is None:
+            self.send_server_login_error(id, "Incorrect username or password")
+            return None
+
+        return user
 
-    def check_login_details(self, id: int, username: str, password: str) -> bool:
-        """Validates the user's login details.
+    def check_history_details(self, limit: Any, before_id: Any, after_id: Any, since: Any) -> bool:
+        """Validates the details of a history request.
 
         Args:
-            id: the client id
-            username: the user's username
-            password: the user's password
+            limit: the maximum number of messages in the page
+            before_id: the id of the message the page ends before
+            after_id: the id of the message the page starts after
+            since: the ISO 8601 time the page starts after
 
-        Returns: the validity of their login details
+        Returns: the validity of the history request
         """
 
-        if not (username and password):
-            self.send_server_login_error(id, "Username and password are required")
+        if type(limit) is not int or limit < 1:
             return False
 
-        users = self.database.get_username_and_password(username, password)
-
-        if not users:
-            self.send_server_login_error(id, "Incorrect username or password")
+        if any(cursor is not None and type(cursor) is not int for cursor in (before_id, after_id)):
             return False
 
-        if users[0]["online"]:
-            self.send_server_login_error(id, "User is already online")
+        if since is None:
+            return True
+
+        try:
+            datetime.fromisoformat(since)
+        except (TypeError, ValueError):
             return False
 
         return True
 
+    def await_authentication(self, future: Optional[Future], callback: Callable[[Any], None]) -> None:
+        """Waits for an authentication job on the client handler thread, which
+        leaves the other client connections unaffected.
+
+        Args:
+            future: the future result of the job or nothing if it was rejected
+            callback: the function called with the result or nothing if it failed
+        """
+
+        callback(self.authenticator.wait(future))
+
     def check_signup_details(self, id: int, username: str, password: str) -> bool:
-        """Validates the user's signup details.
+        """Validates the user's signup details. A client that is already
+        logged in cannot sign up again, as its username would stay claimed.
 
         Args:
             id: the client id
@@ -351,6 +800,10 @@ class Server:
         Returns: the validity of their signup details
         """
 
+        if self.clients[id].username is not None:
+            self.send_server_signup_error(id, "Already logged in")
+            return False
+
         if not (username and password):
             self.send_server_signup_error(id, "Username and password are required")
             return False
@@ -361,100 +814,188 @@ class Server:
 
         return True
 
-    def receive(self, connection: SSLSocket) -> Union[bytearray, None]:
-        """Receive data based on the length of the incoming data. Returns a
-        50-byte payload. Either all or no data is returned.
+    @Utility.timed_event()
+    def send(self, context: Context, data: Any) -> None:
+        """Sends data to the client. The payload contains the header along with
+        the data.
 
         Args:
-            connection: the client connection
-
-        Returns: data in the form of a bytearray or nothing
+            context: the client context
+            data: the data to be sent to the client
         """
 
-        raw_length = self.receive_all(connection, HEADER_LENGTH)
+        self.send_frame(context, self.encode(data, context.codec))
 
-        if not raw_length:
-            return None
+    def send_frame(self, context: Context, frame: bytes) -> None:
+        """Queues an encoded frame to be written to the client. Clients that
+        are too slow to keep up are disconnected.
 
-        length = struct.unpack(">I", raw_length)[0]
+        Args:
+            context: the client context
+            frame: the encoded frame
+        """
 
-        return self.receive_all(connection, length)
+        if not context.outbound.put(frame):
+            self.disconnect_slow_client(context)
 
-    def receive_all(self, connection: SSLSocket, length: int) -> Union[bytearray, None]:
-        """Receive all data sent from a client. If the client connection is
-        closed then nothing will be returned.
+    def broadcast(self, recipients: List[Context], data: Any) -> None:
+        """Sends the same data to many clients. The data is encoded into a
+        single frame per codec that is written to every recipient using that
+        codec, so the cost of encoding does not grow with the number of
+        recipients.
 
         Args:
-            connection: the client connection
-            length: the size of the data to be retrieved
-
-        Returns: data in the form of a bytearray or nothing
+            recipients: the client contexts of the recipients
+            data: the data to be sent to the recipients
         """
 
-        data = bytearray()
+        frames: Dict[str, bytes] = {}
 
-        while len(data) < length:
-            packet = connection.recv(length - len(data))
+        for recipient in recipients:
+            frame = frames.get(recipient.codec.name)
 
-            if not packet:
-                return None
+            if frame is None:
+                frame = frames[recipient.codec.name] = self.encode(data, recipient.codec)
 
-            data.extend(packet)
+            self.send_frame(recipient, frame)
 
-        return data
-
-    def send(self, connection: SSLSocket, data: Any) -> None:
-        """Sends data to the client. The payload contains the header along with
-        the data.
+    def encode(self, data: Any, codec: Codec) -> bytes:
+        """Encodes the data into a frame. The frame contains the header along
+        with the data.
 
         Args:
-            connection: the client connection
-            data: the data to be sent to the client
+            data: the data to be encoded
+            codec: the codec used to encode the data
+
+        Returns: the encoded frame
         """
 
-        message = json.dumps(data).encode("utf-8")
-        message = struct.pack(">I", len(message)) + message
+        message = codec.encode(data)
 
-        connection.sendall(message)
+        return struct.pack(">I", len(message)) + message
 
     def start(self) -> None:
         """Starts the server and listens for client connections.
 
         If the server connection closes, then client client connections
-        will also be closed.
+        will also be closed. Like asyncio's transports, accepted
+        connections disable Nagle's algorithm, so small frames such as the
+        assigned id are not held back waiting for an acknowledgement. A
+        connection lost before it is accepted is skipped, the server only
+        stops listening once its own socket is closed.
         """
 
-        address = f"{self.__HOST}:{self.__PORT}"
-        Logger.info(f"Server: Listening for connections on {address}")
+        host, port = self.get_address()
+        Logger.info(f"Server: Listening for connections on {host}:{port}")
+
+        self.socket.bind((host, port))
+        self.socket.listen(SERVER_BACKLOG)
 
-        self.socket.bind((self.__HOST, self.__PORT))
-        self.socket.listen(MAX_CLIENTS)
+        self.install_profiler_toggle()
+        self.start_metrics_endpoint()
+        self.start_presence_snapshots()
+
+        listening_socket = self.socket
 
         try:
             while True:
                 try:
-                    connection, address = self.socket.accept()
+                    connection, address = listening_socket.accept()
+                    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
-                    if self.id == MAX_CLIENTS:
-                        Logger.error("Server: Only a maximum of two clients can be connected")
-                        continue
+                    secure_connection = self.ssl_context.wrap_socket(connection, server_side=True, do_handshake_on_connect=False)
+                except OSError as exception:
+                    if listening_socket.fileno() == -1:
+                        break
 
-                    self.add_client(self.id, connection)
-                    Logger.info(f"Server: Client connection from {address}")
-                except socket.error:
-                    break
+                    Logger.warn(f"Server: Could not accept a client connection: {exception}")
+                    continue
+
+                self.add_client(self.id, secure_connection)
+                self.id += 1
+
+                Logger.info(f"Server: Client connection from {address}")
         except KeyboardInterrupt:
             Logger.info("Server: Server connection was closed manually via keyboard interrupt")
         finally:
-            self.disconnect_all_clients()
+            self.shutdown()
 
-    def check_all_clients_disconnected(self) -> bool:
-        """Check if all clients have disconnected.
+    def shutdown(self) -> None:
+        """Disconnects every client, then releases the resources of the
+        server."""
 
-        Returns: the validity of the check
-        """
+        self.disconnect_all_clients()
+        self.authenticator.shutdown()
+        self.stop_presence_snapshots()
+        self.stop_metrics_endpoint()
+        self.database.close()
+
+    def install_profiler_toggle(self) -> None:
+        """Toggles the sampling profiler whenever the server receives
+        SIGUSR1, where the platform has it. Signal handlers run on the main
+        thread, so this is called from the thread starting the server."""
+
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.profiler.toggle())
+
+    def start_metrics_endpoint(self) -> None:
+        """Serves the metrics for scraping in the background, if metrics are
+        enabled. The server keeps running without them if the endpoint
+        cannot listen."""
+
+        if not self.metrics.registry.enabled:
+            return
+
+        try:
+            self.metrics_endpoint = MetricsEndpoint(self.metrics.registry, self.get_metrics_address())
+        except OSError as exception:
+            Logger.error(f"Server: Could not serve metrics: {exception}")
+            return
+
+        self.metrics_endpoint.start()
+
+    def stop_metrics_endpoint(self) -> None:
+        """Stops serving the metrics, if they are served."""
+
+        if self.metrics_endpoint is not None:
+            self.metrics_endpoint.close()
+            self.metrics_endpoint = None
+
+    def start_presence_snapshots(self) -> None:
+        """Starts writing snapshots of the users who are online to the
+        database in the background, if snapshots are enabled."""
+
+        if self.presence_snapshot_interval <= 0:
+            return
+
+        thread = threading.Thread(target=self.write_presence_snapshots, daemon=True)
+        thread.start()
+
+    def write_presence_snapshots(self) -> None:
+        """Writes a snapshot of the users who are online at every interval."""
+
+        while True:
+            time.sleep(self.presence_snapshot_interval)
+            self.snapshot_presence()
+
+    def snapshot_presence(self) -> None:
+        """Writes the users who are online to the database, unless nobody has
+        logged in or disconnected since the last snapshot."""
+
+        version, usernames = self.presence.snapshot()
+
+        if version == self.snapshot_version:
+            return
+
+        self.database.save_presence(usernames)
+        self.snapshot_version = version
+
+    def stop_presence_snapshots(self) -> None:
+        """Writes a final snapshot once every client is disconnected, if
+        snapshots are enabled."""
 
-        return self.id == MAX_CLIENTS and self.client_slots == 0
+        if self.presence_snapshot_interval > 0:
+            self.snapshot_presence()
 
     def disconnect_client(self, id: int, connection: SSLSocket) -> None:
         """Closes a client connection in correspondance to the client id.
@@ -464,20 +1005,38 @@ class Server:
             connection: the connection to close
         """
 
-        self.client_slots &= ~(1 << id)
+        context = self.clients.pop(id, None)
 
-        username = ""
+        if context is not None:
+            context.outbound.close()
 
-        if self.clients[id] is not None:
-            username = self.clients[id].username
-            self.database.update_user_online_status(username, False)
+            room = self.rooms.leave(context)
 
-        self.clients[id] = None
-        self.send_server_message_to_clients(f"{username} has left the chat")
+            if room is not None:
+                self.send_server_message_to_room(room.name, f"{context.username} has left the chat")
+
+            self.presence.release(context)
 
         connection.close()
         Logger.info(f"Server: Client {id} disconnected")
 
+    def disconnect_slow_client(self, context: Context) -> None:
+        """Disconnects a client that does not drain its outbound queue. The
+        connection is shut down, so the client handler thread cleans up the
+        client as if it had disconnected.
+
+        Args:
+            context: the client context
+        """
+
+        Logger.warn(f"Server: Client {context.id} is too slow, disconnecting")
+        context.outbound.close()
+
+        try:
+            socket.socket.shutdown(context.connection, socket.SHUT_RDWR)
+        except OSError:
+            Logger.warn(f"Server: Client {context.id} connection is already shutdown")
+
     def disconnect_server(self) -> None:
         """Disconnects the server connection."""
 
@@ -499,9 +1058,8 @@ class Server:
     def disconnect_all_clients(self) -> None:
         """Disconnects all client connections."""
 
-        for id, client in enumerate(self.clients):
-            if client is not None:
-                self.disconnect_client(id, client.connection)
+        for client in list(self.clients.values()):
+            self.disconnect_client(client.id, client.connection)
 
         self.disconnect_server()
 